@@ -0,0 +1,73 @@
+"""
+Сколько входов в секунду выдерживает проверка пароля при разной стоимости KDF.
+
+Запуск:
+    python benchmarks/bench_hashing.py
+    python benchmarks/bench_hashing.py --seconds 2 --json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from elliot_bot.hashing import hash_password, verify_password  # noqa: E402
+
+
+COST_SETTINGS = [
+    ("pbkdf2_sha256", {"iterations": 50_000}),
+    ("pbkdf2_sha256", {"iterations": 100_000}),
+    ("pbkdf2_sha256", {"iterations": 200_000}),
+    ("pbkdf2_sha256", {"iterations": 600_000}),
+    ("scrypt", {"n": 2 ** 12, "r": 8, "p": 1}),
+    ("scrypt", {"n": 2 ** 14, "r": 8, "p": 1}),
+    ("scrypt", {"n": 2 ** 15, "r": 8, "p": 1}),
+]
+
+
+def measure(encoded, seconds, workers):
+    """Логинов в секунду: проверки без кэша, workers потоков"""
+    deadline = time.perf_counter() + seconds
+    done = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while time.perf_counter() < deadline:
+            futures = [pool.submit(verify_password, "password", encoded, None) for _ in range(workers)]
+            for future in futures:
+                assert future.result()
+            done += workers
+    return done / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=1.0, help="время на каждую настройку")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="потоков в пуле")
+    parser.add_argument("--json", action="store_true", help="вывод в JSON")
+    args = parser.parse_args()
+
+    results = []
+    for algorithm, params in COST_SETTINGS:
+        encoded = hash_password("password", algorithm, params)
+        results.append({
+            "algorithm": algorithm,
+            "params": params,
+            "workers": args.workers,
+            "logins_per_sec_single": round(measure(encoded, args.seconds, 1), 1),
+            "logins_per_sec_pool": round(measure(encoded, args.seconds, args.workers), 1),
+        })
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+    print(f"{'алгоритм':<15}{'параметры':<30}{'1 поток':>10}{f'пул x{args.workers}':>10}")
+    for row in results:
+        print(f"{row['algorithm']:<15}{json.dumps(row['params']):<30}"
+              f"{row['logins_per_sec_single']:>10}{row['logins_per_sec_pool']:>10}")
+
+
+if __name__ == "__main__":
+    main()
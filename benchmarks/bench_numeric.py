@@ -0,0 +1,82 @@
+"""
+Скорость числовых движков Математики (float, decimal, fraction) на четырёх
+операциях меню: сколько операций в секунду, считая разбор двух чисел из
+строки, как это делает бот.
+
+Запуск:
+    python benchmarks/bench_numeric.py
+    python benchmarks/bench_numeric.py --precision 50 --json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from elliot_bot import numeric  # noqa: E402
+from elliot_bot.numeric import NUMBER_ENGINES, calculate, parse_number  # noqa: E402
+
+
+OPERATIONS = ("+", "-", "*", "÷")
+
+
+def make_inputs(count, seed=1):
+    """Пары чисел как их вводят: целые и с двумя знаками после точки, без нуля в делителе"""
+    rng = random.Random(seed)
+    pairs = []
+    for _ in range(count):
+        a = str(rng.randint(-10_000, 10_000)) if rng.random() < 0.5 else f"{rng.uniform(-1000, 1000):.2f}"
+        b = f"{rng.uniform(1, 1000):.2f}"
+        pairs.append((a, b))
+    return pairs
+
+
+def run(engine, operation, pairs, seconds):
+    """Операций в секунду: крутим pairs по кругу, пока не пройдёт seconds"""
+    done = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while True:
+        for a, b in pairs:
+            calculate(operation, parse_number(a, engine), parse_number(b, engine), engine, cache=None)
+        done += len(pairs)
+        now = time.perf_counter()
+        if now >= deadline:
+            return done / (now - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=0.5, help="время на один замер")
+    parser.add_argument("--pairs", type=int, default=1000, help="сколько разных пар чисел")
+    parser.add_argument("--precision", type=int, default=numeric.DECIMAL_PRECISION,
+                        help="точность движка decimal")
+    parser.add_argument("--json", action="store_true", help="вывод в JSON")
+    args = parser.parse_args()
+    numeric.set_decimal_context(precision=args.precision)
+    pairs = make_inputs(args.pairs)
+
+    results = []
+    for engine in NUMBER_ENGINES:
+        for operation in OPERATIONS:
+            results.append({
+                "engine": engine,
+                "operation": operation,
+                "ops_per_sec": round(run(engine, operation, pairs, args.seconds)),
+            })
+
+    if args.json:
+        print(json.dumps({"decimal_precision": args.precision, "results": results},
+                         ensure_ascii=False, indent=2))
+        return
+    print(f"Точность decimal: {args.precision} знаков")
+    print(f"{'движок':<10}{'операция':<10}{'оп/с':>12}")
+    for row in results:
+        print(f"{row['engine']:<10}{row['operation']:<10}{row['ops_per_sec']:>12}")
+
+
+if __name__ == "__main__":
+    main()
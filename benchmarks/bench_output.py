@@ -0,0 +1,106 @@
+"""
+Сколько записей (системных вызовов write) и времени уходит на экраны
+пяти функций при разных политиках сброса вывода.
+
+Для каждой функции открывается сессия сразу в состоянии выбора функции,
+выбирается функция, а для разделов 2-5 ещё и все четыре пункта.
+Транспорт пишет в /dev/null через os.write, так что одна отправка - это
+ровно один системный вызов. --latency-ms добавляет задержку на каждую
+запись, как у медленного удалённого терминала.
+
+Запуск:
+    python benchmarks/bench_output.py
+    python benchmarks/bench_output.py --latency-ms 5 --json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from elliot_bot.engine import Engine  # noqa: E402
+from elliot_bot.output import FLUSH_POLICIES  # noqa: E402
+from elliot_bot.transports import Transport  # noqa: E402
+
+
+# Ввод для каждой функции после "Выбрать функцию 1-5"
+SCREENS = {
+    "1": ["1", "5"],
+    "2": ["2", "1", "", "да", "2", "", "да", "3", "", "да", "4", "", "нет"],
+    "3": ["3", "1", "", "да", "2", "", "да", "3", "", "да", "4", "", "нет"],
+    "4": ["4", "1", "", "да", "2", "", "да", "3", "", "да", "4", "", "нет"],
+    "5": ["5", "1", "", "да", "2", "", "да", "3", "", "да", "4", "", "нет"],
+}
+
+
+class NullTransport(Transport):
+    def __init__(self, latency):
+        self.latency = latency
+        self.writes = 0
+        self.bytes = 0
+        self._fd = os.open(os.devnull, os.O_WRONLY)
+
+    async def send(self, session_id, text):
+        data = text.encode("utf-8")
+        os.write(self._fd, data)
+        self.writes += 1
+        self.bytes += len(data)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def close(self):
+        os.close(self._fd)
+
+
+async def render(policy, lines, latency):
+    engine = Engine(start_state="choose", greeting=None, flush_policy=policy)
+    transport = NullTransport(latency)
+    engine.transport = transport
+    session = engine.open_session("bench")
+    start = time.perf_counter()
+    for line in lines:
+        session._queue.put_nowait(line)
+    session._queue.put_nowait(None)
+    await session._task
+    elapsed = time.perf_counter() - start
+    transport.close()
+    return transport.writes, transport.bytes, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200, help="повторов без задержки")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="задержка на одну запись")
+    parser.add_argument("--json", action="store_true", help="вывод в JSON")
+    args = parser.parse_args()
+    latency = args.latency_ms / 1000
+    repeat = 1 if latency else args.repeat
+
+    results = []
+    for function, lines in SCREENS.items():
+        for policy in FLUSH_POLICIES:
+            total = 0.0
+            for _ in range(repeat):
+                writes, size, elapsed = asyncio.run(render(policy, lines, latency))
+                total += elapsed
+            results.append({
+                "function": function,
+                "policy": policy,
+                "writes": writes,
+                "bytes": size,
+                "ms": round(total / repeat * 1000, 3),
+            })
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+    print(f"{'функция':<9}{'политика':<10}{'записей':>9}{'байт':>8}{'мс':>10}")
+    for row in results:
+        print(f"{row['function']:<9}{row['policy']:<10}{row['writes']:>9}{row['bytes']:>8}{row['ms']:>10}")
+
+
+if __name__ == "__main__":
+    main()
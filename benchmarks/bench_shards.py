@@ -0,0 +1,118 @@
+"""
+Шардированная база (ShardedUserStore) против одного журнала: как растёт
+скорость регистрации с числом процессов.
+
+Для каждого хранилища и числа процессов в чистой домашней папке
+запускаются workers процессов, каждый регистрирует --users новых
+пользователей так же, как бот: find_by_login, get_new_user_name_id и
+запись. Пароль уже захэширован (KDF от числа процессов не зависит и
+только заслонил бы базу); --hash считает хэш на каждую регистрацию.
+Процессы стартуют одновременно, скорость - все регистрации делить на
+время от старта до конца последнего процесса, ускорение - относительно
+первого числа процессов в --workers.
+
+У log все процессы ждут одну блокировку журнала и перечитывают его
+хвост за чужими записями; у sharded блокировка и файл у каждого шарда
+свои, и ждут друг друга только регистрации с логинами в одном шарде.
+
+Запуск:
+    python benchmarks/bench_shards.py
+    python benchmarks/bench_shards.py --workers 1,2,4,8 --users 2000 --shards 16 --json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+BACKENDS = ("log", "sharded")
+PASSWORD_HASH = "pbkdf2_sha256$200000$" + "00" * 16 + "$" + "00" * 32
+# Сколько ждать, пока поднимутся все процессы, прежде чем стартовать вместе
+START_DELAY = 1.0
+
+
+def child(worker, users, start_at, with_hash):
+    from elliot_bot.auth import _store_user, get_new_user_name_id
+    from elliot_bot.hashing import hash_password
+    from elliot_bot.store import get_users_store
+
+    users_store = get_users_store()
+    users_store.find_by_login("прогрев")
+    time.sleep(max(0.0, start_at - time.time()))
+    for number in range(users):
+        login = f"w{worker}_user{number}"
+        hashed_password = hash_password(login) if with_hash else PASSWORD_HASH
+        assert users_store.find_by_login(login) is None
+        _store_user(get_new_user_name_id(), login, hashed_password)
+    return {"end": time.time()}
+
+
+def run(backend, workers, users, shards, with_hash):
+    with tempfile.TemporaryDirectory() as home:
+        env = dict(os.environ, HOME=home, USERPROFILE=home, ELLIOT_STORE=backend, ELLIOT_SHARDS=str(shards))
+        env.pop("ELLIOT_METRICS", None)
+        start_at = time.time() + START_DELAY + 0.1 * workers
+        command = [sys.executable, os.path.abspath(__file__), "--users", str(users),
+                   "--start-at", repr(start_at)] + (["--hash"] if with_hash else [])
+        processes = [subprocess.Popen(command + ["--child", str(worker)], cwd=ROOT, env=env,
+                                      stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+                     for worker in range(workers)]
+        ends = []
+        for process in processes:
+            out, err = process.communicate()
+            if process.returncode != 0:
+                raise SystemExit(err)
+            ends.append(json.loads(out.strip().splitlines()[-1])["end"])
+
+        # Проверка: все зарегистрированы, id не повторяются
+        check = ("from elliot_bot.store import get_users_store; s = get_users_store(); "
+                 "ids = [user_id for user_id, _ in s.iter_users()]; print(len(ids), len(set(ids)))")
+        out = subprocess.run([sys.executable, "-c", check], cwd=ROOT, env=env,
+                             capture_output=True, text=True, check=True).stdout
+        total, unique = map(int, out.strip().splitlines()[-1].split())
+        if total != unique or total != workers * users:
+            raise SystemExit(f"{backend}: записано {total}, разных id {unique}, ожидалось {workers * users}")
+        seconds = max(ends) - start_at
+        return {"seconds": round(seconds, 3), "per_second": round(total / seconds)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", default="1,2,4,8", help="числа процессов через запятую")
+    parser.add_argument("--users", type=int, default=1000, help="регистраций на процесс")
+    parser.add_argument("--shards", type=int, default=8, help="шардов у sharded")
+    parser.add_argument("--hash", action="store_true", help="хэшировать пароль на каждую регистрацию")
+    parser.add_argument("--json", action="store_true", help="результат в JSON")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--start-at", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        print(json.dumps(child(args.child, args.users, args.start_at, args.hash)))
+        return
+
+    rows = []
+    for backend in BACKENDS:
+        base = None
+        for workers in (int(value) for value in args.workers.split(",")):
+            row = {"backend": backend, "workers": workers, **run(backend, workers, args.users, args.shards, args.hash)}
+            base = base or row["per_second"]
+            row["speedup"] = round(row["per_second"] / base, 2)
+            rows.append(row)
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    print(f"{'база':<8}{'процессов':>10}{'секунд':>10}{'рег/с':>10}{'ускорение':>11}")
+    for row in rows:
+        print(f"{row['backend']:<8}{row['workers']:>10}{row['seconds']:>10}{row['per_second']:>10}{row['speedup']:>11}")
+
+
+if __name__ == "__main__":
+    main()
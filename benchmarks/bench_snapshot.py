@@ -0,0 +1,120 @@
+"""
+Двоичный снимок (snapshot.py) против JSON и журнала: поиск по логину и
+занятая память на синтетических базах разного размера.
+
+Для каждого размера и хранилища в отдельном процессе измеряются:
+    first  - первый find_by_login (для json это загрузка всей базы);
+    lookup - средний find_by_login по случайным логинам;
+    rss    - собственная память процесса (без кэша файлов), МБ.
+У снимка rss почти не растёт с размером базы: файл отображён через mmap,
+и читаются только страницы, которые задел двоичный поиск.
+
+Запуск:
+    python benchmarks/bench_snapshot.py
+    python benchmarks/bench_snapshot.py --sizes 10000,100000,1000000 --json
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_suite import generate  # noqa: E402
+
+
+BACKENDS = ("json", "log", "snap")
+FILES = {"json": "elliot_users.json", "log": "elliot_users.jsonl", "snap": "elliot_users.snap"}
+PASSWORD_HASH = "pbkdf2_sha256$200000$" + "00" * 16 + "$" + "00" * 32
+
+
+def child(size, lookups):
+    from elliot_bot.store import get_users_store
+
+    rng = random.Random(size)
+    logins = [f"user{rng.randint(1, size)}" for _ in range(lookups)]
+    users_store = get_users_store()
+    start = time.perf_counter()
+    assert users_store.find_by_login(logins[0]) is not None
+    first = time.perf_counter() - start
+    start = time.perf_counter()
+    for login in logins:
+        assert users_store.find_by_login(login) is not None
+    lookup = (time.perf_counter() - start) / lookups
+    return {"first_ms": round(first * 1000, 3), "lookup_us": round(lookup * 1e6, 2), "rss_mb": _private_mb()}
+
+
+def _private_mb():
+    """
+    Собственная память процесса, МБ. Страницы отображённого файла в RSS
+    тоже попадают, но это общий с системой кэш файла, поэтому на Linux
+    считаем только RssAnon, а в других системах - пик RSS целиком.
+    """
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("RssAnon:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    import resource
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux отдаёт КБ, macOS - байты
+    return round(rss / 1024 / (1024 if sys.platform == "darwin" else 1), 1)
+
+
+def run_child(size, backend, source, lookups):
+    with tempfile.TemporaryDirectory() as home:
+        target = os.path.join(home, FILES[backend])
+        if backend == "snap":
+            subprocess.run([sys.executable, "-m", "elliot_bot.snapshot", "to-snap", source, target],
+                           cwd=ROOT, check=True, capture_output=True)
+        else:
+            with open(source, 'rb') as src, open(target, 'wb') as dst:
+                dst.write(src.read())
+        env = dict(os.environ, HOME=home, USERPROFILE=home, ELLIOT_STORE=backend)
+        command = [sys.executable, os.path.abspath(__file__), "--child", str(size), "--lookups", str(lookups)]
+        result = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise SystemExit(result.stderr)
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000", help="размеры баз через запятую")
+    parser.add_argument("--lookups", type=int, default=10000)
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "elliot_bench_snapshot"),
+                        help="куда сохранять сгенерированные базы (переиспользуются)")
+    parser.add_argument("--json", action="store_true", help="результат в JSON")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args.child, args.lookups)))
+        return
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    rows = []
+    for size in (int(value) for value in args.sizes.split(",")):
+        json_path, log_path = generate(args.data_dir, size, PASSWORD_HASH)
+        for backend in BACKENDS:
+            source = log_path if backend == "log" else json_path
+            rows.append({"size": size, "backend": backend, **run_child(size, backend, source, args.lookups)})
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    print(f"{'размер':>8} {'база':<5}{'first мс':>12}{'lookup мкс':>12}{'rss МБ':>10}")
+    for row in rows:
+        print(f"{row['size']:>8} {row['backend']:<5}{row['first_ms']:>12}{row['lookup_us']:>12}{row['rss_mb']:>10}")
+
+
+if __name__ == "__main__":
+    main()
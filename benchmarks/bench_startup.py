@@ -0,0 +1,73 @@
+"""
+Время холодного импорта бота и проверка, что импорт ничего не делает.
+
+Каждый замер - новый процесс python, из его времени вычитается время
+пустого "python -c pass". Если медиана выходит за бюджет, скрипт
+завершается с кодом 1, так что его можно запускать в CI.
+
+Запуск:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --budget-ms 80 --runs 30 --json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Бюджет на импорт пакета со всеми модулями, без учёта запуска самого python
+BUDGET_MS = 60.0
+IMPORT_CODE = "import elliot_bot, elliot_bot.app"
+
+
+def run(code, home):
+    env = dict(os.environ, HOME=home, USERPROFILE=home, PYTHONDONTWRITEBYTECODE="1")
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                            capture_output=True, text=True)
+    elapsed = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise SystemExit(result.stderr)
+    return elapsed, result.stdout
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    parser.add_argument("--json", action="store_true", help="вывод в JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        baseline = [run("pass", home)[0] for _ in range(args.runs)]
+        samples = []
+        for _ in range(args.runs):
+            elapsed, stdout = run(IMPORT_CODE, home)
+            if stdout:
+                raise SystemExit(f"Импорт что-то напечатал: {stdout!r}")
+            samples.append(elapsed)
+        if os.listdir(home):
+            raise SystemExit(f"Импорт создал файлы в домашней папке: {os.listdir(home)}")
+
+    import_ms = statistics.median(samples) - statistics.median(baseline)
+    result = {
+        "python_ms": round(statistics.median(baseline), 2),
+        "import_ms": round(import_ms, 2),
+        "budget_ms": args.budget_ms,
+        "ok": import_ms <= args.budget_ms,
+    }
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False))
+    else:
+        print(f"python без бота: {result['python_ms']} мс")
+        print(f"импорт бота:     {result['import_ms']} мс (бюджет {args.budget_ms} мс)")
+    if not result["ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+Набор замеров базы пользователей, входа и меню на синтетических базах.
+
+Для каждого размера (по умолчанию 1 000 и 100 000 пользователей, можно
+и 1 000 000) генерируется база в формате excamle_users_json и такой же
+журнал .jsonl, затем для каждого хранилища (json, log) в отдельном
+процессе с чистой домашней папкой измеряются:
+    open                 - первое обращение к базе (get_users_store);
+    get_new_user_name_id - первый вызов и среднее по следующим;
+    save_user            - с хэшированием пароля, и отдельно запись без хэша;
+    login_user           - вход со вводом через stdin, первый и средний;
+    resume               - вход по ключу сессии (sessions.py) вместо пароля;
+    session              - полная сессия по всем пяти функциям через движок,
+                           и session_resumed - она же со входом по запомненному ключу.
+Результат - JSON (--output), --compare старый.json показывает, что
+стало медленнее порога --threshold.
+
+Запуск:
+    python benchmarks/bench_suite.py
+    python benchmarks/bench_suite.py --sizes 1000,100000,1000000 --output bench.json
+    python benchmarks/bench_suite.py --compare bench.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+BACKENDS = ("json", "log")
+PASSWORD = "password"
+# Вся сессия: вход, все пять функций с пунктами, выход
+SESSION_SCRIPT = [
+    "1", "{login}", PASSWORD, "да",
+    "1", "1", "2", "3", "да", "4", "7", "0", "2+3*(4-1)", "", "5", "да",
+    "2", "1", "", "да", "2", "", "нет", "да",
+    "3", "1", "", "да", "3", "", "нет", "да",
+    "4", "2", "", "да", "4", "", "нет", "да",
+    "5", "1", "", "нет", "нет",
+]
+
+
+def generate(directory, size, password_hash):
+    """Синтетическая база на size пользователей: .json (как excamle_users_json) и .jsonl"""
+    json_path = os.path.join(directory, f"users_{size}.json")
+    log_path = os.path.join(directory, f"users_{size}.jsonl")
+    if os.path.exists(json_path) and os.path.exists(log_path):
+        return json_path, log_path
+    with open(json_path, 'w', encoding='utf-8') as json_file, \
+            open(log_path, 'w', encoding='utf-8') as log_file:
+        json_file.write("{\n")
+        for user_id in range(1, size + 1):
+            record = {"login": f"user{user_id}", "password": password_hash,
+                      "commands": {}, "admin": user_id == 1}
+            body = json.dumps(record, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+            comma = "," if user_id < size else ""
+            json_file.write(f'  "{user_id}": {body}{comma}\n')
+            log_file.write(json.dumps({"id": str(user_id), **record}, ensure_ascii=False) + "\n")
+        json_file.write("}\n")
+    return json_path, log_path
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+def child(size, backend, repeat, saves):
+    """Замеры в процессе с HOME, где уже лежит база нужного хранилища"""
+    from elliot_bot import auth, store
+    from elliot_bot.engine import Engine
+    from elliot_bot.hashing import verify_cache
+    from elliot_bot.sessions import get_sessions
+    from elliot_bot.transports import ConsoleTransport
+
+    devnull = open(os.devnull, 'w', encoding='utf-8')
+    results = {}
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(devnull):
+        users_store = store.get_users_store()
+    results["open"] = _ms(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    auth.get_new_user_name_id()
+    results["get_new_user_name_id_first"] = _ms(time.perf_counter() - start)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        auth.get_new_user_name_id()
+    results["get_new_user_name_id"] = _ms((time.perf_counter() - start) / repeat)
+
+    timings = []
+    for number in range(saves):
+        user_id = auth.get_new_user_name_id()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(devnull):
+            auth.save_user(user_id, f"bench_save_{number}", PASSWORD)
+        timings.append(time.perf_counter() - start)
+    results["save_user"] = _ms(sum(timings) / len(timings))
+    encoded = users_store.find_by_login("user1")[1]["password"]
+    timings = []
+    for number in range(saves):
+        user_id = auth.get_new_user_name_id()
+        start = time.perf_counter()
+        auth._store_user(user_id, f"bench_store_{number}", encoded)
+        timings.append(time.perf_counter() - start)
+    results["save_user_without_hash"] = _ms(sum(timings) / len(timings))
+
+    rng = random.Random(size)
+    timings = []
+    for _ in range(repeat):
+        login = f"user{rng.randint(1, size)}"
+        verify_cache.clear()  # Каждый вход - с настоящей проверкой KDF
+        with contextlib.redirect_stdout(devnull), \
+                _fed_stdin([login, PASSWORD]):
+            start = time.perf_counter()
+            user = auth.login_user()
+            timings.append(time.perf_counter() - start)
+        assert user is not None, login
+    results["login_user_first"] = _ms(timings[0])
+    results["login_user"] = _ms(sum(timings[1:] or timings) / max(1, len(timings) - 1))
+
+    tokens = [get_sessions().issue(user) for _ in range(repeat)]
+    start = time.perf_counter()
+    for token in tokens:
+        assert get_sessions().resume(token) is not None
+    results["resume"] = _ms((time.perf_counter() - start) / repeat)
+
+    timings = []
+    for _ in range(repeat):
+        login = f"user{rng.randint(1, size)}"
+        verify_cache.clear()
+        script = "".join(line.format(login=login) + "\n" for line in SESSION_SCRIPT)
+        transport = ConsoleTransport(stdin=io.StringIO(script), stdout=devnull)
+        start = time.perf_counter()
+        asyncio.run(Engine().serve(transport))
+        timings.append(time.perf_counter() - start)
+    results["session"] = _ms(sum(timings) / len(timings))
+
+    # Последняя сессия запомнила ключ в HOME - дальше вход пунктом 4
+    timings = []
+    for _ in range(repeat):
+        script = "".join(line + "\n" for line in ["4"] + SESSION_SCRIPT[3:])
+        transport = ConsoleTransport(stdin=io.StringIO(script), stdout=devnull)
+        start = time.perf_counter()
+        asyncio.run(Engine().serve(transport))
+        timings.append(time.perf_counter() - start)
+    results["session_resumed"] = _ms(sum(timings) / len(timings))
+
+    users_store.close()
+    return results
+
+
+@contextlib.contextmanager
+def _fed_stdin(lines):
+    old_stdin = sys.stdin
+    sys.stdin = io.StringIO("".join(line + "\n" for line in lines))
+    try:
+        yield
+    finally:
+        sys.stdin = old_stdin
+
+
+def run_child(size, backend, paths, repeat, saves):
+    """Запускает замеры в новом процессе с копией базы в чистой домашней папке"""
+    with tempfile.TemporaryDirectory() as home:
+        if backend == "json":
+            shutil.copy(paths[0], os.path.join(home, "elliot_users.json"))
+        else:
+            shutil.copy(paths[1], os.path.join(home, "elliot_users.jsonl"))
+        env = dict(os.environ, HOME=home, USERPROFILE=home, ELLIOT_STORE=backend)
+        env.pop("ELLIOT_METRICS", None)
+        # Замеряем сам вход, а не ограничение частоты попыток
+        env.update(ELLIOT_LOGIN_ATTEMPTS="1000000", ELLIOT_SOURCE_ATTEMPTS="1000000")
+        command = [sys.executable, os.path.abspath(__file__), "--child", str(size), backend,
+                   "--repeat", str(repeat), "--saves", str(saves)]
+        result = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise SystemExit(result.stderr)
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def compare(old, new, threshold):
+    """Строки о замерах, которые стали медленнее больше чем на threshold процентов"""
+    old_rows = {(row["size"], row["backend"], row["metric"]): row["ms"] for row in old["results"]}
+    slower = []
+    for row in new["results"]:
+        before = old_rows.get((row["size"], row["backend"], row["metric"]))
+        if before and row["ms"] > before * (1 + threshold / 100):
+            slower.append(f"{row['size']:>8} {row['backend']:<5} {row['metric']:<28}"
+                          f"{before:>10} -> {row['ms']} мс")
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,100000", help="размеры баз через запятую")
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--repeat", type=int, default=20, help="повторов входа, сессии и id")
+    parser.add_argument("--saves", type=int, default=5, help="сколько раз вызвать save_user")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "elliot_bench"),
+                        help="куда сохранять сгенерированные базы (переиспользуются)")
+    parser.add_argument("--output", help="записать результат в JSON-файл")
+    parser.add_argument("--compare", help="сравнить с прошлым JSON-результатом")
+    parser.add_argument("--threshold", type=float, default=20.0, help="допустимое замедление, %%")
+    parser.add_argument("--json", action="store_true", help="вывод в JSON")
+    parser.add_argument("--child", nargs=2, metavar=("SIZE", "BACKEND"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(int(args.child[0]), args.child[1], args.repeat, args.saves)))
+        return
+
+    from elliot_bot import __version__
+    from elliot_bot.hashing import PASSWORD_HASHER, hash_password
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    password_hash = hash_password(PASSWORD)
+    report = {
+        "version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "hasher": PASSWORD_HASHER,
+        "results": [],
+    }
+    for size in (int(size) for size in args.sizes.split(",")):
+        start = time.perf_counter()
+        paths = generate(args.data_dir, size, password_hash)
+        if not args.json:
+            print(f"база на {size} пользователей: {time.perf_counter() - start:.1f} с", file=sys.stderr)
+        for backend in args.backends.split(","):
+            for metric, ms in run_child(size, backend, paths, args.repeat, args.saves).items():
+                report["results"].append({"size": size, "backend": backend, "metric": metric, "ms": ms})
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print(f"{'размер':>8} {'база':<5} {'замер':<28}{'мс':>10}")
+        for row in report["results"]:
+            print(f"{row['size']:>8} {row['backend']:<5} {row['metric']:<28}{row['ms']:>10}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            slower = compare(json.load(f), report, args.threshold)
+        if slower:
+            print(f"Медленнее больше чем на {args.threshold}%:", file=sys.stderr)
+            for line in slower:
+                print(line, file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
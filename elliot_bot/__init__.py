@@ -0,0 +1,21 @@
+"""
+Бот Эллиот.
+
+Импорт пакета ничего не печатает и не трогает базу: база открывается
+при первом обращении (store.get_users_store), а бот запускается через main().
+"""
+from .errors import (
+    ElliotBotError,
+    InvalidCommandError,
+    MathError,
+    NotFoundFunctionError,
+    StoreError,
+    ValidationError,
+)
+
+__version__ = "3.1"
+
+
+def main():
+    from .app import main as run
+    run()
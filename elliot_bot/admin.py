@@ -0,0 +1,382 @@
+"""
+Массовые операции администратора: импорт и выгрузка пользователей.
+
+Форматы:
+    json  - как excamle_users_json: {"id": {"login", "password", "commands", "admin"}, ...};
+    jsonl - одна запись на строку: {"id": ..., "login": ...}, как в журнале elliot_users.jsonl.
+Формат берётся по расширению файла (.jsonl - jsonl, иначе json).
+
+Импорт читает файл потоково: JSON разбирается кусками по CHUNK_SIZE
+байт, и в памяти лежит только текущая пачка, так что файл на миллионы
+пользователей занимает постоянную память. В базу записи уходят пачками
+по IMPORT_BATCH_SIZE через store.add_many - в журнал это один write и
+один fsync на пачку. Пароли переносятся как есть (это уже хэши), логины,
+которые уже есть в базе, пропускаются. id по умолчанию выдаются новые;
+--keep-ids сохраняет id из файла, но только для пустой базы.
+
+Выгрузка тоже идёт по одной записи (LogUserStore.iter_users) и пишется
+во временный файл, который затем подменяет целевой.
+
+В боте (только администратор):
+    /users export путь.json        /users import путь.jsonl
+Из консоли, с прогрессом и скоростью:
+    python -m elliot_bot.admin import users.jsonl --keep-ids
+    python -m elliot_bot.admin export users.json
+"""
+import argparse
+import asyncio
+import codecs
+import json
+import os
+import sys
+import time
+
+from .engine import command
+from .errors import StoreError, ValidationError
+from .files import atomic_file
+from .metrics import timer
+
+
+FORMATS = ("json", "jsonl")
+CHUNK_SIZE = 1 << 16
+IMPORT_BATCH_SIZE = 1000
+# Как часто печатать прогресс, секунды
+PROGRESS_INTERVAL = 1.0
+
+
+def detect_format(path, fmt=None):
+    fmt = fmt or ("jsonl" if path.endswith(".jsonl") else "json")
+    if fmt not in FORMATS:
+        raise ValidationError(fmt, " или ".join(FORMATS))
+    return fmt
+
+
+class Progress:
+    """Печатает, сколько записей обработано и с какой скоростью, не чаще раза в interval секунд"""
+
+    def __init__(self, action, total_bytes=None, out=sys.stderr, interval=PROGRESS_INTERVAL):
+        self.action = action
+        self.total_bytes = total_bytes
+        self.out = out
+        self.interval = interval
+        self.records = 0
+        self.start = time.perf_counter()
+        self._last = self.start
+
+    def rate(self):
+        elapsed = time.perf_counter() - self.start
+        return self.records / elapsed if elapsed else 0.0
+
+    def update(self, records, position=None):
+        self.records = records
+        now = time.perf_counter()
+        if self.out is None or now - self._last < self.interval:
+            return
+        self._last = now
+        done = ""
+        if position is not None and self.total_bytes:
+            done = f", {100 * position / self.total_bytes:.1f}%"
+        self.out.write(f"{self.action}: {records} записей{done}, {self.rate():.0f} записей/с\n")
+        self.out.flush()
+
+    def finish(self, records):
+        self.records = records
+        if self.out is not None:
+            self.out.write(f"{self.action}: {records} записей за {time.perf_counter() - self.start:.1f} с "
+                           f"({self.rate():.0f} записей/с)\n")
+            self.out.flush()
+
+
+class _StreamReader:
+    """Текст файла кусками: буфер, позиция в нём и сколько байт прочитано"""
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.bytes_read = 0
+        self.eof = False
+
+    def read_more(self):
+        if self.eof:
+            return False
+        data = self.f.read(self.chunk_size)
+        self.bytes_read += len(data)
+        if not data:
+            self.eof = True
+        # Разобранное уже не нужно - держим в памяти только хвост
+        self.buffer = self.buffer[self.pos:] + self.decoder.decode(data, final=self.eof)
+        self.pos = 0
+        return True
+
+    def skip_spaces(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self.read_more():
+                return
+
+    def peek(self):
+        self.skip_spaces()
+        return self.buffer[self.pos] if self.pos < len(self.buffer) else ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"ожидалось '{char}' около байта {self.bytes_read}")
+        self.pos += 1
+
+
+def iter_json_users(f, path, on_position=None):
+    """Пары (id, запись) из файла в формате excamle_users_json, без чтения файла целиком"""
+    decoder = json.JSONDecoder()
+    reader = _StreamReader(f)
+
+    def value():
+        reader.skip_spaces()
+        while True:
+            try:
+                result, end = decoder.raw_decode(reader.buffer, reader.pos)
+            except json.JSONDecodeError:
+                # Значение не поместилось в буфер - дочитываем, пока файл не кончится
+                if not reader.read_more():
+                    raise
+                continue
+            reader.pos = end
+            return result
+
+    try:
+        reader.expect("{")
+        if reader.peek() == "}":
+            return
+        while True:
+            user_id = value()
+            if not isinstance(user_id, str):
+                raise ValueError(f"id должен быть строкой около байта {reader.bytes_read}")
+            reader.expect(":")
+            yield user_id, value()
+            if on_position is not None:
+                on_position(reader.bytes_read)
+            if reader.peek() == "}":
+                return
+            reader.expect(",")
+    except ValueError as error:
+        raise StoreError(path, str(error))
+
+
+def iter_jsonl_users(f, path, on_position=None):
+    """Пары (id, запись) из JSON Lines; строки без "id" (заголовок снимка журнала) пропускаются"""
+    position = 0
+    for line in f:
+        position += len(line)
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            raise StoreError(path, f"байт {position - len(line)}: {error}")
+        if isinstance(record, dict) and "id" not in record:
+            continue
+        user_id = record.pop("id") if isinstance(record, dict) else None
+        yield str(user_id), record
+        if on_position is not None:
+            on_position(position)
+
+
+def _valid(record):
+    return (isinstance(record, dict)
+            and isinstance(record.get("login"), str) and record["login"]
+            and isinstance(record.get("password"), str))
+
+
+def _normalized(record):
+    return {
+        **record,
+        "commands": record.get("commands") or {},
+        "admin": bool(record.get("admin", False)),
+    }
+
+
+def import_users(store, path, fmt=None, keep_ids=False, batch_size=IMPORT_BATCH_SIZE, progress=None):
+    """
+    Загружает пользователей из файла в store пачками по batch_size.
+    Возвращает {"imported", "skipped", "invalid", "seconds"}: skipped - логин
+    уже занят, invalid - запись без login/password.
+    """
+    fmt = detect_format(path, fmt)
+    if keep_ids and next(iter(store.iter_users()), None) is not None:
+        raise ValidationError("--keep-ids", "пустая база: id из файла могут совпасть с существующими")
+    reader = iter_json_users if fmt == "json" else iter_jsonl_users
+    counts = {"imported": 0, "skipped": 0, "invalid": 0}
+    start = time.perf_counter()
+    batch = []
+    batch_logins = set()
+    max_id = 0
+    position = [0]
+
+    def flush():
+        if not keep_ids:
+            for index, user_id in enumerate(store.next_ids(len(batch))):
+                batch[index] = (user_id, batch[index][1])
+        with timer("import_batch"):
+            store.add_many(batch)
+        counts["imported"] += len(batch)
+        batch.clear()
+        batch_logins.clear()
+        if progress is not None:
+            progress.update(counts["imported"], position[0])
+
+    with open(path, 'rb') as f:
+        for user_id, record in reader(f, path, lambda at: position.__setitem__(0, at)):
+            if not _valid(record):
+                counts["invalid"] += 1
+                continue
+            login = record["login"]
+            if login in batch_logins or store.find_by_login(login) is not None:
+                counts["skipped"] += 1
+                continue
+            if keep_ids and user_id.isdigit():
+                max_id = max(max_id, int(user_id))
+            # Без --keep-ids id выдаются всей пачке сразу, в flush
+            batch.append((user_id, _normalized(record)))
+            batch_logins.add(login)
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+
+    if keep_ids and max_id:
+        store.advance_ids(max_id + 1)
+    if progress is not None:
+        progress.finish(counts["imported"])
+    counts["seconds"] = round(time.perf_counter() - start, 3)
+    return counts
+
+
+def _write_json(f, users, on_record):
+    # Тот же вид, что у json.dump(users, indent=2), но по одной записи
+    count = 0
+    f.write("{")
+    for user_id, record in users:
+        body = json.dumps(record, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+        f.write(("\n" if count == 0 else ",\n") + f"  {json.dumps(user_id, ensure_ascii=False)}: {body}")
+        count += 1
+        on_record(count)
+    f.write("\n}" if count else "}")
+    return count
+
+
+def _write_jsonl(f, users, on_record):
+    count = 0
+    for user_id, record in users:
+        f.write(json.dumps({"id": user_id, **record}, ensure_ascii=False) + "\n")
+        count += 1
+        on_record(count)
+    return count
+
+
+def export_users(store, path, fmt=None, progress=None):
+    """Выгружает всех пользователей в файл; возвращает {"exported", "seconds"}"""
+    fmt = detect_format(path, fmt)
+    writer = _write_json if fmt == "json" else _write_jsonl
+    start = time.perf_counter()
+
+    def on_record(count):
+        if progress is not None:
+            progress.update(count)
+
+    with atomic_file(path, 'w') as f:
+        count = writer(f, store.iter_users(), on_record)
+    if progress is not None:
+        progress.finish(count)
+    return {"exported": count, "seconds": round(time.perf_counter() - start, 3)}
+
+
+def _в_отдельной_базе(действие, путь):
+    """
+    Импорт или выгрузка в потоке, со своим экземпляром базы: объекты
+    хранилища не рассчитаны на несколько потоков, а отдельный экземпляр
+    берёт те же файловые блокировки, что и другой процесс бота.
+    """
+    from .store import STORE_BACKEND, STORE_BACKENDS
+
+    store_class, path = STORE_BACKENDS[STORE_BACKEND]
+    store = store_class(path)
+    try:
+        if действие == "export":
+            return export_users(store, путь)
+        return import_users(store, путь)
+    finally:
+        store.close()
+
+
+@command("/users")
+async def пользователи(session, аргумент):
+    """Импорт и выгрузка пользователей: /users export файл.json, /users import файл.jsonl (только для администратора)"""
+    if not session.user.get("is_admin"):
+        session.say("Эта команда только для администратора")
+        return
+    действие, _, путь = аргумент.partition(" ")
+    путь = os.path.expanduser(путь.strip())
+    if действие not in ("import", "export") or not путь:
+        session.say("Напишите: /users export файл.json или /users import файл.jsonl")
+        return
+    from .store import JsonUserStore, get_users_store
+
+    try:
+        if isinstance(get_users_store(), JsonUserStore):
+            # Старый формат переписывает файл целиком из своей копии в памяти,
+            # второй экземпляр затёр бы записи - здесь по-прежнему без потока
+            итог = (export_users if действие == "export" else import_users)(get_users_store(), путь)
+        else:
+            # Большой файл не должен останавливать остальные сессии
+            итог = await asyncio.to_thread(_в_отдельной_базе, действие, путь)
+    except OSError as error:
+        session.say(f"Не удалось открыть файл: {error}")
+        return
+    except (StoreError, ValidationError) as elliot_bot_error_1:
+        session.say(f" {elliot_bot_error_1}")
+        return
+    if действие == "export":
+        session.say(f"Выгружено {итог['exported']} пользователей в {путь} за {итог['seconds']} с")
+        return
+    session.say(f"Импортировано {итог['imported']} пользователей за {итог['seconds']} с, "
+                f"пропущено (логин занят) {итог['skipped']}, с ошибками {итог['invalid']}")
+
+
+def main(argv=None):
+    from .store import get_users_store
+
+    parser = argparse.ArgumentParser(prog="python -m elliot_bot.admin",
+                                     description="Импорт и выгрузка пользователей")
+    parser.add_argument("action", choices=("import", "export"))
+    parser.add_argument("path", help="файл .json (как excamle_users_json) или .jsonl")
+    parser.add_argument("--format", choices=FORMATS, help="формат, если не подходит расширение")
+    parser.add_argument("--keep-ids", action="store_true", help="сохранить id из файла (только в пустую базу)")
+    parser.add_argument("--batch", type=int, default=IMPORT_BATCH_SIZE, help="записей в одной пачке")
+    parser.add_argument("--quiet", action="store_true", help="без прогресса")
+    args = parser.parse_args(argv)
+
+    store = get_users_store()
+    try:
+        if args.action == "import":
+            total = os.path.getsize(args.path)
+            progress = Progress("Импорт", total, out=None if args.quiet else sys.stderr)
+            итог = import_users(store, args.path, args.format, args.keep_ids, args.batch, progress)
+            print(f"Импортировано: {итог['imported']}, пропущено (логин занят): {итог['skipped']}, "
+                  f"с ошибками: {итог['invalid']}")
+        else:
+            progress = Progress("Выгрузка", out=None if args.quiet else sys.stderr)
+            итог = export_users(store, args.path, args.format, progress)
+            print(f"Выгружено: {итог['exported']}")
+    except (OSError, StoreError, ValidationError) as error:
+        print(f"Ошибка: {error}", file=sys.stderr)
+        return 1
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+import argparse
+
+
+def main(argv=None):
+    """Точка входа: консольная сессия или сервер на много сессий (--tcp)"""
+    # Движок и транспорты тянут asyncio - импортируем при запуске, а не при импорте пакета
+    import asyncio
+
+    from .engine import Engine
+    from .store import get_users_store
+    from .transports import ConsoleTransport, TcpTransport
+
+    parser = argparse.ArgumentParser(prog="elliot_bot", description="Бот Эллиот")
+    parser.add_argument("--tcp", metavar="HOST:PORT",
+                        help="обслуживать много сессий по TCP вместо консоли")
+    args = parser.parse_args(argv)
+
+    # Открываем базу сразу при запуске, как и раньше, а не при импорте
+    get_users_store()
+
+    if args.tcp:
+        host, _, port = args.tcp.rpartition(":")
+        transport = TcpTransport(host or "127.0.0.1", int(port))
+        print(f"Бот Эллиот слушает {transport.host}:{transport.port}")
+    else:
+        transport = ConsoleTransport()
+
+    try:
+        asyncio.run(Engine().serve(transport))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,270 @@
+import asyncio
+
+from .engine import command, state
+from .errors import NotFoundFunctionError
+from .hashing import hash_password, hash_pool, needs_rehash, verify_password
+from .metrics import count, timed, timer
+from .ratelimit import check_login, login_limiter
+from .sessions import SESSION_TTL, forget_token, get_sessions, remember_token, remembered_token
+from .store import get_users_store
+from .transports import ConsoleTransport
+
+
+def _store_user(user_id, login, hashed_password, is_admin=False):
+    get_users_store().add(user_id, {
+        "login": login,
+        "password": hashed_password,
+        "commands": {},
+        "admin": is_admin
+    })
+
+
+@timed("save_user")
+def save_user(user_id, login, password, is_admin=False):
+    # Хэшируем пароль перед сохранением
+    hashed_password = hash_password(password)
+    _store_user(user_id, login, hashed_password, is_admin)
+    print(f"Пользователь {login} сохранён с ID: {user_id}")
+
+def get_new_user_name_id():
+    return get_users_store().next_id()
+
+def _user_info(user_id, user_data):
+    return {
+        "id": user_id,
+        "login": user_data["login"],
+        "is_admin": user_data.get("admin", False)
+    }
+
+@timed("login")
+def authenticate(login, password):
+    """Проверяет логин и пароль без ввода с клавиатуры. Возвращает данные пользователя или None"""
+    users_store = get_users_store()
+    found = users_store.find_by_login(login)
+    if found is None:
+        return None
+    user_id, user_data = found
+    if not verify_password(password, user_data["password"]):
+        return None
+    # Старый хэш или поменялась стоимость - тихо перехэшируем
+    if needs_rehash(user_data["password"]):
+        users_store.add(user_id, {**user_data, "password": hash_password(password)})
+    return _user_info(user_id, user_data)
+
+@timed("login")
+async def authenticate_async(login, password):
+    """
+    То же, что authenticate, но KDF считается в пуле потоков,
+    а база читается в потоке event loop.
+    """
+    users_store = get_users_store()
+    found = users_store.find_by_login(login)
+    if found is None:
+        return None
+    user_id, user_data = found
+    loop = asyncio.get_running_loop()
+    if not await loop.run_in_executor(hash_pool(), verify_password, password, user_data["password"]):
+        return None
+    if needs_rehash(user_data["password"]):
+        new_hash = await loop.run_in_executor(hash_pool(), hash_password, password)
+        users_store.add(user_id, {**user_data, "password": new_hash})
+    return _user_info(user_id, user_data)
+
+def login_user():
+    print(" ВХОД В СИСТЕМУ ")
+
+    for попытка in range(3):
+        print(f"Попытка {попытка + 1} из 3")
+        login = input("Логин: ")
+        password = input("Пароль: ")
+
+        wait = check_login(login, ConsoleTransport.SESSION_ID)
+        if wait:
+            count("logins", result="throttled")
+            print(f"Слишком много попыток входа. Попробуйте через {wait:.0f} с")
+            return None
+        user_data = authenticate(login, password)
+        count("logins", result="ok" if user_data is not None else "fail")
+        if user_data is not None:
+            login_limiter.reset(login)
+            print(f"Успешный вход! Привет, {login}!")
+            if user_data["is_admin"]:
+                print("Вы вошли как Администратор Бота")
+            return user_data
+
+        print("Неверный логин или пароль!")
+
+    print("Слишком много неудачных попыток.")
+    return None
+
+
+# Состояния сессии: вход и регистрация
+def _в_консоли(session):
+    return session.id == ConsoleTransport.SESSION_ID
+
+
+def _auth_menu(session):
+    session.say("ВХОД / РЕГИСТРАЦИЯ")
+    session.say("1 - Вход в аккаунт")
+    session.say("2 - Регистрация")
+    session.say("3 - Выход")
+    # Консоль помнит ключ с прошлого раза: если он ещё действует, вход - одной цифрой
+    ключ = remembered_token() if _в_консоли(session) else None
+    пользователь = get_sessions().resume(ключ) if ключ else None
+    if пользователь is not None:
+        session.data["сохранённый_ключ"] = ключ
+        session.say(f"4 - Продолжить как {пользователь['login']}")
+    else:
+        session.data.pop("сохранённый_ключ", None)
+        session.say("4 - Войти по ключу сессии")
+
+
+def _выдать_ключ(session):
+    """Новая сессия после входа по паролю или регистрации"""
+    ключ = get_sessions().issue(session.user)
+    session.data["ключ"] = ключ
+    дней = max(1, SESSION_TTL // 86400)
+    if _в_консоли(session):
+        remember_token(ключ)
+        session.say(f"Вход запомнен на {дней} дн.: в следующий раз выберите 4")
+    else:
+        session.say(f"Ключ сессии на {дней} дн. (пункт 4 при входе): {ключ}")
+
+
+def _войти_по_ключу(session, ключ):
+    user_data = get_sessions().resume(ключ)
+    count("logins", result="resume" if user_data is not None else "fail")
+    if user_data is None:
+        if _в_консоли(session):
+            forget_token()
+        session.say("Ключ сессии недействителен или истёк, войдите по паролю")
+        return "auth"
+    session.user = user_data
+    session.data["ключ"] = ключ
+    session.say(f"С возвращением, {user_data['login']}!")
+    if user_data["is_admin"]:
+        session.say("Вы вошли как Администратор Бота")
+    return "tell"
+
+
+@state("auth", prompt="Выберите (1-4): ", enter=_auth_menu)
+def выбор_входа(session, line):
+    выбор = line.strip()
+
+    if выбор == "1":
+        session.say(" ВХОД В СИСТЕМУ ")
+        session.data["попытка"] = 0
+        return "login"
+
+    if выбор == "2":
+        session.say("РЕГИСТРАЦИЯ")
+        session.say("Создайте имя пользователю:")
+        return "register_login"
+
+    if выбор == "3":
+        session.say("До свидания!")
+        return None
+
+    if выбор == "4":
+        if "сохранённый_ключ" in session.data:
+            return _войти_по_ключу(session, session.data.pop("сохранённый_ключ"))
+        return "token"
+
+    session.say(f"Ошибка: {NotFoundFunctionError(выбор)}")
+    session.say("Пожалуйста, выберите 1, 2, 3 или 4")
+    return "auth"
+
+
+@state("token", prompt="Ключ сессии: ")
+def ввод_ключа(session, line):
+    return _войти_по_ключу(session, line)
+
+
+def _attempt(session):
+    session.say(f"Попытка {session.data['попытка'] + 1} из 3")
+
+
+@state("login", prompt="Логин: ", enter=_attempt)
+def ввод_логина(session, line):
+    session.data["логин"] = line
+    return "password"
+
+
+@state("password", prompt="Пароль: ")
+async def ввод_пароля(session, line):
+    login = session.data.pop("логин")
+    # Отказ - раньше, чем база и хэш: перебор паролей почти ничего не стоит
+    wait = check_login(login, session.source)
+    if wait:
+        count("logins", result="throttled")
+        session.say(f"Слишком много попыток входа. Попробуйте через {wait:.0f} с")
+        return "auth"
+    user_data = await authenticate_async(login, line)
+    count("logins", result="ok" if user_data is not None else "fail")
+    if user_data is not None:
+        login_limiter.reset(login)
+        session.user = user_data
+        session.say(f"Успешный вход! Привет, {user_data['login']}!")
+        if user_data["is_admin"]:
+            session.say("Вы вошли как Администратор Бота")
+        _выдать_ключ(session)
+        return "tell"
+
+    session.say("Неверный логин или пароль!")
+    session.data["попытка"] += 1
+    if session.data["попытка"] < 3:
+        return "login"
+    session.say("Слишком много неудачных попыток.")
+    session.say("Вход не удался. Попробуйте снова или зарегистрируйтесь.")
+    return "auth"
+
+
+@state("register_login", prompt=">")
+def регистрация_логина(session, line):
+    if get_users_store().find_by_login(line) is not None:
+        session.say("Такой логин уже занят, выберите другой")
+        return "auth"
+    session.data["логин"] = line
+    session.say("Теперь пароль пользователю:")
+    return "register_password"
+
+
+@state("register_password", prompt=">")
+async def регистрация_пароля(session, line):
+    user_name = session.data.pop("логин")
+    loop = asyncio.get_running_loop()
+    hashed_password = await loop.run_in_executor(hash_pool(), hash_password, line)
+    # Пока считался хэш, этот логин мог занять кто-то из другой сессии
+    if get_users_store().find_by_login(user_name) is not None:
+        session.say("Такой логин уже занят, выберите другой")
+        return "auth"
+    user_name_id = get_new_user_name_id()
+    with timer("save_user"):
+        _store_user(user_name_id, user_name, hashed_password)
+
+    session.say(f"Пользователь {user_name} сохранён с ID: {user_name_id}")
+    session.say(f"Вы зарегистрировались, теперь {user_name} вы есть в Бот Эллиоте")
+    session.say(f"Ваш уникальный айди: {user_name_id}")
+    session.user = {
+        "id": user_name_id,
+        "login": user_name,
+        "is_admin": False
+    }
+    _выдать_ключ(session)
+    return "tell"
+
+
+@command("/logout")
+def выйти(session, аргумент):
+    """Выйти из аккаунта: ключ сессии перестаёт действовать"""
+    from .history import flush_user
+
+    ключ = session.data.pop("ключ", None)
+    if ключ:
+        get_sessions().revoke(ключ)
+    if _в_консоли(session):
+        forget_token()
+    flush_user(session.user)
+    session.say(f"До встречи, {session.user['login']}!")
+    session.user = None
+    session.state = "auth"
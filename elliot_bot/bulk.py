@@ -0,0 +1,211 @@
+"""
+Одна операция сразу над списками чисел: 1 2 3 + 4 5 6 -> 5 7 9.
+
+Числа хранятся в array (int64 или double), а операция применяется
+поэлементно через map, без цикла на Python. Если установлен NumPy и
+список длинный, считает NumPy. Деление на ноль не прерывает весь
+расчёт: для такого элемента результата нет, а MathError записывается
+в errors под его номером.
+
+Из CSV-файла можно взять две колонки:
+    python -m elliot_bot.bulk / данные.csv --columns 0 1
+"""
+import argparse
+import csv
+import operator
+import re
+import sys
+from array import array
+
+from . import numeric
+from .errors import MathError, ValidationError
+
+
+# Номер операции из меню Математики -> (знак, функция)
+OPERATIONS = {
+    "1": ("+", operator.add),
+    "2": ("-", operator.sub),
+    "3": ("*", operator.mul),
+    "4": ("÷", operator.truediv),
+}
+# Знаки, которые понимает командная строка
+SIGNS = {"+": "1", "-": "2", "*": "3", "/": "4", "÷": "4"}
+# Короче этого NumPy не быстрее: перевод в ndarray и обратно дороже самого расчёта
+NUMPY_MIN_SIZE = 1000
+# Целые до этого предела можно умножать в int64 без переполнения
+_SAFE_INT = 2 ** 31
+
+# Запятая - не разделитель, а десятичная точка (1,5), как и в calc.py
+_SEPARATORS = re.compile(r"[\s;]+")
+_numpy = False  # False - ещё не пробовали импортировать
+
+
+def _get_numpy():
+    """NumPy импортируется при первом длинном списке: на старт бота он не влияет"""
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy = numpy
+    return _numpy
+
+
+class BulkResult:
+    def __init__(self, sign, left, right, values, errors):
+        self.sign = sign
+        self.left = left
+        self.right = right
+        self.values = values
+        self.errors = errors
+
+    def __len__(self):
+        return len(self.values)
+
+    def lines(self):
+        """Строки вида "1 + 4 = 5" или "1 ÷ 0 : ошибка" для каждого элемента"""
+        for index, value in enumerate(self.values):
+            prefix = f"{self.left[index]} {self.sign} {self.right[index]}"
+            if index in self.errors:
+                yield f"{prefix} : {self.errors[index]}"
+            else:
+                yield f"{prefix} = {numeric.format_number(value)}"
+
+
+def parse_number(text):
+    """Число из строки в виде текущего числового движка (см. numeric.py); 1,5 - это 1.5"""
+    try:
+        return numeric.parse_number(text.replace(",", "."))
+    except (ValueError, ArithmeticError):
+        raise ValidationError(text.strip(), "число")
+
+
+def parse_numbers(text):
+    """Список чисел через пробел или точку с запятой"""
+    return [parse_number(part) for part in _SEPARATORS.split(text.strip()) if part]
+
+
+def to_array(numbers):
+    """
+    Компактное хранение: int64 для целых, double если есть дробные.
+    Decimal, Fraction и очень большие целые остаются списком, чтобы не потерять точность.
+    """
+    types = set(map(type, numbers))
+    if types <= {int}:
+        try:
+            return array('q', numbers)
+        except OverflowError:
+            return list(numbers)
+    if types <= {int, float}:
+        return array('d', numbers)
+    return list(numbers)
+
+
+def _broadcast(left, right):
+    if len(right) == 1 and len(left) > 1:
+        right = right * len(left)
+    elif len(left) == 1 and len(right) > 1:
+        left = left * len(right)
+    if len(left) != len(right):
+        raise ValidationError(f"{len(left)} и {len(right)} чисел", "списки одной длины или одно число")
+    return left, right
+
+
+def _elementwise(sign, left, right, errors):
+    """По одному элементу через numeric.calculate: ошибка остаётся в своём элементе"""
+    values = []
+    calculate = numeric.calculate
+    for index, (a, b) in enumerate(zip(left, right)):
+        try:
+            values.append(calculate(sign, a, b, cache=None))
+        except MathError as error:
+            errors[index] = error
+            values.append(None)
+    return values
+
+
+def _fits_numpy(left, right):
+    """
+    NumPy считает без потерь: среди чисел есть дробные (и так float64)
+    или целые настолько малы, что произведение не переполнит int64.
+    Большие целые NumPy перевёл бы в float64 и потерял точность выше 2**53.
+    """
+    if left.typecode == 'd' or right.typecode == 'd':
+        return True
+    return max(map(abs, left)) < _SAFE_INT and max(map(abs, right)) < _SAFE_INT
+
+
+def _numpy_values(numpy, operation, left, right, errors):
+    fits_int64 = left.typecode == right.typecode == 'q'
+    dtype = numpy.int64 if fits_int64 and operation != "4" else numpy.float64
+    a = numpy.frombuffer(left, dtype=numpy.int64 if left.typecode == 'q' else numpy.float64).astype(dtype)
+    b = numpy.frombuffer(right, dtype=numpy.int64 if right.typecode == 'q' else numpy.float64).astype(dtype)
+    if operation != "4":
+        return OPERATIONS[operation][1](a, b).tolist()
+    zero = b == 0
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        values = (a / b).tolist()
+    for index in numpy.flatnonzero(zero).tolist():
+        errors[index] = MathError("Делить на ноль нельзя!")
+        values[index] = None
+    return values
+
+
+def bulk_operation(operation, left, right):
+    """
+    Применяет операцию 1-4 (или знак + - * /) к двум спискам поэлементно.
+    Если один из списков - одно число, оно применяется ко всем элементам другого.
+    """
+    operation = SIGNS.get(operation, operation)
+    if operation not in OPERATIONS:
+        raise ValidationError(operation, "1-4 или + - * /")
+    numbers_1, numbers_2 = _broadcast(list(left), list(right))
+    left, right = to_array(numbers_1), to_array(numbers_2)
+
+    errors = {}
+    numpy = _get_numpy() if len(left) >= NUMPY_MIN_SIZE else None
+    if (numpy is not None and isinstance(left, array) and isinstance(right, array)
+            and _fits_numpy(left, right)):
+        values = _numpy_values(numpy, operation, left, right, errors)
+    elif operation == "4" or not isinstance(left, array) or not isinstance(right, array):
+        values = _elementwise(OPERATIONS[operation][0], left, right, errors)
+    else:
+        values = list(map(OPERATIONS[operation][1], left, right))
+    # В ответе числа такие, как их ввели: 2, а не 2.0 из массива double
+    return BulkResult(OPERATIONS[operation][0], numbers_1, numbers_2, values, errors)
+
+
+def read_csv_columns(path, columns=(0, 1)):
+    """Две колонки чисел из CSV. Строки, где не числа (например, заголовок), пропускаются"""
+    left, right = [], []
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.reader(f):
+            try:
+                a, b = parse_number(row[columns[0]]), parse_number(row[columns[1]])
+            except (IndexError, ValidationError):
+                continue
+            left.append(a)
+            right.append(b)
+    return left, right
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m elliot_bot.bulk",
+                                     description="Операция над двумя колонками CSV")
+    parser.add_argument("operation", help="+ - * / или 1-4")
+    parser.add_argument("path", help="CSV-файл")
+    parser.add_argument("--columns", type=int, nargs=2, default=(0, 1), metavar=("A", "B"))
+    args = parser.parse_args(argv)
+
+    left, right = read_csv_columns(args.path, args.columns)
+    if not left:
+        print("В файле нет строк с числами")
+        return 1
+    result = bulk_operation(args.operation, left, right)
+    sys.stdout.write("".join(line + "\n" for line in result.lines()))
+    return 1 if result.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""
+Вычисление арифметических выражений целиком: 2+3*(4-1), -2**3, 7/2.
+
+Выражение разбирается модулем ast, и вычисляются только числа, скобки,
++ - * / // % и степень. eval не используется, имена, вызовы и атрибуты
+запрещены. Знаки ÷, × и ^ понимаются как /, * и **.
+
+Пакетный режим читает выражения по одному на строку из файлов или stdin
+и сразу пишет результаты:
+    python -m elliot_bot.calc задачи.txt
+    echo "2+2" | python -m elliot_bot.calc
+"""
+import ast
+import decimal
+import operator
+import re
+import sys
+from fractions import Fraction
+
+from . import numeric
+from .errors import MathError, ValidationError
+from .numeric import MAX_RESULT_BITS, MAX_RESULT_DIGITS, too_long
+
+
+MAX_EXPRESSION_LENGTH = 1000
+# Больше - слишком долго считать и печатать
+MAX_EXPONENT = 10_000
+NOT_REAL = "результат не определён или не вещественное число"
+
+_BINARY = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+_UNARY = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+_REPLACEMENTS = str.maketrans({"÷": "/", "×": "*", "^": "**", ",": "."})
+# Пробелы вокруг знаков и скобок: "2 + 2" и "2+2" - одна задача. Но "2 3" - не 23,
+# а "2 * * 3" - не 2**3, поэтому пробел между двумя числами или двумя знаками остаётся
+_SPACES = re.compile(r"\s+")
+_OPERAND = re.compile(r"[\w.]")
+_SIGNS = frozenset("+-*/%")
+
+
+def _normalize(expression):
+    return expression.strip().translate(_REPLACEMENTS)
+
+
+def _cache_text(expression):
+    text = _normalize(expression)
+
+    def space(match):
+        before = text[match.start() - 1]
+        after = text[match.end()]
+        if (_OPERAND.match(before) and _OPERAND.match(after)) or (before in _SIGNS and after in _SIGNS):
+            return " "
+        return ""
+
+    return _SPACES.sub(space, text)
+
+
+def parse(expression):
+    """Разбирает выражение в дерево ast или бросает ValidationError"""
+    text = _normalize(expression)
+    if not text or len(text) > MAX_EXPRESSION_LENGTH:
+        raise ValidationError(expression, "арифметическое выражение")
+    try:
+        return ast.parse(text, mode="eval").body
+    except SyntaxError:
+        raise ValidationError(expression, "арифметическое выражение")
+
+
+def _bit_length(number):
+    if isinstance(number, int):
+        return number.bit_length()
+    if isinstance(number, Fraction):
+        return max(number.numerator.bit_length(), number.denominator.bit_length())
+    return 0  # float и Decimal ограничены своей точностью
+
+
+def _evaluate(node, expression, text, engine):
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        source = ast.get_source_segment(text, node)
+        try:
+            return numeric.from_literal(node.value, source, engine)
+        except (ValueError, ArithmeticError):
+            raise ValidationError(source, "число")
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY:
+        return _UNARY[type(node.op)](_evaluate(node.operand, expression, text, engine))
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+        left = _evaluate(node.left, expression, text, engine)
+        right = _evaluate(node.right, expression, text, engine)
+        if isinstance(node.op, (ast.Div, ast.FloorDiv, ast.Mod)) and right == 0:
+            raise MathError("Делить на ноль нельзя!")
+        if isinstance(node.op, ast.Pow):
+            if abs(right) > MAX_EXPONENT:
+                raise MathError("Слишком большая степень", f"показатель не больше {MAX_EXPONENT}")
+            # Нижняя оценка длины: точно не поместится - не считаем вовсе
+            if abs(right) * (_bit_length(left) - 1) > MAX_RESULT_BITS:
+                raise MathError(expression, f"результат длиннее {MAX_RESULT_DIGITS} цифр")
+        try:
+            result = _BINARY[type(node.op)](left, right)
+        except (ZeroDivisionError, decimal.DivisionByZero):
+            raise MathError("Делить на ноль нельзя!")
+        except (OverflowError, decimal.Overflow):
+            raise MathError(expression, "слишком большое число")
+        except decimal.DecimalException:
+            # Например, 0**0 или корень из отрицательного: str() у них - имя класса в скобках
+            raise MathError(expression, NOT_REAL)
+        # float и Fraction дают комплексное число там, где Decimal бросает InvalidOperation
+        if isinstance(result, complex):
+            raise MathError(expression, NOT_REAL)
+        if isinstance(result, decimal.Decimal) and not result.is_finite():
+            raise MathError("Делить на ноль нельзя!")
+        if too_long(result):
+            raise MathError(expression, f"результат длиннее {MAX_RESULT_DIGITS} цифр")
+        return result
+    raise ValidationError(expression, "только числа, скобки и + - * / // % **")
+
+
+def evaluate(expression, engine=None, cache=numeric.result_cache):
+    """
+    Значение выражения в числовом движке engine (по умолчанию numeric.NUMBER_ENGINE).
+    Ошибки - ValidationError (не выражение) или MathError.
+    Готовые результаты берутся из cache (None - считать всегда заново).
+    """
+    engine = numeric.check_engine(engine)
+    if cache is None:
+        return _evaluate_expression(expression, engine)
+    key = (numeric.context_key(engine), _cache_text(expression))
+    found, result = cache.get(key)
+    if not found:
+        result = _evaluate_expression(expression, engine)
+        cache.put(key, result)
+    return result
+
+
+def _evaluate_expression(expression, engine):
+    node = parse(expression)
+    text = _normalize(expression)
+    if engine == "decimal":
+        # Операторы Decimal берут точность из текущего контекста
+        with decimal.localcontext(numeric.decimal_context()):
+            return _evaluate(node, expression, text, engine)
+    return _evaluate(node, expression, text, engine)
+
+
+def looks_like_expression(text):
+    """True, если в строке есть хотя бы одна операция, а не просто номер пункта меню"""
+    try:
+        node = parse(text)
+    except ValidationError:
+        return False
+    return isinstance(node, (ast.BinOp, ast.UnaryOp))
+
+
+def evaluate_lines(lines):
+    """Для каждой непустой строки отдаёт (выражение, результат, ошибка) - по мере чтения"""
+    for line in lines:
+        expression = line.strip()
+        if not expression or expression.startswith("#"):
+            continue
+        try:
+            yield expression, evaluate(expression), None
+        except (ValidationError, MathError) as error:
+            yield expression, None, error
+
+
+def main(argv=None):
+    """Пакетный режим: выражения из файлов (или stdin) -> результаты в stdout"""
+    paths = sys.argv[1:] if argv is None else argv
+    files = [open(path, 'r', encoding='utf-8') for path in paths] or [sys.stdin]
+    failed = 0
+    write = sys.stdout.write
+    try:
+        for f in files:
+            for expression, result, error in evaluate_lines(f):
+                if error is None:
+                    write(f"{expression} = {numeric.format_number(result)}\n")
+                else:
+                    failed += 1
+                    write(f"{expression} : {error}\n")
+    finally:
+        for f in files:
+            if f is not sys.stdin:
+                f.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""
+Каталог справочных текстов для функций 2-5.
+
+Тексты лежат в content.json по ключам "номер функции" -> "пункты" ->
+"номер пункта", поэтому их можно править без изменения кода меню.
+"команда" раздела и "ключи" пунктов - для быстрых команд вида /py basics.
+Каталог читается один раз при первом обращении, и каждый экран сразу
+склеивается в одну строку, чтобы вывести его за одну запись.
+"""
+import hashlib
+import json
+import os
+
+from .errors import StoreError
+
+
+CONTENT_FILE = os.environ.get(
+    "ELLIOT_CONTENT", os.path.join(os.path.dirname(os.path.abspath(__file__)), "content.json")
+)
+
+
+def _render(lines):
+    return "".join(line + "\n" for line in lines)
+
+
+def load_catalog(path=CONTENT_FILE):
+    """
+    Читает каталог и заранее склеивает меню и тексты пунктов в готовые строки.
+    Возвращает (каталог, sha256 файла) - по хэшу поиск понимает, что тексты поменялись.
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        raw = json.loads(data)
+    except (OSError, ValueError) as error:
+        raise StoreError(path, str(error))
+
+    catalog = {}
+    for номер, раздел in raw.items():
+        catalog[номер] = {
+            **раздел,
+            "меню": _render(раздел["меню"]),
+            "пункты": {
+                ключ: {"название": пункт["название"], "ключи": пункт.get("ключи", []),
+                       "текст": _render(пункт["текст"])}
+                for ключ, пункт in раздел["пункты"].items()
+            },
+        }
+    return catalog, hashlib.sha256(data).hexdigest()
+
+
+_catalog = None
+_catalog_hash = None
+
+
+def get_catalog():
+    global _catalog, _catalog_hash
+    if _catalog is None:
+        _catalog, _catalog_hash = load_catalog()
+    return _catalog
+
+
+def get_catalog_hash():
+    get_catalog()
+    return _catalog_hash
+
+
+def раздел(номер):
+    return get_catalog()[номер]
@@ -0,0 +1,223 @@
+"""
+Асинхронный движок сессий.
+
+Каждый разговор - это Session с текущим состоянием. Состояние знает,
+что напечатать при входе (enter), какой вопрос задать (prompt) и как
+обработать ответ (handle). handle возвращает имя следующего состояния
+или None, если разговор закончен. Обработчик может быть async, тогда
+на время тяжёлой работы (например, хэширования пароля) event loop
+обслуживает остальные сессии.
+
+Состояния регистрируются декоратором @state в модулях auth и menus,
+а состояния функций - в их модулях из functions/, когда те загружаются.
+Откуда приходят строки и куда уходят ответы, решает транспорт
+(см. transports.py), поэтому один процесс держит сразу много сессий.
+"""
+import asyncio
+import inspect
+import sys
+import traceback
+
+from .errors import ElliotBotError, InvalidCommandError, ValidationError
+from .metrics import timer
+from .output import FLUSH_POLICIES, FLUSH_POLICY, MAX_BUFFER_BYTES, batch_output
+
+
+STATES = {}
+COMMANDS = {}
+CLOSE_HANDLERS = []
+START_STATE = "auth"
+# Куда вернуться после непредвиденной ошибки: данные шага могли остаться наполовину
+MENU_STATE = "choose"
+GREETING = "Привет, я Бот Эллиот"
+
+
+class State:
+    def __init__(self, name, handle, prompt="", enter=None):
+        self.name = name
+        self.handle = handle
+        self.prompt = prompt
+        self.enter = enter
+
+
+def state(name, prompt="", enter=None):
+    """Регистрирует обработчик ответа для состояния name"""
+    def register(handle):
+        STATES[name] = State(name, handle, prompt, enter)
+        return handle
+    return register
+
+
+def command(name):
+    """
+    Регистрирует команду вида "/name аргументы". После входа её можно
+    набрать на любом шаге: движок выполнит команду и повторит текущий вопрос.
+    """
+    def register(handle):
+        COMMANDS[name] = handle
+        return handle
+    return register
+
+
+def on_close(handle):
+    """Регистрирует функцию handle(session), которая вызывается, когда сессия закончилась"""
+    CLOSE_HANDLERS.append(handle)
+    return handle
+
+
+class Session:
+    def __init__(self, session_id, source=None):
+        self.id = session_id
+        # Откуда сессия (IP для TCP) - по нему ограничиваются попытки входа
+        self.source = source or session_id
+        self.state = None
+        self.user = None
+        self.data = {}
+        self.done = False
+        self._outbox = []
+        self._queue = asyncio.Queue()
+        self._task = None
+
+    def say(self, text=""):
+        """Как print: строка с переводом строки"""
+        self._outbox.append(text + "\n")
+
+    def write(self, text):
+        """Готовый блок текста целиком, например экран из каталога"""
+        self._outbox.append(text)
+
+    def ask(self, prompt):
+        """Как приглашение в input: без перевода строки"""
+        self._outbox.append(prompt)
+
+    def take_output(self):
+        output = self._outbox
+        self._outbox = []
+        return output
+
+
+class Engine:
+    def __init__(self, states=None, start_state=START_STATE, menu_state=MENU_STATE, greeting=GREETING,
+                 flush_policy=FLUSH_POLICY, max_buffer_bytes=MAX_BUFFER_BYTES):
+        if flush_policy not in FLUSH_POLICIES:
+            raise ValidationError(flush_policy, ", ".join(FLUSH_POLICIES))
+        if states is None:
+            # Импорт регистрирует состояния входа и меню и команды
+            from . import admin, auth, menus, search, slash  # noqa: F401
+            states = STATES
+        self.states = states
+        self.commands = COMMANDS
+        self.start_state = start_state
+        self.menu_state = menu_state
+        self.greeting = greeting
+        self.flush_policy = flush_policy
+        self.max_buffer_bytes = max_buffer_bytes
+        self.sessions = {}
+        self.transport = None
+
+    async def _enter(self, session, name):
+        session.state = name
+        if name is None:
+            session.done = True
+            return
+        current = self.states[name]
+        if current.enter is not None:
+            current.enter(session)
+        prompt = current.prompt(session) if callable(current.prompt) else current.prompt
+        if prompt:
+            session.ask(prompt)
+
+    async def start(self, session):
+        if self.greeting:
+            session.say(self.greeting)
+        await self._enter(session, self.start_state)
+
+    async def _call(self, session, handle, *args):
+        """
+        Вызывает обработчик. Ошибка не должна убивать сессию: после
+        ElliotBotError повторяем текущий вопрос, после любой другой - пишем
+        её в stderr и возвращаемся в меню функций (или ко входу).
+        """
+        try:
+            result = handle(session, *args)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        except ElliotBotError as error:
+            session.say(f"Ошибка: {error}")
+            return session.state
+        except Exception as error:
+            traceback.print_exc(file=sys.stderr)
+            session.say(f"Что-то пошло не так: {error}")
+            return self.menu_state if session.user is not None else self.start_state
+
+    async def feed(self, session, line):
+        """Передаёт сессии одну строку ввода и переводит её в следующее состояние"""
+        if session.done:
+            return
+        if session.user is not None and line.startswith("/"):
+            name, _, argument = line.strip().partition(" ")
+            handle = self.commands.get(name)
+            if handle is None:
+                # Не передаём "/foo" шагу как обычный ответ - он принял бы его за номер или да/нет
+                session.say(f"Ошибка: {InvalidCommandError(name)}")
+                session.say("Список команд: /help")
+            else:
+                # Команда не трогает данные шага, поэтому и после ошибки повторяем текущий вопрос
+                await self._call(session, handle, argument.strip())
+            await self._enter(session, session.state)
+            return
+
+        current = self.states[session.state]
+        with timer("step", state=current.name):
+            next_state = await self._call(session, current.handle, line)
+            await self._enter(session, next_state)
+
+    async def _flush(self, session):
+        with timer("render", policy=self.flush_policy):
+            batches = batch_output(session.take_output(), self.flush_policy, self.max_buffer_bytes)
+            for batch in batches:
+                await self.transport.send(session.id, batch)
+
+    async def _run_session(self, session):
+        try:
+            await self.start(session)
+            await self._flush(session)
+            while not session.done:
+                with timer("input_wait"):
+                    line = await session._queue.get()
+                if line is None:
+                    break
+                await self.feed(session, line)
+                await self._flush(session)
+        finally:
+            self.sessions.pop(session.id, None)
+            for handle in CLOSE_HANDLERS:
+                handle(session)
+            # Сессия могла оборваться и не сама - транспорт всё равно закрываем
+            await self.transport.close_session(session.id)
+
+    def open_session(self, session_id, source=None):
+        session = Session(session_id, source)
+        self.sessions[session_id] = session
+        session._task = asyncio.create_task(self._run_session(session))
+        return session
+
+    async def serve(self, transport):
+        """Обслуживает все сессии транспорта, пока он не закроется"""
+        self.transport = transport
+        async for event, session_id, line in transport.events():
+            if event == "open":
+                # У события "open" вместо строки - источник сессии
+                self.open_session(session_id, line)
+            elif event == "line":
+                session = self.sessions.get(session_id)
+                if session is not None:
+                    session._queue.put_nowait(line)
+            elif event == "close":
+                session = self.sessions.get(session_id)
+                if session is not None:
+                    session._queue.put_nowait(None)
+        tasks = [session._task for session in self.sessions.values()]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
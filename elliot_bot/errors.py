@@ -0,0 +1,43 @@
+from . import metrics
+
+
+# Класс Ошибок для бота
+class ElliotBotError(Exception):
+    def __init__(self, message="Возникла ошибка"):
+        self.message = message
+        metrics.count("errors", type=type(self).__name__)
+        super().__init__(self.message)
+
+    def __str__(self):
+        return f"[ElliotBot Error] {self.message}"
+
+
+class InvalidCommandError(ElliotBotError):
+    def __init__(self, command):
+        super().__init__(f"Неизвестная команда боту команда: '{command}'")
+
+
+class NotFoundFunctionError(ElliotBotError):
+    def __init__(self, function_num):
+        super().__init__(f"Функция {function_num} не найдена")
+
+
+class ValidationError(ElliotBotError):
+    def __init__(self, value, expected):
+        super().__init__(f"Написано некорректно: '{value}'. Ожидалось : {expected}")
+
+
+class MathError(ElliotBotError):
+    def __init__(self, operation, details=""):
+        message = f"Возникла ошибка в математической операции '{operation}'"
+        if details:
+            message += f": {details}"
+        super().__init__(message)
+
+
+class StoreError(ElliotBotError):
+    def __init__(self, path, details=""):
+        message = f"Ошибка базы данных '{path}'"
+        if details:
+            message += f": {details}"
+        super().__init__(message)
@@ -0,0 +1,53 @@
+"""
+Атомарная запись файла целиком: данные пишутся во временный файл рядом
+с целевым, и он подменяет целевой через os.replace. Читатель видит либо
+старый файл, либо новый, но никогда не недописанный.
+
+fsync=True - вернуться только когда и данные, и сама подмена (запись в
+папке) уже на диске. Нужен для файлов, которые больше ниоткуда не
+восстановить: база, счётчик id, раскладка шардов. Кэшам, индексам и
+выгрузкам хватает атомарности.
+"""
+import contextlib
+import os
+
+
+def fsync_dir(path):
+    """Синхронизирует папку файла path, чтобы os.replace пережил падение питания"""
+    try:
+        dir_fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+    except OSError:
+        return  # На Windows папку так открыть нельзя
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+@contextlib.contextmanager
+def atomic_file(path, mode='wb', fsync=False):
+    """
+    Файл для записи по частям: path подменяется, только если блок with
+    закончился без ошибки, иначе временный файл удаляется.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    encoding = None if 'b' in mode else 'utf-8'
+    try:
+        with open(tmp_path, mode, encoding=encoding) as f:
+            yield f
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        raise
+    if fsync:
+        fsync_dir(path)
+
+
+def atomic_write(path, data, fsync=False):
+    """Записывает data (bytes или str) в path целиком"""
+    with atomic_file(path, 'wb' if isinstance(data, bytes) else 'w', fsync) as f:
+        f.write(data)
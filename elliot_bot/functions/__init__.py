@@ -0,0 +1,18 @@
+"""
+Функции бота как подключаемые модули.
+
+Каждая строка функции_бота (menus.py) указывает модуль, который её
+обслуживает. Модуль импортируется только когда функцию впервые выбрали,
+регистрирует свои состояния через @state и предоставляет:
+
+    открыть(session, номер) -> имя состояния
+        вход в функцию из меню "Выбрать функцию";
+    название_пункта(номер, пункт) -> строка или None   (необязательно)
+        подпись пункта для истории и /go;
+    перейти(session, номер, пункт)                       (необязательно)
+        сразу к пункту для /go, выставляет session.state.
+
+Новая функция подключается так:
+    from elliot_bot.menus import зарегистрировать_функцию
+    зарегистрировать_функцию("6", "Игры", "Мини-игры", "my_package.games")
+"""
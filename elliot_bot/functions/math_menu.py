@@ -0,0 +1,186 @@
+"""1 - Математика: операции над двумя числами или списками и выражения целиком"""
+from ..bulk import bulk_operation, parse_numbers
+from ..calc import evaluate, looks_like_expression
+from ..engine import state
+from ..errors import MathError, NotFoundFunctionError, ValidationError
+from ..history import record
+from ..menus import _да_или_нет
+from ..metrics import timer
+from ..numeric import calculate, format_number, parse_number
+
+
+# Номер операции в меню -> (знак, название)
+ОПЕРАЦИИ = {
+    "1": ("+", "сложение"),
+    "2": ("-", "вычитание"),
+    "3": ("*", "умножение"),
+    "4": ("÷", "деление"),
+}
+# Знак -> номер, для кодов истории вида "1.+"
+НОМЕРА_ОПЕРАЦИЙ = {знак: номер for номер, (знак, _) in ОПЕРАЦИИ.items()}
+
+МЕНЮ_МАТЕМАТИКИ = [
+    "Выберите операцию:",
+    "1- Сложение",
+    "2- Вычитание",
+    "3- Умножение",
+    "4- Деление",
+    "5- Ничего: выход из функции",
+    "Или сразу напишите выражение, например: 2+3*(4-1)",
+]
+
+
+def открыть(session, номер):
+    session.say("Математика")
+    return "math"
+
+
+def название_пункта(номер, пункт):
+    if пункт == "выражение":
+        return "выражение"
+    if пункт in НОМЕРА_ОПЕРАЦИЙ:
+        return ОПЕРАЦИИ[НОМЕРА_ОПЕРАЦИЙ[пункт]][1]
+    return None
+
+
+def перейти(session, номер, пункт):
+    if пункт in НОМЕРА_ОПЕРАЦИЙ:
+        session.data["операция"] = НОМЕРА_ОПЕРАЦИЙ[пункт]
+        session.state = "math_a"
+    else:
+        session.state = открыть(session, номер)
+
+
+def разобрать_число(текст):
+    """Число из строки в виде числового движка: int/float, Decimal или Fraction. Иначе ValueError"""
+    try:
+        return parse_number(текст)
+    except ArithmeticError:
+        raise ValueError(текст)
+
+
+def вычислить(математическая_операция, число_1, число_2):
+    """Возвращает (результат, знак) для операции 1-4"""
+    if математическая_операция not in ОПЕРАЦИИ:
+        raise NotFoundFunctionError(математическая_операция)
+    знак = ОПЕРАЦИИ[математическая_операция][0]
+    return calculate(знак, число_1, число_2), знак
+
+
+def _меню_математики(session):
+    session.write("".join(строка + "\n" for строка in МЕНЮ_МАТЕМАТИКИ))
+
+
+@state("math", prompt="Выбирай: (1-5):", enter=_меню_математики)
+def математическая_операция(session, line):
+    операция = line.strip()
+
+    if операция == "5":
+        session.say("Выхожу из данной функции")
+        return "again"
+
+    if операция not in ОПЕРАЦИИ:
+        if looks_like_expression(операция):
+            return _посчитать_выражение(session, операция, "math")
+        session.say(f"Ошибка: {NotFoundFunctionError(операция)}")
+        return "math"
+
+    session.data["операция"] = операция
+    return "math_a"
+
+
+def _список_или_число(текст):
+    """Несколько чисел через пробел или точку с запятой - список, одно - число. Иначе ValueError"""
+    try:
+        числа = parse_numbers(текст)
+    except ValidationError:
+        raise ValueError(текст)
+    if len(числа) > 1:
+        return числа
+    if числа:
+        return числа[0]
+    return разобрать_число(текст)
+
+
+@state("math_a", prompt="Это первое число: ")
+def первое_число(session, line):
+    try:
+        session.data["число_1"] = _список_или_число(line)
+    except ValueError:
+        session.say("Надо ввести число! Попробуйте снова:")
+        return "math_a"
+    return "math_b"
+
+
+@state("math_b", prompt="Это второе число: ")
+def второе_число(session, line):
+    try:
+        число_2 = _список_или_число(line)
+    except ValueError:
+        session.say("Надо ввести число! Попробуйте снова:")
+        return "math_b"
+
+    число_1 = session.data.pop("число_1")
+    if isinstance(число_1, list) or isinstance(число_2, list):
+        return _посчитать_списки(session, число_1, число_2)
+    try:
+        with timer("function", function="1"):
+            результат, знак = вычислить(session.data.pop("операция"), число_1, число_2)
+        # Перевод в строку тоже может не получиться, поэтому внутри try
+        ответ = f"Результат: {число_1} {знак} {число_2} = {format_number(результат)}"
+    except MathError as elliot_bot_error_1:
+        session.say(f" {elliot_bot_error_1}")
+        return "math"
+    except Exception as elliot_bot_error_1:
+        session.say(f"Что-то пошло не так: {elliot_bot_error_1}")
+        return "math"
+
+    record(session.user, f"1.{знак}")
+    session.say(ответ)
+    return "math_more"
+
+
+def _посчитать_списки(session, числа_1, числа_2):
+    """Операция над списками поэлементно: деление на ноль портит только свой элемент"""
+    операция = session.data.pop("операция")
+    числа_1 = числа_1 if isinstance(числа_1, list) else [числа_1]
+    числа_2 = числа_2 if isinstance(числа_2, list) else [числа_2]
+    try:
+        результат = bulk_operation(операция, числа_1, числа_2)
+    except ValidationError as elliot_bot_error_1:
+        session.say(f" {elliot_bot_error_1}")
+        return "math"
+    record(session.user, f"1.{результат.sign}")
+    session.write("".join(f"Результат: {строка}\n" for строка in результат.lines()))
+    return "math_more"
+
+
+def _посчитать_выражение(session, выражение, при_ошибке):
+    try:
+        with timer("function", function="1"):
+            результат = evaluate(выражение)
+    except (MathError, ValidationError) as elliot_bot_error_1:
+        session.say(f" {elliot_bot_error_1}")
+        return при_ошибке
+    record(session.user, "1.выражение")
+    session.say(f"Результат: {выражение} = {format_number(результат)}")
+    return "math_expr"
+
+
+@state("math_expr", prompt="Ещё выражение (Enter - вернуться к операциям): ")
+def ещё_выражение(session, line):
+    # Выражения идут подряд без вопроса "Хотите ещё раз?"
+    if not line.strip():
+        return "math"
+    return _посчитать_выражение(session, line.strip(), "math_expr")
+
+
+@state("math_more", prompt="Хотите ещё раз посчитаю? (да/нет): ")
+def ещё_раз_посчитать(session, line):
+    ответ = _да_или_нет(session, line)
+    if ответ is None:
+        return "math_more"
+    if ответ == "нет":
+        session.say("Заканчиваю данную функцию")
+        return "again"
+    return "math"
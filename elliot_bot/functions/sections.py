@@ -0,0 +1,71 @@
+"""2-5 - разделы со справкой, тексты берутся из каталога (content.py)"""
+from ..content import раздел
+from ..engine import state
+from ..errors import NotFoundFunctionError
+from ..history import record
+from ..menus import _да_или_нет
+from ..metrics import timer
+
+
+def открыть(session, номер):
+    session.data["раздел"] = номер
+    session.say(раздел(номер)["заголовок"])
+    return "section"
+
+
+def название_пункта(номер, пункт):
+    пункты = раздел(номер)["пункты"]
+    if пункт in пункты:
+        return пункты[пункт]["название"]
+    return None
+
+
+def перейти(session, номер, пункт):
+    session.data["раздел"] = номер
+    session.write(раздел(номер)["пункты"][пункт]["текст"])
+    session.state = "section_continue"
+
+
+def _текущий_раздел(session):
+    return раздел(session.data["раздел"])
+
+
+def _меню_раздела(session):
+    session.write(_текущий_раздел(session)["меню"])
+
+
+@state("section", prompt=lambda session: _текущий_раздел(session)["приглашение"],
+       enter=_меню_раздела)
+def выбор_пункта(session, line):
+    текущий = _текущий_раздел(session)
+    выбор = line.strip()
+
+    if выбор == "5":
+        session.say(текущий["выход"])
+        return "again"
+
+    if выбор not in текущий["пункты"]:
+        session.say(f"Ошибка: {NotFoundFunctionError(выбор)}")
+        session.say("Выбери 1, 2, 3 или 4")
+        return "section_more"
+
+    record(session.user, f"{session.data['раздел']}.{выбор}")
+    with timer("function", function=session.data["раздел"]):
+        session.write(текущий["пункты"][выбор]["текст"])
+    return "section_continue"
+
+
+@state("section_continue", prompt=lambda session: _текущий_раздел(session)["продолжить"])
+def продолжить(session, line):
+    return "section_more"
+
+
+@state("section_more", prompt=lambda session: _текущий_раздел(session)["ещё"])
+def ещё_про_раздел(session, line):
+    ответ = _да_или_нет(session, line)
+    if ответ is None:
+        return "section_more"
+    if ответ == "нет":
+        session.say(_текущий_раздел(session)["конец"])
+        return "again"
+    return "section"
@@ -0,0 +1,172 @@
+import hashlib
+import hmac
+import os
+import threading
+from collections import OrderedDict
+
+from .errors import ValidationError
+from .metrics import timed
+
+
+# Алгоритм для новых паролей: "pbkdf2_sha256" или "scrypt"
+PASSWORD_HASHER = os.environ.get("ELLIOT_HASHER", "pbkdf2_sha256")
+# Стоимость хэширования. Если поменять, старые пароли перехэшируются при входе
+HASHER_PARAMS = {
+    "pbkdf2_sha256": {"iterations": 200_000},
+    "scrypt": {"n": 2 ** 14, "r": 8, "p": 1},
+}
+SALT_BYTES = 16
+# Сколько успешных проверок пароля помнить, чтобы не считать KDF заново
+VERIFY_CACHE_SIZE = 1024
+# Потоки для проверки паролей: hashlib отпускает GIL, поэтому KDF идут параллельно
+HASH_WORKERS = os.cpu_count() or 2
+
+
+def _pbkdf2_sha256(password, salt, iterations):
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+
+
+def _scrypt(password, salt, n, r, p):
+    # maxmem с запасом, иначе OpenSSL откажется от больших n
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r + 1024 * 1024)
+
+
+def _encode_params(algorithm, params):
+    if algorithm == "pbkdf2_sha256":
+        return str(params["iterations"])
+    return f"{params['n']},{params['r']},{params['p']}"
+
+
+def _decode_params(algorithm, text):
+    if algorithm == "pbkdf2_sha256":
+        return {"iterations": int(text)}
+    n, r, p = (int(value) for value in text.split(","))
+    return {"n": n, "r": r, "p": p}
+
+
+def _derive(algorithm, password, salt, params):
+    if algorithm == "pbkdf2_sha256":
+        return _pbkdf2_sha256(password, salt, params["iterations"])
+    if algorithm == "scrypt":
+        return _scrypt(password, salt, params["n"], params["r"], params["p"])
+    raise ValidationError(algorithm, "pbkdf2_sha256 или scrypt")
+
+
+@timed("hash_password")
+def hash_password(password, algorithm=None, params=None):
+    """
+    Хэширует пароль с солью.
+    Результат - строка "алгоритм$параметры$соль$хэш", так что у каждого
+    пользователя в базе хранятся свои параметры стоимости.
+    """
+    algorithm = algorithm or PASSWORD_HASHER
+    params = params or HASHER_PARAMS[algorithm]
+    salt = os.urandom(SALT_BYTES)
+    digest = _derive(algorithm, password, salt, params)
+    return f"{algorithm}${_encode_params(algorithm, params)}${salt.hex()}${digest.hex()}"
+
+
+def needs_rehash(encoded, algorithm=None, params=None):
+    """True, если пароль захэширован не текущим алгоритмом или не с текущей стоимостью"""
+    algorithm = algorithm or PASSWORD_HASHER
+    params = params or HASHER_PARAMS[algorithm]
+    parts = encoded.split("$")
+    if len(parts) != 4 or parts[0] != algorithm:
+        return True
+    return parts[1] != _encode_params(algorithm, params)
+
+
+class VerifyCache:
+    """
+    Помнит успешные проверки пароля (LRU ограниченного размера).
+    Ключ - HMAC от хэша из базы и введённого пароля на случайном ключе
+    процесса, так что сами пароли в памяти не лежат.
+    """
+
+    def __init__(self, size=VERIFY_CACHE_SIZE):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._key = os.urandom(32)
+        self._entries = OrderedDict()
+        # Проверки идут из потоков пула
+        self._lock = threading.Lock()
+
+    def _make_key(self, password, encoded):
+        message = encoded.encode() + b"\0" + password.encode()
+        return hmac.new(self._key, message, hashlib.sha256).digest()
+
+    def check(self, password, encoded):
+        key = self._make_key(password, encoded)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def remember(self, password, encoded):
+        key = self._make_key(password, encoded)
+        with self._lock:
+            self._entries[key] = True
+            if len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+verify_cache = VerifyCache()
+
+
+@timed("verify_password")
+def verify_password(password, encoded, cache=verify_cache):
+    """
+    Проверяет пароль против строки из базы.
+    Понимает и старые несолёные SHA-256 хэши, чтобы прежние пользователи
+    могли войти и получить новый хэш.
+    """
+    if cache is not None and cache.check(password, encoded):
+        return True
+
+    parts = encoded.split("$")
+    if len(parts) == 4:
+        algorithm, params_text, salt_hex, digest_hex = parts
+        try:
+            params = _decode_params(algorithm, params_text)
+            digest = _derive(algorithm, password, bytes.fromhex(salt_hex), params)
+        except (ValueError, ValidationError):
+            return False
+        ok = hmac.compare_digest(digest.hex(), digest_hex)
+    else:
+        # Старый формат: sha256 без соли
+        ok = hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), encoded)
+
+    if ok and cache is not None:
+        cache.remember(password, encoded)
+    return ok
+
+
+_pool = None
+
+
+def hash_pool():
+    """Общий пул потоков для KDF, создаётся при первом обращении"""
+    global _pool
+    if _pool is None:
+        # concurrent.futures импортируется только здесь, чтобы не замедлять запуск бота
+        from concurrent.futures import ThreadPoolExecutor
+        _pool = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="elliot-hash")
+    return _pool
+
+
+def verify_password_async(password, encoded):
+    """Отправляет проверку пароля в пул, возвращает Future с True/False"""
+    return hash_pool().submit(verify_password, password, encoded)
+
+
+def hash_password_async(password, algorithm=None, params=None):
+    return hash_pool().submit(hash_password, password, algorithm, params)
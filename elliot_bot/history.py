@@ -0,0 +1,157 @@
+"""
+История команд пользователя: какие функции, пункты разделов и операции
+Математики он выбирал.
+
+У каждого пользователя свой журнал ~/elliot_history/<id>.jsonl, строки
+только дописываются в конец, и не по одной, а пачками: раз в
+HISTORY_FLUSH_EVERY записей, раз в HISTORY_FLUSH_INTERVAL секунд и в
+конце сессии. elliot_users.json при этом не переписывается. Журнал
+ограничен: когда в нём больше 2 * HISTORY_LIMIT строк, старые строки
+сворачиваются в счётчики поля "commands" записи пользователя, а в файле
+остаются последние HISTORY_LIMIT.
+
+Коды команд: "1" - функция, "2.3" - пункт 3 раздела 2, "1.+" - операция
+Математики, "1.выражение" - выражение целиком.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+from .files import atomic_write
+from .store import HOME_DIR, FileLock, get_users_store
+
+
+HISTORY_DIR = os.path.join(HOME_DIR, "elliot_history")
+HISTORY_LIMIT = 200
+HISTORY_FLUSH_EVERY = 16
+HISTORY_FLUSH_INTERVAL = 5.0
+
+
+class CommandHistory:
+    def __init__(self, user_id, login, path, limit=HISTORY_LIMIT):
+        self.user_id = user_id
+        self.login = login
+        self.path = path
+        self.limit = limit
+        # Счётчики, уже свёрнутые в поле "commands", и коды из файла по порядку
+        self._archived = Counter()
+        self._codes = []
+        self._counts = Counter()
+        self._pending = []
+        self._last_flush = time.monotonic()
+
+    def load(self, archived=None):
+        self._archived = Counter(archived or {})
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return self
+        for line in data.split(b"\n"):
+            try:
+                code = json.loads(line)["c"]
+            except (ValueError, KeyError, TypeError):
+                continue  # Пустая или недописанная строка
+            self._codes.append(code)
+        self._counts = Counter(self._codes)
+        return self
+
+    def record(self, code):
+        self._codes.append(code)
+        self._counts[code] += 1
+        self._pending.append(json.dumps({"t": int(time.time()), "c": code}, ensure_ascii=False))
+        if (len(self._pending) >= HISTORY_FLUSH_EVERY
+                or time.monotonic() - self._last_flush >= HISTORY_FLUSH_INTERVAL):
+            self.flush()
+
+    def recent(self, n=3):
+        """Последние n разных кодов, самый свежий первым"""
+        result = []
+        for code in reversed(self._codes):
+            if code not in result:
+                result.append(code)
+                if len(result) == n:
+                    break
+        return result
+
+    def most_used(self, n=3):
+        """n самых частых кодов за всё время: [(код, сколько раз)]"""
+        return (self._archived + self._counts).most_common(n)
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        data = ("\n".join(self._pending) + "\n").encode('utf-8')
+        self._pending = []
+        with _lock():
+            with open(self.path, 'ab') as f:
+                f.write(data)
+            if len(self._codes) > 2 * self.limit:
+                self._compact()
+
+    def _compact(self):
+        """Старые строки - в счётчики "commands", в файле остаются последние limit"""
+        dropped, kept = self._codes[:-self.limit], self._codes[-self.limit:]
+        with open(self.path, 'rb') as f:
+            lines = [line for line in f.read().split(b"\n") if line.strip()]
+        # Через индекс логинов: читается одна запись, а не вся база
+        found = get_users_store().find_by_login(self.login)
+        if found is not None:
+            user_id, record = found
+            self._archived.update(dropped)
+            get_users_store().add(user_id, {**record, "commands": dict(self._archived)})
+
+        # Старые строки уже в "commands" - файл должен дойти до диска вместе с ними
+        atomic_write(self.path, b"".join(line + b"\n" for line in lines[-self.limit:]), fsync=True)
+        self._codes = kept
+        self._counts = Counter(kept)
+
+
+_histories = {}
+_histories_lock = threading.Lock()
+_history_lock = None
+
+
+def _lock():
+    global _history_lock
+    if _history_lock is None:
+        os.makedirs(HISTORY_DIR, exist_ok=True)
+        _history_lock = FileLock(os.path.join(HISTORY_DIR, ".lock"))
+    return _history_lock
+
+
+def get_history(user):
+    """История пользователя (словарь из session.user). Загружается при первом обращении"""
+    user_id = user["id"]
+    with _histories_lock:
+        history = _histories.get(user_id)
+        if history is None:
+            if not _histories:
+                atexit.register(flush_all)
+            found = get_users_store().find_by_login(user["login"])
+            archived = found[1].get("commands") if found is not None else None
+            history = CommandHistory(user_id, user["login"], os.path.join(HISTORY_DIR, f"{user_id}.jsonl"))
+            _histories[user_id] = history.load(archived)
+        return history
+
+
+def record(user, code):
+    """Записывает команду code вошедшему пользователю; без входа ничего не делает"""
+    if user is not None:
+        get_history(user).record(code)
+
+
+def flush_user(user):
+    """Сбрасывает на диск накопленное за сессию (если история загружалась)"""
+    history = _histories.get(user["id"])
+    if history is not None:
+        history.flush()
+
+
+def flush_all():
+    for history in list(_histories.values()):
+        history.flush()
@@ -0,0 +1,185 @@
+import importlib
+
+from .engine import command, on_close, state
+from .history import flush_user, get_history, record
+from .metrics import count
+from .errors import NotFoundFunctionError, ValidationError
+
+
+функции_бота = {
+    "1": {
+        "название": "Математика",
+        "описание": "Ответы на математические вопросы",
+        "модуль": ".functions.math_menu"
+    },
+    "2": {
+        "название": "Python помощь",
+        "описание": "Помощь с кодом(Python)",
+        "модуль": ".functions.sections"
+    },
+    "3": {
+        "название": "Фишки ПК",
+        "описание": "Фишки для компьютера/ноутбука",
+        "модуль": ".functions.sections"
+    },
+    "4": {
+        "название": "Командная строка",
+        "описание": "Фишки с командной строкой",
+        "модуль": ".functions.sections"
+    },
+    "5": {
+        "название": "Установка ОС",
+        "описание": "Установка Windows/Linux",
+        "модуль": ".functions.sections"
+    }
+}
+
+
+# Номер функции -> загруженный модуль-обработчик (см. functions/__init__.py)
+_обработчики = {}
+
+
+def зарегистрировать_функцию(номер, название, описание, модуль):
+    """Добавляет функцию в меню. Модуль импортируется, только когда её впервые выберут"""
+    функции_бота[номер] = {"название": название, "описание": описание, "модуль": модуль}
+    _обработчики.pop(номер, None)
+
+
+def обработчик_функции(номер):
+    """Модуль функции по номеру или None: поиск в словаре, импорт один раз"""
+    обработчик = _обработчики.get(номер)
+    if обработчик is None:
+        функция = функции_бота.get(номер)
+        if функция is None:
+            return None
+        обработчик = importlib.import_module(функция["модуль"], __package__)
+        _обработчики[номер] = обработчик
+    return обработчик
+
+
+def название_команды(код):
+    """Код из истории ("2.3", "1.+") -> понятное название или None, если такого уже нет"""
+    номер, _, пункт = код.partition(".")
+    if номер not in функции_бота:
+        return None
+    название = функции_бота[номер]["название"]
+    if not пункт:
+        return название
+    название_пункта = getattr(обработчик_функции(номер), "название_пункта", None)
+    подпись = название_пункта(номер, пункт) if название_пункта else None
+    if подпись is None:
+        return None
+    return f"{название}: {подпись}"
+
+
+def _да_или_нет(session, ответ):
+    """'да'/'нет' или None, если ответ не подходит (тогда подсказка уже выведена)"""
+    ответ = ответ.strip().lower()
+    if ответ in ["да", "нет"]:
+        return ответ
+    session.say("Напиши 'да' или 'нет'")
+    return None
+
+
+# Состояния сессии: рассказ о функциях и выбор функции
+def _предложить_ярлыки(session):
+    """После входа - частые и недавние команды из истории, один раз за сессию"""
+    if session.user is None or session.data.get("ярлыки_показаны"):
+        return
+    session.data["ярлыки_показаны"] = True
+    история = get_history(session.user)
+    коды = [код for код, _ in история.most_used(3)]
+    коды += [код for код in история.recent(3) if код not in коды]
+    строки = [f"/go {код} - {название_команды(код)}" for код in коды if название_команды(код)]
+    if строки:
+        session.write("".join(строка + "\n" for строка in ["Быстрый переход:"] + строки))
+
+
+@state("tell", prompt="Рассказать о моих функциях (да/нет): ", enter=_предложить_ярлыки)
+def рассказать_о_функциях(session, line):
+    ответ = line.strip().lower()
+    if ответ not in ['да', 'нет']:
+        elliot_bot_error_1 = ValidationError(ответ, "'да' или 'нет'")
+        session.say(f" {elliot_bot_error_1}")
+        session.say("Пожалуйста, введите 'да' или 'нет'")
+        return "tell"
+
+    if ответ == "нет":
+        session.say("Тогда ладно")
+        session.say("Но знай: я могу рассказать о функциях")
+        session.say("/help - помощь с командами")
+
+    elif ответ == "да":
+        session.say("Сейчас же расскажу!")
+        session.say("Вот мои функции:")
+        for номер, данные in функции_бота.items():
+            session.say(f"{номер}- {данные['описание']}")
+    return "choose"
+
+
+@state("choose", prompt=lambda session: f"Выбрать функцию 1-{len(функции_бота)}: ")
+def выбрать_функцию(session, line):
+    обработчик = обработчик_функции(line)
+    if обработчик is None:
+        session.say(f"Ошибка произошла у бота: {NotFoundFunctionError(line)}")
+        session.say(f"Пожалуйста,выберите функцию 1-{len(функции_бота)}")
+        return "choose"
+
+    count("function", function=line)
+    record(session.user, line)
+    return обработчик.открыть(session, line)
+
+
+@state("again", prompt="Выбрать функцию ещё раз(да/нет): ")
+def выбрать_функцию_ещё_раз(session, line):
+    ответ = line.strip().lower()
+    if ответ not in ['да', 'нет']:
+        elliot_bot_error_1 = ValidationError(ответ, "'да' или 'нет'")
+        session.say(f" {elliot_bot_error_1}")
+        session.say("Пожалуйста, введите 'да' или 'нет'")
+        return "again"
+
+    if ответ == "нет":
+        session.say("Вы отказались от выбора функций.")
+        return None
+    return "choose"
+
+
+@command("/cache")
+def статистика_кэша(session, аргумент):
+    """Попадания и промахи кэша результатов Математики (только для администратора)"""
+    if not session.user.get("is_admin"):
+        session.say("Эта команда только для администратора")
+        return
+    from .numeric import result_cache
+
+    if аргумент == "clear":
+        result_cache.clear()
+        session.say("Кэш результатов очищен")
+        return
+    stats = result_cache.stats()
+    всего = stats["hits"] + stats["misses"]
+    доля = f"{stats['hits'] / всего:.0%}" if всего else "-"
+    session.say(f"Кэш результатов: попаданий {stats['hits']}, промахов {stats['misses']} ({доля}), "
+                f"записей {stats['entries']}, {stats['bytes']} байт")
+
+
+@command("/go")
+def быстрый_переход(session, код):
+    """Сразу к функции, пункту раздела или операции: /go 2, /go 2.3, /go 1.+"""
+    if not название_команды(код):
+        session.say(f"Ошибка: {NotFoundFunctionError(код)}")
+        return
+    record(session.user, код)
+    номер, _, пункт = код.partition(".")
+    обработчик = обработчик_функции(номер)
+    if пункт:
+        обработчик.перейти(session, номер, пункт)
+    else:
+        session.state = обработчик.открыть(session, номер)
+
+
+@on_close
+def _сохранить_историю(session):
+    if session.user is not None:
+        flush_user(session.user)
@@ -0,0 +1,215 @@
+"""
+Таймеры и счётчики горячих мест бота: загрузка базы, хэширование,
+вход, save_user, шаги сессии, пять функций, ожидание ввода и ошибки.
+
+Включается переменной ELLIOT_METRICS=путь до запуска бота. Файл
+перезаписывается раз в METRICS_EXPORT_INTERVAL секунд и при выходе:
+    ELLIOT_METRICS=~/elliot_metrics.prom  - текстовый формат Prometheus
+                                            (гистограммы, для histogram_quantile);
+    ELLIOT_METRICS=~/elliot_metrics.json  - JSON с перцентилями p50/p90/p99.
+
+Если переменная не задана, @timed возвращает функцию без обёртки,
+timer() - общий пустой контекстный менеджер, а count() сразу выходит,
+так что выключенные метрики почти ничего не стоят.
+"""
+import atexit
+import os
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+from .files import atomic_write
+
+
+METRICS_FILE = os.path.expanduser(os.environ.get("ELLIOT_METRICS", ""))
+METRICS_ENABLED = bool(METRICS_FILE)
+METRICS_EXPORT_INTERVAL = 10.0
+# Границы корзин гистограммы, в секундах
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Сколько последних замеров каждого таймера хранить для перцентилей в JSON
+SAMPLES = 1024
+PREFIX = "elliot_"
+
+
+class Histogram:
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.samples = deque(maxlen=SAMPLES)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.sum += seconds
+        self.samples.append(seconds)
+        for index, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[index] += 1
+                break
+
+    def percentile(self, q):
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Registry:
+    def __init__(self):
+        self.timers = {}
+        self.counters = {}
+        self._lock = threading.Lock()  # KDF считаются в пуле потоков
+        self._export_lock = threading.Lock()
+        self._last_export = time.monotonic()
+
+    def observe(self, name, seconds, labels):
+        key = (name, labels)
+        with self._lock:
+            histogram = self.timers.get(key)
+            if histogram is None:
+                histogram = self.timers[key] = Histogram()
+            histogram.observe(seconds)
+        self._maybe_export()
+
+    def count(self, name, value, labels):
+        key = (name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def _maybe_export(self):
+        if time.monotonic() - self._last_export >= METRICS_EXPORT_INTERVAL:
+            self._last_export = time.monotonic()
+            export()
+
+    def snapshot(self):
+        """Всё накопленное как словарь (то, что пишется в JSON)"""
+        with self._lock:
+            timers = [{
+                "name": name, "labels": dict(labels), "count": h.count,
+                "sum": round(h.sum, 6),
+                "p50": h.percentile(0.5), "p90": h.percentile(0.9), "p99": h.percentile(0.99),
+            } for (name, labels), h in self.timers.items()]
+            counters = [{"name": name, "labels": dict(labels), "value": value}
+                        for (name, labels), value in self.counters.items()]
+        return {"time": time.time(), "timers": timers, "counters": counters}
+
+    def prometheus(self):
+        """Текстовый формат Prometheus: таймеры - гистограммы _seconds, счётчики - _total"""
+        lines = []
+        typed = set()
+        with self._lock:
+            for (name, labels), h in sorted(self.timers.items()):
+                metric = f"{PREFIX}{name}_seconds"
+                if metric not in typed:
+                    typed.add(metric)
+                    lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, bucket in zip(BUCKETS, h.buckets):
+                    cumulative += bucket
+                    lines.append(f"{metric}_bucket{_labels(labels, le=bound)} {cumulative}")
+                lines.append(f"{metric}_bucket{_labels(labels, le='+Inf')} {h.count}")
+                lines.append(f"{metric}_sum{_labels(labels)} {h.sum}")
+                lines.append(f"{metric}_count{_labels(labels)} {h.count}")
+            for (name, labels), value in sorted(self.counters.items()):
+                metric = f"{PREFIX}{name}_total"
+                if metric not in typed:
+                    typed.add(metric)
+                    lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels, **extra):
+    items = list(labels) + [(key, str(value)) for key, value in extra.items()]
+    if not items:
+        return ""
+    body = ",".join(f'{key}="{str(value)}"'.replace("\n", " ") for key, value in items)
+    return "{" + body + "}"
+
+
+registry = Registry()
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        registry.observe(self.name, time.perf_counter() - self.start, self.labels)
+        return False
+
+
+def timer(name, **labels):
+    """with timer("store_load"): ... - время блока попадёт в гистограмму name"""
+    if not METRICS_ENABLED:
+        return _NULL_TIMER
+    return _Timer(name, tuple(sorted(labels.items())))
+
+
+def count(name, value=1, **labels):
+    if METRICS_ENABLED:
+        registry.count(name, value, tuple(sorted(labels.items())))
+
+
+def timed(name, **labels):
+    """Декоратор: время каждого вызова функции (и async тоже). Выключено - функция как есть"""
+    def decorate(function):
+        if not METRICS_ENABLED:
+            return function
+        import inspect  # Только при включённых метриках: импорт пакета остаётся лёгким
+        key = tuple(sorted(labels.items()))
+        if inspect.iscoroutinefunction(function):
+            @wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await function(*args, **kwargs)
+                finally:
+                    registry.observe(name, time.perf_counter() - start, key)
+            return async_wrapper
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                registry.observe(name, time.perf_counter() - start, key)
+        return wrapper
+    return decorate
+
+
+def export(path=None):
+    """Пишет метрики в файл атомарно; формат по расширению: .json или Prometheus"""
+    path = path or METRICS_FILE
+    if not path:
+        return
+    if path.endswith(".json"):
+        import json
+        text = json.dumps(registry.snapshot(), ensure_ascii=False, indent=2)
+    else:
+        text = registry.prometheus()
+    # Выгрузка может начаться и из потока пула, и из atexit
+    with registry._export_lock:
+        atomic_write(path, text)
+
+
+if METRICS_ENABLED:
+    atexit.register(export)
@@ -0,0 +1,239 @@
+"""
+Числовой движок Математики.
+
+    "float"    - int или float, как раньше: быстро, но 0.1 + 0.2 = 0.30000000000000004;
+    "decimal"  - decimal.Decimal с точностью DECIMAL_PRECISION знаков: 0.1 + 0.2 = 0.3;
+    "fraction" - fractions.Fraction, точные дроби: 1/3 + 1/6 = 1/2.
+
+Движок выбирается на всё развёртывание переменной ELLIOT_NUMBERS,
+точность Decimal - ELLIOT_DECIMAL_PREC. Сравнить скорость:
+    python benchmarks/bench_numeric.py
+"""
+import decimal
+import math
+import os
+import sys
+import threading
+from collections import OrderedDict
+from fractions import Fraction
+
+from .errors import MathError, ValidationError
+
+
+NUMBER_ENGINES = ("float", "decimal", "fraction")
+NUMBER_ENGINE = os.environ.get("ELLIOT_NUMBERS", "float")
+DECIMAL_PRECISION = int(os.environ.get("ELLIOT_DECIMAL_PREC", "28"))
+DECIMAL_ROUNDING = decimal.ROUND_HALF_EVEN
+# Кэш результатов: сколько записей и сколько байт (примерно) на все результаты
+RESULT_CACHE_SIZE = int(os.environ.get("ELLIOT_RESULT_CACHE", "4096"))
+RESULT_CACHE_BYTES = 16 * 1024 * 1024
+# Python 3.11+ не переводит в строку целые длиннее sys.get_int_max_str_digits()
+# цифр - такой результат было бы нечем показать
+MAX_RESULT_DIGITS = getattr(sys, "get_int_max_str_digits", lambda: 0)() or 300_000
+MAX_RESULT_BITS = int(MAX_RESULT_DIGITS / math.log10(2)) + 1
+_RESULT_LIMIT = 10 ** MAX_RESULT_DIGITS
+
+# Отдельный контекст, чтобы не трогать decimal.getcontext() других модулей
+_decimal_context = decimal.Context(prec=DECIMAL_PRECISION, rounding=DECIMAL_ROUNDING,
+                                   traps=[decimal.InvalidOperation, decimal.DivisionByZero,
+                                          decimal.Overflow])
+
+
+def set_decimal_context(precision=None, rounding=None):
+    """Меняет точность и округление движка "decimal" (например, 50 знаков, ROUND_HALF_UP)"""
+    if precision is not None:
+        if precision < 1:
+            raise ValidationError(str(precision), "точность от 1 знака")
+        _decimal_context.prec = precision
+    if rounding is not None:
+        _decimal_context.rounding = rounding
+
+
+def decimal_context():
+    return _decimal_context
+
+
+def _value_size(value):
+    if isinstance(value, Fraction):
+        return sys.getsizeof(value.numerator) + sys.getsizeof(value.denominator)
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """
+    LRU-кэш готовых результатов: одинаковые задачи (например, одно домашнее
+    задание у всего класса) считаются один раз. Ограничен и числом записей,
+    и суммарным размером, так что огромная степень не вытеснит всё остальное
+    больше, чем на свой размер. Ошибки не кэшируются.
+    """
+
+    def __init__(self, size=RESULT_CACHE_SIZE, max_bytes=RESULT_CACHE_BYTES):
+        self.size = size
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+        self._entries = OrderedDict()
+        # Сессии TCP и пул потоков могут считать одновременно
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """(True, результат) или (False, None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[0]
+
+    def put(self, key, value):
+        if self.size <= 0:
+            return
+        value_size = _value_size(value)
+        if value_size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._entries[key] = (value, value_size)
+            self.bytes += value_size
+            while len(self._entries) > self.size or self.bytes > self.max_bytes:
+                self.bytes -= self._entries.popitem(last=False)[1][1]
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "entries": len(self._entries), "bytes": self.bytes}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+
+result_cache = ResultCache()
+
+
+def context_key(engine):
+    """Часть ключа кэша: у decimal результат зависит от точности и округления"""
+    if engine == "decimal":
+        return engine, _decimal_context.prec, _decimal_context.rounding
+    return engine
+
+
+def check_engine(engine):
+    engine = engine or NUMBER_ENGINE
+    if engine not in NUMBER_ENGINES:
+        raise ValidationError(engine, ", ".join(NUMBER_ENGINES))
+    return engine
+
+
+def parse_number(text, engine=None):
+    """Число из строки в виде движка engine. Иначе ValueError"""
+    engine = check_engine(engine)
+    text = text.strip()
+    if engine == "float":
+        if '.' in text:
+            return float(text)
+        return int(text)
+    if engine == "decimal":
+        try:
+            value = _decimal_context.create_decimal(text.replace("_", ""))
+        except decimal.InvalidOperation:
+            raise ValueError(text)
+        if not value.is_finite():
+            raise ValueError(text)
+        return value
+    # Fraction понимает и "0.1", и "1/3"
+    return Fraction(text)
+
+
+def from_literal(value, source, engine=None):
+    """
+    Число из литерала выражения. Для decimal и fraction берётся исходный
+    текст ("0.1"), а не уже округлённый float. Целое и так точное, а
+    0x10, 0b101 и 0o7 Decimal и Fraction из текста не понимают.
+    """
+    engine = check_engine(engine)
+    if engine == "float":
+        return value
+    if isinstance(value, int):
+        source = str(value)
+    return parse_number(source or repr(value), engine)
+
+
+def too_long(number):
+    """Больше MAX_RESULT_DIGITS цифр (у дроби - в числителе или знаменателе)"""
+    if isinstance(number, Fraction):
+        return too_long(number.numerator) or too_long(number.denominator)
+    # Длину в битах узнать дёшево, а точное сравнение нужно только у самой границы
+    return isinstance(number, int) and number.bit_length() >= MAX_RESULT_BITS - 4 and abs(number) >= _RESULT_LIMIT
+
+
+def _decimal_operation(operation, a, b):
+    try:
+        if operation == "+":
+            return _decimal_context.add(a, b)
+        if operation == "-":
+            return _decimal_context.subtract(a, b)
+        if operation == "*":
+            return _decimal_context.multiply(a, b)
+        return _decimal_context.divide(a, b)
+    except decimal.Overflow:
+        raise MathError("Слишком большое число", f"точность {_decimal_context.prec} знаков")
+
+
+def calculate(operation, a, b, engine=None, cache=result_cache):
+    """a operation b для операции + - * ÷ в движке engine. cache=None - без кэша"""
+    engine = check_engine(engine)
+    if operation == "÷" and b == 0:
+        raise MathError("Делить на ноль нельзя!")
+    if cache is None:
+        return _calculate(operation, a, b, engine)
+    # Тип в ключе: 1 + 1 = 2, а 1.0 + 1 = 2.0, хотя 1 == 1.0
+    key = (context_key(engine), operation, type(a), a, type(b), b)
+    found, result = cache.get(key)
+    if not found:
+        result = _calculate(operation, a, b, engine)
+        cache.put(key, result)
+    return result
+
+
+def _calculate(operation, a, b, engine):
+    result = _apply(operation, a, b, engine)
+    if too_long(result):
+        raise MathError(f"{a} {operation} {b}", f"результат длиннее {MAX_RESULT_DIGITS} цифр")
+    return result
+
+
+def _apply(operation, a, b, engine):
+    if engine == "decimal":
+        return _decimal_operation(operation, decimal.Decimal(a), decimal.Decimal(b))
+    if operation == "+":
+        return a + b
+    if operation == "-":
+        return a - b
+    if operation == "*":
+        return a * b
+    if engine == "fraction":
+        return Fraction(a) / Fraction(b)
+    return a / b
+
+
+def format_number(value):
+    """Как показать число: дробь 1/3 с приближением, Decimal без лишних нулей"""
+    if isinstance(value, Fraction):
+        if value.denominator == 1:
+            return str(value.numerator)
+        approximation = _decimal_context.divide(decimal.Decimal(value.numerator), value.denominator)
+        return f"{value} (≈{format_number(approximation)})"
+    if isinstance(value, decimal.Decimal):
+        value = value.normalize(_decimal_context)
+        # Без экспоненты (3, а не 3E+0), пока это не дописывает ложные нули
+        if -_decimal_context.prec <= value.adjusted() < _decimal_context.prec:
+            return format(value, "f")
+        return str(value)
+    return str(value)
@@ -0,0 +1,48 @@
+"""
+Буферизация вывода сессии.
+
+Состояния пишут в сессию построчно (say) или блоками (write), а движок
+после каждого шага отдаёт накопленное транспорту. Политика сброса решает,
+сколько записей это будет:
+    "line"   - каждая строка отдельно, как print (старое поведение): блоки
+               write разрезаются по переводам строки;
+    "screen" - весь экран до приглашения одной записью (по умолчанию);
+    "size"   - пачки не больше max_bytes, для медленных каналов с лимитом на пакет.
+"""
+import os
+import re
+
+from .errors import ValidationError
+
+
+FLUSH_POLICIES = ("line", "screen", "size")
+FLUSH_POLICY = os.environ.get("ELLIOT_FLUSH", "screen")
+MAX_BUFFER_BYTES = 4096
+# Строка с переводом строки или хвост без него (приглашение)
+_LINES = re.compile(r"[^\n]*\n|[^\n]+")
+
+
+def batch_output(chunks, policy=FLUSH_POLICY, max_bytes=MAX_BUFFER_BYTES):
+    """Склеивает куски вывода в записи для транспорта по политике policy"""
+    if not chunks:
+        return []
+    if policy == "line":
+        # Экран из каталога приходит одним write, а раньше печатался print за print
+        return [line for chunk in chunks for line in _LINES.findall(chunk)]
+    if policy == "screen":
+        return ["".join(chunks)]
+    if policy == "size":
+        batches = []
+        current = []
+        size = 0
+        for chunk in chunks:
+            length = len(chunk.encode('utf-8'))
+            if current and size + length > max_bytes:
+                batches.append("".join(current))
+                current = []
+                size = 0
+            current.append(chunk)
+            size += length
+        batches.append("".join(current))
+        return batches
+    raise ValidationError(policy, ", ".join(FLUSH_POLICIES))
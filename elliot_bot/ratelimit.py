@@ -0,0 +1,85 @@
+"""
+Ограничение частоты попыток входа: token bucket на каждый ключ.
+
+У ключа (логин или источник сессии - IP для TCP) есть корзина на
+burst попыток, которая равномерно наполняется за window секунд. Попытка
+забирает одну; пустая корзина - отказ с временем, через которое можно
+снова. На ключ хранятся два числа, ключи лежат в LRU на max_keys
+записей, а ключи, чья корзина уже наполнилась бы целиком, выбрасываются
+сразу - они ничем не отличаются от новых.
+
+Проверка идёт до обращения к базе и до хэширования пароля, так что
+отклонённая попытка стоит один поиск в словаре.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+# Попыток на один логин и за сколько секунд они восстанавливаются
+LOGIN_ATTEMPTS = int(os.environ.get("ELLIOT_LOGIN_ATTEMPTS", 5))
+LOGIN_WINDOW = 300
+# Попыток с одного источника (любые логины)
+SOURCE_ATTEMPTS = int(os.environ.get("ELLIOT_SOURCE_ATTEMPTS", 20))
+SOURCE_WINDOW = 60
+MAX_KEYS = 100_000
+
+
+class RateLimiter:
+    def __init__(self, burst, window, max_keys=MAX_KEYS):
+        self.burst = burst
+        self.window = window
+        self.rate = burst / window
+        self.max_keys = max_keys
+        self.rejected = 0
+        # ключ -> [сколько попыток осталось, когда считали]
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict(self, now):
+        # Спереди - ключи, которых дольше всех не трогали
+        while self._buckets:
+            key, (tokens, updated) = next(iter(self._buckets.items()))
+            if len(self._buckets) <= self.max_keys and tokens + (now - updated) * self.rate < self.burst:
+                return
+            del self._buckets[key]
+
+    def hit(self, key, now=None):
+        """Забирает попытку. Возвращает 0, если можно, иначе сколько секунд ждать"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._evict(now)
+            bucket = self._buckets.pop(key, None)
+            tokens = self.burst if bucket is None else min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            if tokens < 1:
+                self.rejected += 1
+                self._buckets[key] = [tokens, now]
+                return (1 - tokens) / self.rate
+            self._buckets[key] = [tokens - 1, now]
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return 0.0
+
+    def reset(self, key):
+        """Удачный вход - попытки этого ключа снова полные"""
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+login_limiter = RateLimiter(LOGIN_ATTEMPTS, LOGIN_WINDOW)
+source_limiter = RateLimiter(SOURCE_ATTEMPTS, SOURCE_WINDOW)
+
+
+def check_login(login, source):
+    """
+    Попытка входа логином login с источника source.
+    0 - можно проверять пароль, иначе через сколько секунд попробовать снова.
+    """
+    wait = source_limiter.hit(source)
+    if wait:
+        return wait
+    return login_limiter.hit(login)
@@ -0,0 +1,197 @@
+"""
+Прогон сессий по сценарию без клавиатуры: для нагрузочных и регрессионных тестов.
+
+Сценарий - текстовый файл, одна строка - один ввод пользователя, пустая
+строка - это Enter. Строки "# ..." - комментарии. Строка "? текст"
+проверяет, что в ответе на предыдущий ввод есть этот текст. В строках
+можно писать {n} - номер сессии, {login} и {password}:
+
+    2
+    {login}
+    {password}
+    ? сохранён с ID
+    нет
+    1
+    1
+    2
+    3
+    ? = 5
+
+Сессии идут через тот же движок, что и у живых пользователей, но без
+транспорта: ввод подаётся прямо в Engine.feed. Процессы пула работают с
+одной общей базой (журнал рассчитан на несколько процессов), внутри
+процесса сессии идут одновременно в event loop. В конце - задержка
+каждого шага по состояниям (p50/p90/p99) и пропускная способность:
+    python -m elliot_bot.runner сценарий.txt --sessions 1000 --processes 4
+Регрессионный сценарий на все пять функций и команды -
+tests/scenarios/full_session.txt.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+LOGIN_FORMAT = "load_{n}"
+PASSWORD = "password"
+
+
+def parse_script(text):
+    """[(ввод, [ожидаемые тексты])] из текста сценария"""
+    steps = []
+    for line in text.splitlines():
+        if line.startswith("#"):
+            continue
+        if line.startswith("? "):
+            if not steps:
+                raise ValueError("Проверка '? ...' не может идти до первого ввода")
+            steps[-1][1].append(line[2:])
+            continue
+        steps.append((line, []))
+    return steps
+
+
+async def run_session(engine, number, steps, login_format, password, latencies, failures):
+    """Одна сессия по сценарию. Задержки шагов копятся в latencies[состояние]"""
+    from .engine import Session
+
+    values = {"n": number, "login": login_format.format(n=number), "password": password}
+    session = Session(f"run-{number}")
+    await engine.start(session)
+    session.take_output()
+    for index, (line, expected) in enumerate(steps):
+        if session.done:
+            failures.append(f"сессия {number}: закончилась до шага {index + 1}")
+            return
+        state_name = session.state
+        start = time.perf_counter()
+        await engine.feed(session, line.format(**values))
+        latencies.setdefault(state_name, []).append(time.perf_counter() - start)
+        output = "".join(session.take_output())
+        for text in expected:
+            text = text.format(**values)
+            if text not in output:
+                failures.append(f"сессия {number}, шаг {index + 1} ({line!r}): нет '{text}'")
+
+
+async def _run_many(numbers, steps, login_format, password, concurrency):
+    from .engine import Engine
+
+    engine = Engine(greeting=None)
+    latencies = {}
+    failures = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(number):
+        async with semaphore:
+            await run_session(engine, number, steps, login_format, password, latencies, failures)
+
+    await asyncio.gather(*(limited(number) for number in numbers))
+    return latencies, failures
+
+
+def run_chunk(numbers, steps, login_format=LOGIN_FORMAT, password=PASSWORD, concurrency=50):
+    """Работа одного процесса пула: прогоняет сессии с номерами numbers"""
+    from .store import get_users_store
+
+    # Сообщение об открытии базы в отчёт не нужно
+    with contextlib.redirect_stdout(io.StringIO()):
+        get_users_store()
+    start = time.perf_counter()
+    latencies, failures = asyncio.run(_run_many(numbers, steps, login_format, password, concurrency))
+    return latencies, failures, time.perf_counter() - start
+
+
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(latencies, sessions, steps, elapsed, failures):
+    states = {}
+    for name, samples in sorted(latencies.items()):
+        ordered = sorted(samples)
+        states[name] = {
+            "steps": len(ordered),
+            "p50_ms": round(_percentile(ordered, 0.5) * 1000, 3),
+            "p90_ms": round(_percentile(ordered, 0.9) * 1000, 3),
+            "p99_ms": round(_percentile(ordered, 0.99) * 1000, 3),
+            "max_ms": round(ordered[-1] * 1000, 3),
+        }
+    return {
+        "sessions": sessions,
+        "steps": steps,
+        "seconds": round(elapsed, 3),
+        "sessions_per_sec": round(sessions / elapsed, 1) if elapsed else None,
+        "steps_per_sec": round(steps / elapsed, 1) if elapsed else None,
+        "failures": len(failures),
+        "states": states,
+    }
+
+
+def run(steps, sessions, processes=1, concurrency=50, login_format=LOGIN_FORMAT,
+        password=PASSWORD, first=1):
+    """Прогоняет sessions сессий на processes процессах, возвращает (отчёт, ошибки)"""
+    numbers = list(range(first, first + sessions))
+    chunks = [numbers[index::processes] for index in range(processes)]
+    start = time.perf_counter()
+    latencies = {}
+    failures = []
+    if processes == 1:
+        results = [run_chunk(numbers, steps, login_format, password, concurrency)]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = [pool.submit(run_chunk, chunk, steps, login_format, password, concurrency)
+                       for chunk in chunks if chunk]
+            results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+    for chunk_latencies, chunk_failures, _ in results:
+        for name, samples in chunk_latencies.items():
+            latencies.setdefault(name, []).extend(samples)
+        failures.extend(chunk_failures)
+    total_steps = sum(len(samples) for samples in latencies.values())
+    return summarize(latencies, sessions, total_steps, elapsed, failures), failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m elliot_bot.runner",
+                                     description="Прогон сессий по сценарию")
+    parser.add_argument("script", help="файл сценария (- для stdin)")
+    parser.add_argument("--sessions", type=int, default=1, help="сколько сессий")
+    parser.add_argument("--processes", type=int, default=1, help="процессов в пуле")
+    parser.add_argument("--concurrency", type=int, default=50, help="одновременных сессий на процесс")
+    parser.add_argument("--login-format", default=LOGIN_FORMAT, help="логин сессии, {n} - её номер")
+    parser.add_argument("--password", default=PASSWORD)
+    parser.add_argument("--first", type=int, default=1, help="номер первой сессии")
+    parser.add_argument("--json", action="store_true", help="отчёт в JSON")
+    args = parser.parse_args(argv)
+
+    if args.script == "-":
+        text = sys.stdin.read()
+    else:
+        with open(args.script, 'r', encoding='utf-8') as f:
+            text = f.read()
+    report, failures = run(parse_script(text), args.sessions, args.processes, args.concurrency,
+                           args.login_format, args.password, args.first)
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print(f"Сессий: {report['sessions']}, шагов: {report['steps']}, за {report['seconds']} с "
+              f"({report['sessions_per_sec']} сессий/с, {report['steps_per_sec']} шагов/с)")
+        print(f"{'состояние':<20}{'шагов':>8}{'p50 мс':>10}{'p90 мс':>10}{'p99 мс':>10}{'max мс':>10}")
+        for name, row in report["states"].items():
+            print(f"{name:<20}{row['steps']:>8}{row['p50_ms']:>10}{row['p90_ms']:>10}"
+                  f"{row['p99_ms']:>10}{row['max_ms']:>10}")
+    for failure in failures[:20]:
+        print(f"Не совпало: {failure}", file=sys.stderr)
+    if len(failures) > 20:
+        print(f"... и ещё {len(failures) - 20}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""
+Полнотекстовый поиск по справке всех пяти функций: /search <запрос>.
+
+Индекс обратный: слово -> список (документ, сколько раз встретилось).
+Документ - это функция целиком или пункт раздела из каталога.
+Индекс строится один раз и кэшируется на диске вместе с хэшем
+исходных текстов; если content.json поменялся, индекс перестраивается.
+Запрос - это несколько словарных поисков и пересечение списков,
+поэтому он занимает микросекунды даже на тысячах статей. Слово,
+которого нет целиком, ищется как префикс (chm -> chmod).
+"""
+import bisect
+import hashlib
+import json
+import math
+import os
+import re
+
+from .content import get_catalog, get_catalog_hash
+from .engine import command
+from .files import atomic_write
+from .store import HOME_DIR
+
+
+SEARCH_INDEX_FILE = os.path.join(HOME_DIR, "elliot_search_index.json")
+INDEX_VERSION = 1
+MAX_RESULTS = 5
+# Сколько слов максимум подставлять вместо одного префикса
+MAX_PREFIX_TERMS = 50
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return _WORD.findall(text.lower().replace("ё", "е"))
+
+
+def _documents():
+    from .functions.math_menu import МЕНЮ_МАТЕМАТИКИ
+    from .menus import функции_бота
+
+    catalog = get_catalog()
+    documents = []
+    for номер, функция in функции_бота.items():
+        lines = [функция["название"], функция["описание"]]
+        if номер == "1":
+            lines += МЕНЮ_МАТЕМАТИКИ
+        elif номер in catalog:
+            lines += [пункт["название"] for пункт in catalog[номер]["пункты"].values()]
+        documents.append({"id": номер, "title": функция["название"], "lines": lines})
+
+        for ключ, пункт in catalog.get(номер, {}).get("пункты", {}).items():
+            documents.append({
+                "id": f"{номер}.{ключ}",
+                "title": f"{функция['название']} → {пункт['название']}",
+                "lines": [f"{функция['название']} {пункт['название']}"] + пункт["текст"].splitlines(),
+            })
+    return documents, функции_бота, МЕНЮ_МАТЕМАТИКИ
+
+
+def source_hash():
+    """Хэш всех текстов, по которым строится индекс"""
+    _, функции_бота, меню_математики = _documents()
+    extra = json.dumps([INDEX_VERSION, функции_бота, меню_математики], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256((get_catalog_hash() + extra).encode("utf-8")).hexdigest()
+
+
+class SearchIndex:
+    def __init__(self, documents, postings, source):
+        self.documents = documents
+        self.postings = postings
+        self.source = source
+        self._vocabulary = sorted(postings)
+
+    @classmethod
+    def build(cls, documents, source):
+        postings = {}
+        for number, document in enumerate(documents):
+            counts = {}
+            for line in document["lines"]:
+                for term in tokenize(line):
+                    counts[term] = counts.get(term, 0) + 1
+            for term, count in counts.items():
+                postings.setdefault(term, []).append([number, count])
+        return cls(documents, postings, source)
+
+    @classmethod
+    def load(cls, path, source):
+        """Индекс с диска или None, если его нет или он от других текстов"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("source") != source:
+            return None
+        return cls(data["documents"], data["postings"], source)
+
+    def save(self, path):
+        data = {"source": self.source, "documents": self.documents, "postings": self.postings}
+        atomic_write(path, json.dumps(data, ensure_ascii=False))
+
+    def _postings_for(self, term):
+        if term in self.postings:
+            return self.postings[term]
+        # Слова целиком нет - берём все слова с таким началом
+        merged = {}
+        start = bisect.bisect_left(self._vocabulary, term)
+        for word in self._vocabulary[start:start + MAX_PREFIX_TERMS]:
+            if not word.startswith(term):
+                break
+            for number, count in self.postings[word]:
+                merged[number] = merged.get(number, 0) + count
+        return list(merged.items())
+
+    def search(self, query, limit=MAX_RESULTS):
+        terms = tokenize(query)
+        if not terms:
+            return []
+        scores = None
+        for term in terms:
+            postings = self._postings_for(term)
+            if not postings:
+                return []
+            idf = math.log(1 + len(self.documents) / len(postings))
+            term_scores = {number: count * idf for number, count in postings}
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {number: score + term_scores[number]
+                          for number, score in scores.items() if number in term_scores}
+            if not scores:
+                return []
+
+        best = sorted(scores.items(), key=lambda item: -item[1])[:limit]
+        results = []
+        for number, score in best:
+            document = self.documents[number]
+            results.append({
+                "id": document["id"],
+                "title": document["title"],
+                "snippet": self._snippet(document, terms),
+                "score": round(score, 3),
+            })
+        return results
+
+    @staticmethod
+    def _snippet(document, terms):
+        for line in document["lines"][1:]:
+            lowered = line.lower().replace("ё", "е")
+            if any(term in lowered for term in terms):
+                return line.strip()
+        return ""
+
+
+_index = None
+
+
+def get_search_index(path=SEARCH_INDEX_FILE):
+    """Индекс из памяти, из кэша на диске или построенный заново, если тексты поменялись"""
+    global _index
+    # Каталог читается один раз за процесс, так что хэш проверяем только при загрузке
+    if _index is not None:
+        return _index
+    source = source_hash()
+    index = SearchIndex.load(path, source)
+    if index is None:
+        documents, _, _ = _documents()
+        index = SearchIndex.build(documents, source)
+        try:
+            index.save(path)
+        except OSError:
+            pass  # Без кэша тоже работает, просто построим индекс ещё раз при запуске
+    _index = index
+    return index
+
+
+def search(query, limit=MAX_RESULTS):
+    return get_search_index().search(query, limit)
+
+
+@command("/search")
+def поиск(session, запрос):
+    """Поиск по справке: /search ping"""
+    if not запрос:
+        session.say("Напишите, что искать: /search ping")
+        return
+    results = search(запрос)
+    if not results:
+        session.say(f"По запросу '{запрос}' ничего не нашлось")
+        return
+    lines = [f"Найдено: {len(results)}"]
+    for result in results:
+        номер, _, пункт = result["id"].partition(".")
+        где = f"функция {номер}, пункт {пункт}" if пункт else f"функция {номер}"
+        lines.append(f"- {result['title']} ({где})")
+        if result["snippet"]:
+            lines.append(f"    {result['snippet']}")
+    session.write("".join(line + "\n" for line in lines))
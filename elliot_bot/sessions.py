@@ -0,0 +1,290 @@
+"""
+Сессии после входа: подписанные ключи с ограниченным сроком жизни.
+
+После успешного входа или регистрации пользователь получает ключ вида
+"id.срок.подпись". Подпись - HMAC-SHA256 на секрете бота, поэтому
+поддельный или изменённый ключ отбрасывается без обращения к базе.
+Сами сессии лежат в памяти, в LRU-кэше на SESSION_CACHE_SIZE записей;
+просроченные вытесняются. Вернувшийся пользователь входит по ключу
+одним поиском в кэше - без загрузки базы и без хэширования пароля.
+
+Если задан SESSIONS_FILE (по умолчанию ~/elliot_sessions.jsonl, пустая
+ELLIOT_SESSIONS - только память), выданные и отозванные сессии
+дописываются в журнал, так что ключи переживают перезапуск и видны
+другим процессам бота. Секрет для подписи лежит рядом в файле .key с
+правами 0600 или задаётся через ELLIOT_SESSION_SECRET.
+
+В консоли ключ запоминается в ~/elliot_session_token, и в меню входа
+появляется "Продолжить как <логин>".
+"""
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from .files import atomic_file
+from .store import HOME_DIR, FileLock
+
+
+SESSION_TTL = int(os.environ.get("ELLIOT_SESSION_TTL", 7 * 24 * 3600))
+SESSION_CACHE_SIZE = 10_000
+SESSIONS_FILE = os.environ.get("ELLIOT_SESSIONS", os.path.join(HOME_DIR, "elliot_sessions.jsonl"))
+TOKEN_FILE = os.path.join(HOME_DIR, "elliot_session_token")
+# Журнал сжимается при запуске, если в нём больше мёртвых строк, чем столько плюс живые
+COMPACT_SLACK = 1000
+# Сколько байт подписи оставлять в ключе
+SIGNATURE_BYTES = 16
+
+
+def _load_secret(path):
+    """Секрет из ELLIOT_SESSION_SECRET, из файла или новый (файл создаётся с правами 0600)"""
+    secret = os.environ.get("ELLIOT_SESSION_SECRET")
+    if secret:
+        return secret.encode()
+    if path is None:
+        return os.urandom(32)
+    try:
+        with open(path, 'rb') as f:
+            return bytes.fromhex(f.read().decode().strip())
+    except FileNotFoundError:
+        pass
+    secret = os.urandom(32)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # Другой процесс успел создать секрет раньше - берём его
+        with open(path, 'rb') as f:
+            return bytes.fromhex(f.read().decode().strip())
+    with os.fdopen(fd, 'w') as f:
+        f.write(secret.hex())
+    return secret
+
+
+class SessionCache:
+    """
+    Выданные сессии: id -> (срок, данные пользователя), LRU ограниченного размера.
+    Если указан path, сессии дописываются в журнал и читаются из него при
+    старте и когда ключ из другого процесса не нашёлся в памяти.
+    """
+
+    def __init__(self, path=None, ttl=SESSION_TTL, size=SESSION_CACHE_SIZE, secret=None):
+        self.path = path
+        self.ttl = ttl
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._secret = secret
+        self._entries = OrderedDict()
+        self._revoked = set()
+        self._file_size = 0
+        self._inode = None
+        self._records = 0
+        self._loaded = False
+        # Вход по ключу идёт из event loop, проверка пароля - из потоков пула
+        self._lock = threading.RLock()
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            if self._secret is None:
+                # Без журнала ключи всё равно умрут с процессом - хватит случайного секрета
+                self._secret = _load_secret(f"{self.path}.key" if self.path else None)
+            self._read_log()
+            self._loaded = True
+            if self._records > 2 * len(self._entries) + COMPACT_SLACK:
+                self.compact()
+
+    def _sign(self, session_id, expires):
+        message = f"{session_id}.{expires}".encode()
+        return hmac.new(self._secret, message, hashlib.sha256).hexdigest()[:SIGNATURE_BYTES * 2]
+
+    def _read_log(self):
+        """Дочитывает журнал с места, где остановились в прошлый раз"""
+        if not self.path:
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                self._inode = os.fstat(f.fileno()).st_ino
+                f.seek(self._file_size)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        # Недописанную последнюю строку прочитаем в следующий раз
+        end = data.rfind(b"\n") + 1
+        self._file_size += end
+        now = time.time()
+        for line in data[:end].split(b"\n"):
+            try:
+                record = json.loads(line)
+                session_id = record["s"]
+            except (ValueError, KeyError, TypeError):
+                continue
+            self._records += 1
+            if record.get("revoked"):
+                self._revoked.add(session_id)
+                self._entries.pop(session_id, None)
+            elif record["e"] > now and session_id not in self._revoked:
+                self._put(session_id, record["e"], record["u"])
+
+    def _refresh(self):
+        """Дочитывает журнал, если его дописал или сжал другой процесс: один stat на вход"""
+        if not self.path:
+            return
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if st.st_ino != self._inode or st.st_size < self._file_size:
+            # Журнал сжали - это новый файл, и после сжатия его могли дописать дальше
+            # нашего смещения. Читаем заново: отозванных сессий в нём уже нет,
+            # поэтому и в памяти оставляем только то, что в нём есть
+            self._file_size = 0
+            self._records = 0
+            self._entries.clear()
+            self._revoked.clear()
+        if st.st_size != self._file_size:
+            self._read_log()
+
+    def _append(self, record):
+        if not self.path:
+            return
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with FileLock(f"{self.path}.lock"):
+            with open(self.path, 'ab') as f:
+                f.write(line)
+
+    def _put(self, session_id, expires, user):
+        self._entries[session_id] = (expires, user)
+        self._entries.move_to_end(session_id)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def issue(self, user):
+        """Новая сессия для user ({"id", "login", "is_admin"}), возвращает ключ"""
+        self._ensure_loaded()
+        session_id = secrets.token_urlsafe(18)
+        expires = int(time.time()) + self.ttl
+        with self._lock:
+            self._put(session_id, expires, user)
+            self._append({"s": session_id, "e": expires, "u": user})
+        return f"{session_id}.{expires}.{self._sign(session_id, expires)}"
+
+    def _parse(self, token):
+        """(id, срок) из ключа с верной подписью или None"""
+        parts = token.strip().split(".")
+        if len(parts) != 3 or not parts[1].isdigit():
+            return None
+        session_id, expires, signature = parts[0], int(parts[1]), parts[2]
+        if not hmac.compare_digest(self._sign(session_id, expires), signature):
+            return None
+        return session_id, expires
+
+    def resume(self, token):
+        """Данные пользователя по ключу или None, если ключ поддельный, просрочен или отозван"""
+        self._ensure_loaded()
+        parsed = self._parse(token)
+        if parsed is None:
+            return None
+        session_id, expires = parsed
+        if expires <= time.time():
+            with self._lock:
+                self._entries.pop(session_id, None)
+            return None
+        with self._lock:
+            # Сессию мог выдать или отозвать другой процесс бота
+            self._refresh()
+            entry = self._entries.get(session_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(session_id)
+            self.hits += 1
+            return entry[1]
+
+    def revoke(self, token):
+        """Выход: ключ больше не действует ни в этом, ни в других процессах"""
+        self._ensure_loaded()
+        parsed = self._parse(token)
+        if parsed is None:
+            return False
+        session_id, _ = parsed
+        with self._lock:
+            found = self._entries.pop(session_id, None) is not None
+            self._revoked.add(session_id)
+            self._append({"s": session_id, "revoked": True})
+        return found
+
+    def prune(self):
+        """Убирает просроченные сессии из памяти, возвращает сколько убрано"""
+        now = time.time()
+        with self._lock:
+            expired = [session_id for session_id, (expires, _) in self._entries.items() if expires <= now]
+            for session_id in expired:
+                del self._entries[session_id]
+        return len(expired)
+
+    def compact(self):
+        """Переписывает журнал: только живые сессии, без отозванных и просроченных"""
+        if not self.path:
+            return
+        self._ensure_loaded()
+        with FileLock(f"{self.path}.lock"):
+            with self._lock:
+                self._read_log()
+                self.prune()
+                with atomic_file(self.path, 'w') as f:
+                    for session_id, (expires, user) in self._entries.items():
+                        f.write(json.dumps({"s": session_id, "e": expires, "u": user}, ensure_ascii=False) + "\n")
+                self._revoked.clear()
+                self._records = len(self._entries)
+                st = os.stat(self.path)
+                self._file_size = st.st_size
+                self._inode = st.st_ino
+
+    def stats(self):
+        with self._lock:
+            return {"sessions": len(self._entries), "size": self.size, "ttl": self.ttl,
+                    "hits": self.hits, "misses": self.misses}
+
+
+_sessions = None
+
+
+def get_sessions():
+    """Кэш сессий процесса, создаётся при первом обращении"""
+    global _sessions
+    if _sessions is None:
+        _sessions = SessionCache(SESSIONS_FILE or None)
+    return _sessions
+
+
+def remembered_token(path=TOKEN_FILE):
+    """Ключ, запомненный консолью в прошлый раз, или None"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def remember_token(token, path=TOKEN_FILE):
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(token)
+    except OSError:
+        pass  # Без файла просто придётся войти по паролю
+
+
+def forget_token(path=TOKEN_FILE):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
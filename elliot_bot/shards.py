@@ -0,0 +1,55 @@
+"""
+Обслуживание базы с шардами (ELLIOT_STORE=sharded).
+
+    python -m elliot_bot.shards stats            - файлы шардов и их размер
+    python -m elliot_bot.shards rebalance 16     - переложить пользователей в 16 шардов
+
+rebalance делается в окно обслуживания, с остановленными ботами. Он
+держит блокировки всех старых шардов до конца переноса, а бот ходит в
+базу прямо из event loop, так что работающий бот замер бы на всё это
+время целиком, со всеми сессиями. Данные он бы не потерял: записи,
+которые ждали блокировку, после подмены уходят в новые шарды.
+"""
+import argparse
+import sys
+import time
+
+from .errors import StoreError, ValidationError
+from .store import USERS_SHARDS_DIR, ShardedUserStore, open_user_store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m elliot_bot.shards",
+                                     description="Шарды базы пользователей")
+    parser.add_argument("--path", default=USERS_SHARDS_DIR, help="папка базы с шардами")
+    commands = parser.add_subparsers(dest="action", required=True)
+    commands.add_parser("stats", help="размер каждого шарда")
+    rebalance = commands.add_parser("rebalance", help="поменять число шардов (боты должны быть остановлены)")
+    rebalance.add_argument("shards", type=int)
+    args = parser.parse_args(argv)
+
+    # Своя база по умолчанию открывается как в боте - при первом запуске в неё перенесут журнал
+    store = open_user_store("sharded") if args.path == USERS_SHARDS_DIR else ShardedUserStore(args.path)
+    try:
+        if args.action == "stats":
+            rows = store.stats()
+            total = sum(size for _, _, size in rows)
+            print(f"Поколение {store.generation}, шардов: {len(rows)}, всего {total} байт")
+            for number, path, size in rows:
+                share = f"{100 * size / total:.1f}%" if total else "-"
+                print(f"{number:>4}  {size:>12}  {share:>6}  {path}")
+        else:
+            start = time.perf_counter()
+            moved = store.rebalance(args.shards)
+            print(f"Переложено {moved} пользователей в {args.shards} шардов "
+                  f"за {time.perf_counter() - start:.1f} с")
+    except (OSError, StoreError, ValidationError) as error:
+        print(f"Ошибка: {error}", file=sys.stderr)
+        return 1
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Быстрые команды: ответ за один ввод, без меню и вопросов "да/нет".
+
+    /help            - список команд;
+    /math 2+3*4      - посчитать выражение;
+    /py basics       - пункт раздела по его ключу или номеру (/py 1);
+    /pc, /cmd, /os   - так же для остальных разделов;
+    /search ping     - поиск по справке (search.py).
+
+Команды разделов берутся из каталога: поле "команда" раздела и
+"ключи" его пунктов (content.json), поэтому новая команда или ключ
+добавляются без изменения кода.
+"""
+from .content import get_catalog
+from .engine import COMMANDS, command
+from .errors import MathError, NotFoundFunctionError, ValidationError
+from .history import record
+
+
+@command("/help")
+def помощь(session, аргумент):
+    """Список команд"""
+    строки = ["Команды (работают на любом шаге):"]
+    for имя, обработчик in sorted(COMMANDS.items()):
+        описание = (обработчик.__doc__ or "").strip().splitlines()
+        строки.append(f"{имя} - {описание[0]}" if описание else имя)
+    session.write("".join(строка + "\n" for строка in строки))
+
+
+@command("/math")
+def посчитать(session, выражение):
+    """Посчитать выражение сразу: /math 2+3*(4-1)"""
+    from .calc import evaluate
+    from .numeric import format_number
+
+    if not выражение:
+        session.say("Напишите выражение: /math 2+3*(4-1)")
+        return
+    try:
+        результат = evaluate(выражение)
+    except (MathError, ValidationError) as elliot_bot_error_1:
+        session.say(f" {elliot_bot_error_1}")
+        return
+    record(session.user, "1.выражение")
+    session.say(f"Результат: {выражение} = {format_number(результат)}")
+
+
+def найти_пункт(номер, запрос):
+    """Номер пункта раздела по номеру или ключу ("1", "basics", "основы") или None"""
+    пункты = get_catalog()[номер]["пункты"]
+    запрос = запрос.strip().lower()
+    if запрос in пункты:
+        return запрос
+    for ключ, пункт in пункты.items():
+        if запрос in пункт["ключи"] or запрос == пункт["название"].lower():
+            return ключ
+    return None
+
+
+def _команда_раздела(номер, имя):
+    def показать_пункт(session, запрос):
+        раздел = get_catalog()[номер]
+        if not запрос:
+            session.write("".join(
+                f"/{имя} {пункт['ключи'][0] if пункт['ключи'] else ключ} - {пункт['название']}\n"
+                for ключ, пункт in раздел["пункты"].items()))
+            return
+        ключ = найти_пункт(номер, запрос)
+        if ключ is None:
+            session.say(f"Ошибка: {NotFoundFunctionError(запрос)}")
+            session.say(f"Список пунктов: /{имя}")
+            return
+        record(session.user, f"{номер}.{ключ}")
+        session.write(раздел["пункты"][ключ]["текст"])
+
+    показать_пункт.__doc__ = f"{get_catalog()[номер]['заголовок'].strip()}: /{имя} <пункт>"
+    return показать_пункт
+
+
+def зарегистрировать_команды_разделов():
+    for номер, раздел in get_catalog().items():
+        if раздел.get("команда"):
+            имя = раздел["команда"]
+            command(f"/{имя}")(_команда_раздела(номер, имя))
+
+
+зарегистрировать_команды_разделов()
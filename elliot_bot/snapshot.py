@@ -0,0 +1,249 @@
+"""
+Двоичный снимок базы пользователей, который открывается через mmap.
+
+Файл:
+    заголовок  - HEADER: сигнатура, версия, число записей, ширины полей,
+                 смещения областей, наибольший числовой id;
+    записи     - фиксированной ширины, отсортированы по логину:
+                 логин, id, пароль (байты, дополненные нулями), admin,
+                 смещение и длина остальных полей в куче;
+    индекс id  - пары (id, номер записи), отсортированы по id;
+    куча       - остальные поля записи ("commands" и т.п.) в JSON.
+Ширины полей берутся по самому длинному значению при записи снимка.
+
+Поиск по логину и по id - двоичный поиск прямо по отображённому файлу:
+читаются только нужные страницы, в память процесса база не грузится,
+поэтому её размер не влияет на занятую память.
+
+Конвертер в обе стороны:
+    python -m elliot_bot.snapshot to-snap ~/elliot_users.json ~/elliot_users.snap
+    python -m elliot_bot.snapshot to-json ~/elliot_users.snap ~/elliot_users.json
+Перенос журнала новых записей в снимок (бот делает это и сам, когда
+журнал дорастает до store.SNAPSHOT_JOURNAL_MAX_BYTES):
+    python -m elliot_bot.snapshot compact [~/elliot_users.snap]
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+
+from .errors import StoreError
+from .files import atomic_file, atomic_write
+
+
+MAGIC = b"ELLSNAP\0"
+VERSION = 1
+# сигнатура, версия, записей, ширина логина, id и пароля, размер записи,
+# смещения записей, индекса id и кучи, наибольший числовой id
+HEADER = struct.Struct("<8sIIIIIIQQQQ")
+HEADER_SIZE = 128
+# Поля, которые лежат прямо в записи; всё остальное - в куче
+FIXED_FIELDS = ("login", "password", "admin")
+# Так чаще всего выглядит остаток записи - для него куча не нужна
+EMPTY_EXTRA = {"commands": {}}
+
+
+def _record_struct(login_width, id_width, password_width):
+    return struct.Struct(f"<{login_width}s{id_width}s{password_width}sBQI")
+
+
+def _pad(text, width):
+    data = text.encode("utf-8")
+    return data.ljust(width, b"\0") if len(data) <= width else None
+
+
+def _text(data):
+    return data.rstrip(b"\0").decode("utf-8")
+
+
+def write_snapshot(path, users):
+    """
+    Пишет снимок из пар (id, запись). При повторяющихся логинах остаётся
+    первый, как в UserStore. Возвращает число записей.
+    """
+    rows = []
+    logins = set()
+    heap = bytearray()
+    max_id = 0
+    for user_id, record in users:
+        login = record["login"]
+        if login in logins:
+            continue
+        logins.add(login)
+        extra = {key: value for key, value in record.items() if key not in FIXED_FIELDS}
+        if extra == EMPTY_EXTRA:
+            heap_offset, heap_length = 0, 0
+        else:
+            data = json.dumps(extra, ensure_ascii=False).encode("utf-8")
+            heap_offset, heap_length = len(heap), len(data)
+            heap += data
+        if user_id.isdigit():
+            max_id = max(max_id, int(user_id))
+        rows.append((login.encode("utf-8"), user_id.encode("utf-8"), record["password"].encode("utf-8"),
+                     1 if record.get("admin") else 0, heap_offset, heap_length))
+
+    # Ширина поля не бывает нулевой, чтобы формат struct оставался верным
+    login_width = max((len(row[0]) for row in rows), default=1) or 1
+    id_width = max((len(row[1]) for row in rows), default=1) or 1
+    password_width = max((len(row[2]) for row in rows), default=1) or 1
+    record = _record_struct(login_width, id_width, password_width)
+    id_entry = struct.Struct(f"<{id_width}sI")
+    rows.sort(key=lambda row: row[0])
+    ids = sorted((row[1].ljust(id_width, b"\0"), number) for number, row in enumerate(rows))
+
+    records_offset = HEADER_SIZE
+    ids_offset = records_offset + len(rows) * record.size
+    heap_start = ids_offset + len(ids) * id_entry.size
+    with atomic_file(path, 'wb', fsync=True) as f:
+        header = HEADER.pack(MAGIC, VERSION, len(rows), login_width, id_width, password_width,
+                             record.size, records_offset, ids_offset, heap_start, max_id)
+        f.write(header.ljust(HEADER_SIZE, b"\0"))
+        for login, user_id, password, admin, heap_offset, heap_length in rows:
+            f.write(record.pack(login, user_id, password, admin, heap_offset, heap_length))
+        for user_id, number in ids:
+            f.write(id_entry.pack(user_id, number))
+        f.write(heap)
+    return len(rows)
+
+
+class SnapshotFile:
+    """Открытый через mmap снимок: поиск по логину и id без загрузки базы"""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self.max_id = 0
+        self.inode = None
+        self._map = None
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            st = os.fstat(f.fileno())
+            self.inode = st.st_ino
+            if st.st_size == 0:
+                return  # Пустая база
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if st.st_size < HEADER.size:
+            raise StoreError(path, "файл короче заголовка снимка")
+        (magic, version, self.count, self.login_width, self.id_width, self.password_width,
+         record_size, self.records_offset, self.ids_offset, self.heap_offset,
+         self.max_id) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise StoreError(path, "это не снимок базы или другая версия формата")
+        self._record = _record_struct(self.login_width, self.id_width, self.password_width)
+        self._id_entry = struct.Struct(f"<{self.id_width}sI")
+        if record_size != self._record.size:
+            raise StoreError(path, "размер записи не совпадает с заголовком")
+
+    def __len__(self):
+        return self.count
+
+    def _raw(self, number):
+        return self._record.unpack_from(self._map, self.records_offset + number * self._record.size)
+
+    def _decode(self, raw):
+        login, user_id, password, admin, heap_offset, heap_length = raw
+        if heap_length:
+            start = self.heap_offset + heap_offset
+            extra = json.loads(self._map[start:start + heap_length])
+        else:
+            extra = {"commands": {}}
+        return _text(user_id), {"login": _text(login), "password": _text(password), **extra,
+                                "admin": bool(admin)}
+
+    def find_login(self, login):
+        """(id, запись) или None - двоичный поиск по записям"""
+        if self._map is None:
+            return None
+        key = _pad(login, self.login_width)
+        if key is None:
+            return None
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            offset = self.records_offset + middle * self._record.size
+            current = self._map[offset:offset + self.login_width]
+            if current < key:
+                low = middle + 1
+            elif current > key:
+                high = middle
+            else:
+                return self._decode(self._raw(middle))
+        return None
+
+    def find_id(self, user_id):
+        if self._map is None:
+            return None
+        key = _pad(user_id, self.id_width)
+        if key is None:
+            return None
+        size = self._id_entry.size
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            current, number = self._id_entry.unpack_from(self._map, self.ids_offset + middle * size)
+            if current < key:
+                low = middle + 1
+            elif current > key:
+                high = middle
+            else:
+                return self._decode(self._raw(number))[1]
+        return None
+
+    def __iter__(self):
+        """Пары (id, запись) в порядке id"""
+        size = self._id_entry.size if self._map is not None else 0
+        for index in range(self.count):
+            _, number = self._id_entry.unpack_from(self._map, self.ids_offset + index * size)
+            yield self._decode(self._raw(number))
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m elliot_bot.snapshot",
+                                     description="Перевод базы между JSON и двоичным снимком")
+    parser.add_argument("action", choices=("to-snap", "to-json", "compact"))
+    parser.add_argument("source", nargs="?", help="для compact - снимок, по умолчанию ~/elliot_users.snap")
+    parser.add_argument("target", nargs="?")
+    args = parser.parse_args(argv)
+    if args.action != "compact" and not (args.source and args.target):
+        parser.error(f"{args.action}: нужны source и target")
+
+    try:
+        if args.action == "compact":
+            from .store import USERS_SNAPSHOT_FILE, SnapshotUserStore
+
+            store = SnapshotUserStore(args.source or USERS_SNAPSHOT_FILE)
+            try:
+                count = store.compact()
+            finally:
+                store.close()
+            print(f"В снимке {store.path} теперь {count} пользователей, журнал пуст")
+            return 0
+        if args.action == "to-snap":
+            with open(args.source, 'r', encoding='utf-8') as f:
+                users = json.load(f)
+            count = write_snapshot(args.target, ((str(user_id), record) for user_id, record in users.items()))
+        else:
+            snapshot = SnapshotFile(args.source)
+            users = dict(snapshot)
+            snapshot.close()
+            atomic_write(args.target, json.dumps(users, indent=2, ensure_ascii=False))
+            count = len(users)
+    except (OSError, ValueError, StoreError) as error:
+        print(f"Ошибка: {error}", file=sys.stderr)
+        return 1
+    print(f"Записано {count} пользователей в {args.target}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1059 @@
+import atexit
+import contextlib
+import json
+import os
+import threading
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from .errors import StoreError, ValidationError
+from .files import atomic_file, atomic_write
+from .metrics import timer
+from .snapshot import SnapshotFile, write_snapshot
+
+
+HOME_DIR = os.path.expanduser("~")
+USERS_FILE = os.path.join(HOME_DIR, "elliot_users.json")
+# Журнал пользователей: одна JSON-запись на строку, новые записи дописываются в конец
+USERS_LOG_FILE = os.path.join(HOME_DIR, "elliot_users.jsonl")
+# Двоичный снимок (snapshot.py), новые записи - в журнал рядом с ним
+USERS_SNAPSHOT_FILE = os.path.join(HOME_DIR, "elliot_users.snap")
+# Шарды: папка с журналами, пользователь попадает в шард по хэшу логина
+USERS_SHARDS_DIR = os.path.join(HOME_DIR, "elliot_users_shards")
+# Сколько шардов у новой базы; потом меняется через python -m elliot_bot.shards rebalance
+SHARD_COUNT = int(os.environ.get("ELLIOT_SHARDS", 8))
+# Какое хранилище использовать: "log" (по умолчанию), "json" (старый формат), "snap" или "sharded"
+STORE_BACKEND = os.environ.get("ELLIOT_STORE", "log")
+# fsync журнала делается пачками: каждые FSYNC_EVERY записей, остаток - не позже чем через FSYNC_INTERVAL секунд
+FSYNC_EVERY = 16
+FSYNC_INTERVAL = 1.0
+# Журнал сжимается, когда в нём не меньше COMPACT_MIN_RECORDS записей и больше половины устарели
+COMPACT_MIN_RECORDS = 1000
+# Сколько id процесс резервирует за одно обращение к счётчику
+ID_BLOCK_SIZE = 32
+# Журнал рядом со снимком переносится в новый снимок, когда дорастает до этого размера
+SNAPSHOT_JOURNAL_MAX_BYTES = 4 << 20
+# Пачка записей при переносе базы из журнала в другое хранилище
+MIGRATE_BATCH_SIZE = 1000
+
+
+# Хранилища пользователей
+class UserStore:
+    """
+    Базовое хранилище пользователей.
+    Держит в памяти словари id -> запись и логин -> id,
+    поэтому поиск по id и по логину занимает O(1).
+    Как загружать и сохранять записи на диск, решают наследники.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._users = {}
+        self._logins = {}
+        self._loaded = False
+        self._ids = None
+
+    def _load(self):
+        raise NotImplementedError
+
+    def _persist(self, user_id, record):
+        raise NotImplementedError
+
+    def _ensure_loaded(self):
+        # Читаем базу только когда она действительно понадобилась
+        if not self._loaded:
+            with timer("store_load", backend=type(self).__name__):
+                self._load()
+            self._loaded = True
+
+    def _index(self, user_id, record):
+        self._users[user_id] = record
+        # При повторяющихся логинах побеждает первый, как и при старом переборе
+        self._logins.setdefault(record["login"], user_id)
+
+    def __len__(self):
+        self._ensure_loaded()
+        return len(self._users)
+
+    def __contains__(self, user_id):
+        self._ensure_loaded()
+        return user_id in self._users
+
+    def items(self):
+        self._ensure_loaded()
+        return self._users.items()
+
+    def get(self, user_id):
+        self._ensure_loaded()
+        return self._users.get(user_id)
+
+    def find_by_login(self, login):
+        self._ensure_loaded()
+        user_id = self._logins.get(login)
+        if user_id is None:
+            return None
+        return user_id, self._users[user_id]
+
+    def add(self, user_id, record):
+        self._ensure_loaded()
+        self._persist(user_id, record)
+        self._index(user_id, record)
+
+    def _persist_many(self, items):
+        for user_id, record in items:
+            self._persist(user_id, record)
+
+    def add_many(self, items):
+        """Пачка пар (id, запись) за одно сохранение"""
+        self._ensure_loaded()
+        self._persist_many(items)
+        for user_id, record in items:
+            self._index(user_id, record)
+
+    def iter_users(self):
+        """Пары (id, запись) по одной, для выгрузки"""
+        yield from list(self.items())
+
+    def _max_id(self):
+        return max((int(user_id) for user_id, _ in self.items() if user_id.isdigit()), default=0)
+
+    def _id_allocator(self):
+        if self._ids is None:
+            self._ids = IdAllocator(self.path + ".seq", first_id=lambda: self._max_id() + 1)
+        return self._ids
+
+    def next_id(self):
+        """Новый уникальный id; база читается только при самом первом запуске счётчика"""
+        return self._id_allocator().next_id()
+
+    def next_ids(self, count):
+        """Сразу count новых id - для пачки при импорте"""
+        return self._id_allocator().next_ids(count)
+
+    def advance_ids(self, next_id):
+        """Новые id будут не меньше next_id - после импорта в пустую базу со своими id"""
+        self._id_allocator().advance(next_id)
+
+    def close(self):
+        pass
+
+    def create_empty(self):
+        """Пустая база на диске для нового пользователя бота"""
+        open(self.path, 'a', encoding='utf-8').close()
+
+    def export_json(self, path):
+        """Выгружает базу в старом формате elliot_users.json"""
+        users = dict(self.items())
+        with atomic_file(path, 'w') as f:
+            json.dump(users, f, indent=2, ensure_ascii=False)
+        return len(users)
+
+    def import_users(self, items):
+        """Загружает пары (id, запись) пачками, с их id; возвращает сколько загружено"""
+        count = 0
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= MIGRATE_BATCH_SIZE:
+                self.add_many(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            self.add_many(batch)
+            count += len(batch)
+        return count
+
+    def import_json(self, path):
+        """Загружает пользователей из файла в старом формате elliot_users.json"""
+        with open(path, 'r', encoding='utf-8') as f:
+            users = json.load(f)
+        return self.import_users((str(user_id), record) for user_id, record in users.items())
+
+
+class JsonUserStore(UserStore):
+    """Старый формат: весь словарь в одном JSON, при сохранении файл переписывается."""
+
+    def create_empty(self):
+        self.export_json(self.path)
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                users = json.load(f)
+        except FileNotFoundError:
+            users = {}
+        except json.JSONDecodeError as error:
+            raise StoreError(self.path, str(error))
+        for user_id, record in users.items():
+            self._index(user_id, record)
+
+    def _persist(self, user_id, record):
+        self._persist_many([(user_id, record)])
+
+    def _persist_many(self, items):
+        users = dict(self._users)
+        users.update(items)
+        # Атомарная подмена, чтобы падение не оставило обрезанную базу
+        with atomic_file(self.path, 'w', fsync=True) as f:
+            json.dump(users, f, indent=2, ensure_ascii=False)
+
+
+class FileLock:
+    """
+    Межпроцессная блокировка через отдельный файл .lock.
+    Можно брать повторно внутри одного процесса (например, compact внутри add).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._depth = 0
+
+    def __enter__(self):
+        if self._depth == 0:
+            self._file = open(self.path, 'a+b')
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._depth -= 1
+        if self._depth == 0:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            self._file.close()
+            self._file = None
+
+
+class IdAllocator:
+    """
+    Выдаёт возрастающие id пользователей, не читая базу.
+    Следующий свободный id хранится в файле .seq. Процесс под блокировкой
+    резервирует сразу блок из block_size id и раздаёт их из памяти,
+    поэтому несколько ботов никогда не получат одинаковый id, а id
+    удалённых пользователей не выдаются повторно.
+    """
+
+    def __init__(self, path, block_size=ID_BLOCK_SIZE, first_id=None):
+        self.path = path
+        self.block_size = block_size
+        # first_id вызывается один раз, когда файла .seq ещё нет
+        self._first_id = first_id
+        self._lock = FileLock(path + ".lock")
+        self._next = 0
+        self._limit = 0
+
+    def _read(self):
+        """Следующий свободный id из файла или None, если счётчика ещё нет"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return int(f.read())
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            raise StoreError(self.path, "счётчик id испорчен")
+
+    def _write(self, next_id):
+        # Без fsync после падения id выданного блока могли бы выдать ещё раз
+        atomic_write(self.path, str(next_id), fsync=True)
+
+    def _reserve(self, count=1):
+        block_size = max(self.block_size, count)
+        with self._lock:
+            start = self._read()
+            if start is None:
+                start = self._first_id() if self._first_id else 1
+            self._write(start + block_size)
+        self._next = start
+        self._limit = start + block_size
+
+    def advance(self, next_id):
+        """
+        Сдвигает счётчик так, чтобы дальше выдавались id не меньше next_id.
+        Если счётчика ещё нет, базу не читаем: next_id и есть следующий id.
+        """
+        with self._lock:
+            start = self._read()
+            if start is None or start < next_id:
+                self._write(next_id)
+        # Уже взятый блок мог попасть на импортированные id - берём новый
+        if self._next < next_id:
+            self._next = self._limit = 0
+
+    def next_id(self):
+        if self._next >= self._limit:
+            self._reserve()
+        user_id = self._next
+        self._next += 1
+        return str(user_id)
+
+    def next_ids(self, count):
+        """count новых id подряд, одним обращением к счётчику"""
+        if self._limit - self._next < count:
+            self._reserve(count)
+        start = self._next
+        self._next += count
+        return [str(user_id) for user_id in range(start, start + count)]
+
+
+class LoginIndex:
+    """
+    Вторичный индекс логин -> (id, смещение записи в журнале).
+    Хранится рядом с журналом в файле .idx и помнит, до какого байта
+    журнала и для какого поколения журнала он построен. При запуске индекс
+    читается с диска и дочитывает только новые строки журнала, а не всю базу.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.reset()
+
+    def reset(self, generation=0):
+        self.size = 0
+        self.generation = generation
+        self.records = 0
+        self.dirty = False
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def load(self, log_size, generation):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+        # Журнал сжат или стал короче индекса - индекс устарел, строим заново
+        if data.get("generation", 0) != generation or data.get("size", 0) > log_size:
+            return False
+        self.size = data["size"]
+        self.generation = generation
+        self.records = data.get("records", len(data["logins"]))
+        self._entries = data["logins"]
+        self.dirty = False
+        return True
+
+    def save(self):
+        if not self.dirty:
+            return
+        data = {
+            "size": self.size,
+            "generation": self.generation,
+            "records": self.records,
+            "logins": self._entries,
+        }
+        # Индекс всегда можно построить заново по журналу, fsync ему не нужен
+        atomic_write(self.path, json.dumps(data, ensure_ascii=False))
+        self.dirty = False
+
+    def get(self, login):
+        return self._entries.get(login)
+
+    def add(self, login, user_id, offset):
+        entry = self._entries.get(login)
+        # Первый владелец логина остаётся, его же новые записи обновляют смещение
+        if entry is None or entry[0] == user_id:
+            self._entries[login] = [user_id, offset]
+        self.records += 1
+        self.dirty = True
+
+
+class LogUserStore(UserStore):
+    """
+    Журнал упреждающей записи: каждая запись - отдельная строка JSON.
+    Новый пользователь дописывается в конец файла одним write под
+    межпроцессной блокировкой, поэтому несколько ботов могут писать в
+    одну базу одновременно. fsync делается пачками: раз в fsync_every
+    записей, а остаток - таймером через fsync_interval секунд после
+    первой несинхронизированной записи, и обязательно при закрытии.
+    Если id встречается несколько раз, действует последняя запись.
+    Когда устаревших записей становится больше половины, журнал сжимается
+    в снимок: во временный файл пишется заголовок с новым поколением и
+    по одной записи на пользователя, затем файл атомарно подменяет журнал.
+    Вход идёт через LoginIndex и читает с диска только одну запись,
+    полностью база загружается лишь когда нужен перебор или подсчёт.
+    """
+
+    def __init__(self, path, fsync_every=FSYNC_EVERY, fsync_interval=FSYNC_INTERVAL,
+                 compact_min_records=COMPACT_MIN_RECORDS):
+        super().__init__(path)
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.compact_min_records = compact_min_records
+        self._lock = FileLock(path + ".lock")
+        self._login_index = LoginIndex(path + ".idx")
+        self._login_index_ready = False
+        self._inode = None
+        self._fd = None
+        self._unsynced = 0
+        # fsync по таймеру идёт из другого потока: дескриптор и счётчик - под этой блокировкой
+        self._sync_lock = threading.Lock()
+        self._sync_timer = None
+
+    def _read_header(self):
+        """Поколение журнала из первой строки; у несжатого журнала оно 0"""
+        try:
+            with open(self.path, 'rb') as f:
+                first_line = f.readline()
+        except FileNotFoundError:
+            return 0
+        if not first_line.endswith(b"\n"):
+            return 0
+        try:
+            header = json.loads(first_line)
+        except json.JSONDecodeError:
+            return 0
+        if "id" in header:
+            return 0
+        return header.get("generation", 0)
+
+    def _read_lines(self, start=0):
+        """Отдаёт (смещение, конец строки, запись) для каждой записи журнала начиная с байта start"""
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            yield from self._read_file(f, start)
+
+    def _read_file(self, f, start=0, size=None):
+        """То же по уже открытому файлу журнала, не дальше байта size"""
+        f.seek(start)
+        offset = start
+        for line in f:
+            if size is not None and offset + len(line) > size:
+                break
+            line_offset = offset
+            offset += len(line)
+            # Недописанная строка после падения - её как будто нет
+            if not line.endswith(b"\n"):
+                break
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as error:
+                raise StoreError(self.path, f"байт {line_offset}: {error}")
+            if "id" not in record:
+                continue  # заголовок снимка
+            yield line_offset, offset, record
+
+    def _stat(self):
+        try:
+            return os.stat(self.path)
+        except FileNotFoundError:
+            return None
+
+    def _apply(self, offset, record):
+        user_id = record.pop("id")
+        if self._loaded:
+            self._index(user_id, record)
+        self._login_index.add(record["login"], user_id, offset)
+
+    def _refresh(self):
+        """Подхватывает записи, которые дописали другие процессы"""
+        st = self._stat()
+        if st is None:
+            return
+        if self._inode is not None and st.st_ino != self._inode:
+            # Журнал сжали в другом процессе - смещения поменялись, перечитываем
+            loaded = self._loaded
+            self._loaded = False
+            self._login_index_ready = False
+            if loaded:
+                self._ensure_loaded()
+            else:
+                self._ensure_login_index()
+            return
+        self._inode = st.st_ino
+        index = self._login_index
+        if st.st_size > index.size:
+            for offset, end, record in self._read_lines(index.size):
+                self._apply(offset, record)
+                index.size = end
+
+    def _ensure_login_index(self):
+        if self._login_index_ready:
+            return
+        with timer("store_index_load"):
+            self._load_login_index()
+
+    def _load_login_index(self):
+        index = self._login_index
+        st = self._stat()
+        generation = self._read_header()
+        self._inode = st.st_ino if st else None
+        if not index.load(st.st_size if st else 0, generation):
+            index.reset(generation)
+        self._login_index_ready = True
+        # Дочитываем только то, что дописано в журнал после сохранения индекса
+        self._refresh()
+        index.save()
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            self._refresh()
+            return
+        # Полная загрузка заодно строит индекс логинов с нуля
+        with timer("store_load", backend=type(self).__name__):
+            self._users.clear()
+            self._logins.clear()
+            st = self._stat()
+            self._inode = st.st_ino if st else None
+            self._login_index.reset(self._read_header())
+            self._login_index.dirty = True
+            self._loaded = True
+            self._login_index_ready = True
+            self._refresh()
+
+    def _read_at(self, offset):
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            record = json.loads(f.readline())
+        record.pop("id")
+        return record
+
+    def find_by_login(self, login):
+        if self._loaded:
+            return super().find_by_login(login)
+        with self._lock:
+            if self._login_index_ready:
+                self._refresh()
+            else:
+                self._ensure_login_index()
+            entry = self._login_index.get(login)
+            if entry is None:
+                return None
+            user_id, offset = entry
+            return user_id, self._read_at(offset)
+
+    def _append_fd(self):
+        # После сжатия журнал - это новый файл, старый дескриптор к нему не относится
+        if self._fd is not None:
+            st = self._stat()
+            if st is None or os.fstat(self._fd).st_ino != st.st_ino:
+                self._close_fd()
+        if self._fd is None:
+            # Чтение нужно, чтобы проверить последний байт перед дозаписью (_repair_tail)
+            flags = os.O_RDWR | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0)
+            self._fd = os.open(self.path, flags, 0o644)
+        return self._fd
+
+    @staticmethod
+    def _read_fd(fd, length, offset):
+        if hasattr(os, "pread"):
+            return os.pread(fd, length, offset)
+        # Windows: с O_APPEND запись всё равно идёт в конец, позицию можно двигать
+        os.lseek(fd, offset, os.SEEK_SET)
+        return os.read(fd, length)
+
+    def _repair_tail(self, fd):
+        """Отрезает недописанную строку, оставшуюся после падения другого процесса"""
+        size = os.fstat(fd).st_size
+        # Обычно журнал цел - хватает одного байта
+        if size == 0 or self._read_fd(fd, 1, size - 1) == b"\n":
+            return
+        start = max(0, size - 65536)
+        tail = self._read_fd(fd, size - start, start)
+        cut = tail.rfind(b"\n")
+        os.ftruncate(fd, start + cut + 1)
+
+    def _sync(self, added=0, force=False):
+        """Учитывает added новых записей и делает fsync, если их набралось fsync_every"""
+        with self._sync_lock:
+            self._unsynced += added
+            if self._fd is None or self._unsynced == 0:
+                return
+            if force or self._unsynced >= self.fsync_every:
+                self._fsync()
+            elif self._sync_timer is None:
+                # Без новых записей остаток иначе так и ждал бы закрытия
+                self._sync_timer = threading.Timer(self.fsync_interval, self._sync, kwargs={"force": True})
+                self._sync_timer.daemon = True
+                self._sync_timer.start()
+
+    def _fsync(self):
+        os.fsync(self._fd)
+        self._unsynced = 0
+        if self._sync_timer is not None:
+            self._sync_timer.cancel()
+            self._sync_timer = None
+
+    def _close_fd(self):
+        with self._sync_lock:
+            if self._fd is None:
+                return
+            if self._unsynced:
+                self._fsync()
+            os.close(self._fd)
+            self._fd = None
+
+    def add(self, user_id, record):
+        self.add_many([(user_id, record)])
+
+    def add_many(self, items):
+        """Пачка записей дописывается в журнал одним write под одной блокировкой"""
+        lines = [json.dumps({"id": user_id, **record}, ensure_ascii=False).encode('utf-8') + b"\n"
+                 for user_id, record in items]
+        data = b"".join(lines)
+        active = self._loaded or self._login_index_ready
+        with self._lock:
+            if active:
+                self._refresh()
+            fd = self._append_fd()
+            self._repair_tail(fd)
+            offset = os.lseek(fd, 0, os.SEEK_END)
+            written = 0
+            while written < len(data):
+                written += os.write(fd, data[written:])
+            self._sync(added=len(lines))
+            # save_user сразу обновляет индекс, перестраивать его не нужно
+            if active:
+                for (user_id, record), line in zip(items, lines):
+                    self._apply(offset, {"id": user_id, **record})
+                    offset += len(line)
+                self._login_index.size = offset
+                index = self._login_index
+                if index.records >= self.compact_min_records and index.records > 2 * len(index):
+                    self.compact()
+
+    def _max_id(self):
+        # Перебор журнала по одной записи, без загрузки всей базы в память
+        return max((int(user_id) for user_id, _ in self.iter_users() if user_id.isdigit()), default=0)
+
+    def iter_users(self):
+        """
+        Пользователи прямо из журнала, по одной записи: вся база в память
+        не загружается. Первый проход запоминает смещение последней записи
+        каждого id, второй отдаёт только эти записи - так попадают и
+        пользователи с одинаковыми логинами.
+        """
+        if self._loaded:
+            yield from super().iter_users()
+            return
+        with self._lock:
+            try:
+                f = open(self.path, 'rb')
+            except FileNotFoundError:
+                return
+            size = os.fstat(f.fileno()).st_size
+        # Файл открыт один раз: если журнал сожмут, оба прохода читают старый
+        with f:
+            latest = {record["id"]: offset for offset, end, record in self._read_file(f, 0, size)}
+            for offset, end, record in self._read_file(f, 0, size):
+                user_id = record.pop("id")
+                if latest[user_id] == offset:
+                    yield user_id, record
+
+    def compact(self):
+        """Сжимает журнал в снимок: по одной последней записи на пользователя"""
+        with self._lock:
+            latest = {}
+            for offset, end, record in self._read_lines(0):
+                latest[record["id"]] = record
+            generation = self._read_header() + 1
+            new_index = LoginIndex(self._login_index.path)
+            new_index.reset(generation)
+
+            self._close_fd()
+            with atomic_file(self.path, 'wb', fsync=True) as f:
+                position = f.write(json.dumps({"generation": generation}).encode('utf-8') + b"\n")
+                for user_id, record in latest.items():
+                    line = json.dumps(record, ensure_ascii=False).encode('utf-8') + b"\n"
+                    new_index.add(record["login"], user_id, position)
+                    position += f.write(line)
+
+            new_index.size = position
+            new_index.save()
+            self._login_index = new_index
+            self._login_index_ready = True
+            self._inode = os.stat(self.path).st_ino
+            if self._loaded:
+                self._users.clear()
+                self._logins.clear()
+                for user_id, record in latest.items():
+                    record.pop("id")
+                    self._index(user_id, record)
+            return len(latest)
+
+    def close(self):
+        self._close_fd()
+        if self._login_index_ready:
+            with self._lock:
+                self._login_index.save()
+
+
+class SnapshotUserStore(UserStore):
+    """
+    Двоичный снимок через mmap плюс журнал LogUserStore для новых записей.
+    Поиск сначала идёт по журналу (он маленький), затем двоичным поиском
+    по снимку; в памяти процесса лежит только индекс журнала. compact()
+    переносит журнал в новый снимок и начинает пустой журнал - сам, когда
+    журнал дорос до journal_max_bytes, или через
+    python -m elliot_bot.snapshot compact.
+    """
+
+    def __init__(self, path, journal_max_bytes=SNAPSHOT_JOURNAL_MAX_BYTES):
+        super().__init__(path)
+        self.journal = LogUserStore(path + ".jsonl")
+        self.journal_max_bytes = journal_max_bytes
+        self._snapshot = None
+
+    def _current_snapshot(self):
+        # Снимок пересобрали в другом процессе - отображаем новый файл
+        st = self._stat_snapshot()
+        inode = st.st_ino if st else None
+        if self._snapshot is None or self._snapshot.inode != inode:
+            if self._snapshot is not None:
+                self._snapshot.close()
+            self._snapshot = SnapshotFile(self.path)
+        return self._snapshot
+
+    def _stat_snapshot(self):
+        try:
+            return os.stat(self.path)
+        except FileNotFoundError:
+            return None
+
+    def _load(self):
+        for user_id, record in self.iter_users():
+            self._index(user_id, record)
+
+    def find_by_login(self, login):
+        found = self.journal.find_by_login(login)
+        if found is not None:
+            return found
+        return self._current_snapshot().find_login(login)
+
+    def get(self, user_id):
+        record = self.journal.get(user_id)
+        if record is not None:
+            return record
+        return self._current_snapshot().find_id(user_id)
+
+    def __contains__(self, user_id):
+        return self.get(user_id) is not None
+
+    def __len__(self):
+        snapshot = self._current_snapshot()
+        added = sum(1 for user_id, _ in self.journal.items() if snapshot.find_id(user_id) is None)
+        return len(snapshot) + added
+
+    def add(self, user_id, record):
+        self.add_many([(user_id, record)])
+
+    def add_many(self, items):
+        self.journal.add_many(items)
+        # Полная копия в памяти есть, только если кто-то уже перебирал базу
+        if self._loaded:
+            for user_id, record in items:
+                self._index(user_id, record)
+        if self._journal_full():
+            with self.journal._lock:
+                # Пока ждали блокировку, журнал мог сжать другой процесс
+                if self._journal_full():
+                    self.compact()
+
+    def _journal_full(self):
+        try:
+            return os.path.getsize(self.journal.path) >= self.journal_max_bytes
+        except FileNotFoundError:
+            return False
+
+    def iter_users(self):
+        """Снимок в порядке id, записи из журнала поверх него"""
+        newer = dict(self.journal.items())
+        for user_id, record in self._current_snapshot():
+            if user_id not in newer:
+                yield user_id, record
+        yield from newer.items()
+
+    def _max_id(self):
+        return max(self._current_snapshot().max_id, self.journal._max_id())
+
+    def import_users(self, items):
+        count = super().import_users(items)
+        self.compact()
+        return count
+
+    def compact(self):
+        """Снимок + журнал -> новый снимок, журнал начинается заново"""
+        journal = self.journal
+        # Под блокировкой журнала никто не допишет запись, пока его подменяем
+        with journal._lock:
+            count = write_snapshot(self.path, self.iter_users())
+            generation = journal._read_header() + 1
+            journal.close()
+            # Новый журнал - новое поколение: индекс .idx старого журнала к нему
+            # не подойдёт, даже когда новый дорастёт до старого размера
+            atomic_write(journal.path, json.dumps({"generation": generation}).encode('utf-8') + b"\n",
+                         fsync=True)
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(journal.path + ".idx")
+            self.journal = LogUserStore(journal.path)
+        self._loaded = False
+        return count
+
+    def close(self):
+        self.journal.close()
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+
+
+def shard_of(login, shards):
+    """Номер шарда для логина; crc32, а не hash(), чтобы он не менялся между процессами"""
+    return zlib.crc32(login.encode("utf-8")) % shards
+
+
+class ShardedUserStore(UserStore):
+    """
+    База, разбитая на шарды: path - папка, в ней shards.json (сколько
+    шардов и поколение раскладки) и по журналу LogUserStore на шард.
+    Пользователь живёт в шарде shard_of(логин), у каждого шарда свой файл
+    и своя блокировка, поэтому регистрации и входы из разных процессов
+    почти не ждут друг друга. id выдаёт общий счётчик блоками, как и раньше.
+
+    rebalance() переписывает пользователей в новое поколение шардов,
+    держа блокировки всех старых, и подменяет shards.json. Процесс, который
+    дождался блокировки старого шарда, видит новый shards.json и
+    повторяет запись уже в новой раскладке, так что записи не теряются.
+    Но всё это время любой вход или регистрация ждёт, а с ними и event
+    loop бота, поэтому rebalance запускают при остановленных ботах.
+    """
+
+    def __init__(self, path, shards=SHARD_COUNT):
+        super().__init__(path)
+        self.default_shards = shards
+        self._manifest_path = os.path.join(path, "shards.json")
+        self._manifest_inode = None
+        self.generation = None
+        self.shards = []
+
+    def _shard_path(self, generation, number):
+        return os.path.join(self.path, f"users-{generation}-{number:03d}.jsonl")
+
+    def _write_manifest(self, shards, generation):
+        atomic_write(self._manifest_path, json.dumps({"shards": shards, "generation": generation}), fsync=True)
+
+    def create_empty(self):
+        os.makedirs(self.path, exist_ok=True)
+        with FileLock(os.path.join(self.path, "rebalance.lock")):
+            if not os.path.exists(self._manifest_path):
+                self._write_manifest(self.default_shards, 1)
+
+    def _manifest_moved(self):
+        try:
+            return os.stat(self._manifest_path).st_ino != self._manifest_inode
+        except FileNotFoundError:
+            return True
+
+    def _check_layout(self):
+        """Открывает шарды заново, если shards.json подменили (rebalance в другом процессе)"""
+        if self._manifest_inode is not None and not self._manifest_moved():
+            return
+        try:
+            f = open(self._manifest_path, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            self.create_empty()
+            f = open(self._manifest_path, 'r', encoding='utf-8')
+        with f:
+            inode = os.fstat(f.fileno()).st_ino
+            try:
+                manifest = json.load(f)
+            except json.JSONDecodeError as error:
+                raise StoreError(self._manifest_path, str(error))
+        for shard in self.shards:
+            shard.close()
+            if not os.path.exists(shard.path):
+                # Шард убрал rebalance, а close заново создал его индекс и .lock - они не нужны
+                for suffix in (".idx", ".lock"):
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(shard.path + suffix)
+        self.generation = manifest["generation"]
+        self.shards = [LogUserStore(self._shard_path(self.generation, number))
+                       for number in range(manifest["shards"])]
+        self._manifest_inode = inode
+
+    def shard_for(self, login):
+        self._check_layout()
+        return self.shards[shard_of(login, len(self.shards))]
+
+    def _load(self):
+        for user_id, record in self.iter_users():
+            self._index(user_id, record)
+
+    def find_by_login(self, login):
+        try:
+            return self.shard_for(login).find_by_login(login)
+        except FileNotFoundError:
+            # Шард удалили после rebalance, пока мы читали - берём новую раскладку
+            return self.shard_for(login).find_by_login(login)
+
+    def get(self, user_id):
+        # По id шард не вычислить - смотрим все
+        self._check_layout()
+        for shard in self.shards:
+            record = shard.get(user_id)
+            if record is not None:
+                return record
+        return None
+
+    def add(self, user_id, record):
+        self.add_many([(user_id, record)])
+
+    def add_many(self, items):
+        pending = list(items)
+        while pending:
+            self._check_layout()
+            groups = {}
+            for user_id, record in pending:
+                groups.setdefault(shard_of(record["login"], len(self.shards)), []).append((user_id, record))
+            pending = []
+            for number, group in groups.items():
+                shard = self.shards[number]
+                with shard._lock:
+                    # Пока ждали блокировку, шарды могли переложить - запишем в новую раскладку
+                    if self._manifest_moved():
+                        pending.extend(group)
+                        continue
+                    shard.add_many(group)
+                if self._loaded:
+                    for user_id, record in group:
+                        self._index(user_id, record)
+
+    def iter_users(self):
+        self._check_layout()
+        for shard in self.shards:
+            yield from shard.iter_users()
+
+    def _max_id(self):
+        self._check_layout()
+        return max((shard._max_id() for shard in self.shards), default=0)
+
+    def compact(self):
+        self._check_layout()
+        return sum(shard.compact() for shard in self.shards)
+
+    def rebalance(self, shards, batch_size=1000):
+        """Перекладывает всех пользователей в shards шардов, возвращает их число"""
+        if shards < 1:
+            raise ValidationError(shards, "число шардов от 1")
+        with FileLock(os.path.join(self.path, "rebalance.lock")):
+            self._check_layout()
+            old = self.shards
+            generation = self.generation + 1
+            new = [LogUserStore(self._shard_path(generation, number)) for number in range(shards)]
+            moved = 0
+            with contextlib.ExitStack() as stack:
+                # Блокировки берутся по порядку, а писатели держат по одной - взаимной блокировки нет
+                for shard in old:
+                    stack.enter_context(shard._lock)
+                batches = [[] for _ in new]
+                for shard in old:
+                    for user_id, record in shard.iter_users():
+                        number = shard_of(record["login"], shards)
+                        batches[number].append((user_id, record))
+                        if len(batches[number]) >= batch_size:
+                            new[number].add_many(batches[number])
+                            batches[number].clear()
+                        moved += 1
+                for shard, batch in zip(new, batches):
+                    if batch:
+                        shard.add_many(batch)
+                    shard.close()
+                self._write_manifest(shards, generation)
+            for shard in old:
+                shard.close()
+                for suffix in ("", ".idx", ".lock"):
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(shard.path + suffix)
+            self.shards = []
+            self._check_layout()
+        self._loaded = False
+        return moved
+
+    def stats(self):
+        """(номер, файл, байт) по шардам - сколько места занимает каждый"""
+        self._check_layout()
+        return [(number, shard.path, os.path.getsize(shard.path) if os.path.exists(shard.path) else 0)
+                for number, shard in enumerate(self.shards)]
+
+    def close(self):
+        for shard in self.shards:
+            shard.close()
+
+
+STORE_BACKENDS = {
+    "json": (JsonUserStore, USERS_FILE),
+    "log": (LogUserStore, USERS_LOG_FILE),
+    "snap": (SnapshotUserStore, USERS_SNAPSHOT_FILE),
+    "sharded": (ShardedUserStore, USERS_SHARDS_DIR),
+}
+
+
+def _migrate_log(store):
+    """Копирует пользователей из журнала с их id; счётчик id продолжается с того же места"""
+    source = LogUserStore(USERS_LOG_FILE)
+    try:
+        count = store.import_users(source.iter_users())
+        next_id = source._max_id() + 1
+    finally:
+        source.close()
+    try:
+        with open(USERS_LOG_FILE + ".seq", 'r', encoding='utf-8') as f:
+            next_id = max(next_id, int(f.read()))
+    except (FileNotFoundError, ValueError):
+        pass
+    store.advance_ids(next_id)
+    return count
+
+
+def open_user_store(backend=STORE_BACKEND):
+    if backend not in STORE_BACKENDS:
+        raise ValidationError(backend, ", ".join(STORE_BACKENDS))
+    store_class, path = STORE_BACKENDS[backend]
+
+    if os.path.exists(path):
+        print("Используется локальная база данных")
+        return store_class(path)
+
+    store = store_class(path)
+    if path != USERS_LOG_FILE and os.path.exists(USERS_LOG_FILE):
+        # Переносим пользователей из журнала; elliot_users.json рядом с ним уже устарел
+        count = _migrate_log(store)
+        print(f"База данных перенесена из {USERS_LOG_FILE}: {count} пользователей")
+    elif path != USERS_FILE and os.path.exists(USERS_FILE):
+        # Переносим пользователей из старого elliot_users.json
+        count = store.import_json(USERS_FILE)
+        print(f"База данных перенесена из {USERS_FILE}: {count} пользователей")
+    else:
+        print("База данных не найдена. Создаем новую...")
+        # Создаем пустую базу
+        store.create_empty()
+    return store
+
+
+_users_store = None
+
+
+def get_users_store():
+    """Открывает базу при первом обращении, а не при импорте модуля"""
+    global _users_store
+    if _users_store is None:
+        _users_store = open_user_store()
+        atexit.register(_users_store.close)
+    return _users_store
@@ -0,0 +1,112 @@
+"""
+Транспорты для движка сессий.
+
+Транспорт отдаёт события ("open", id, источник), ("line", id, строка),
+("close", id, None) через async-итератор events(), принимает ответы
+в send() и закрывает сессию в close_session(). Чтобы подключить бота
+к другому каналу (Telegram, веб), достаточно написать такой же класс.
+"""
+import asyncio
+import sys
+import threading
+
+
+class Transport:
+    async def events(self):
+        raise NotImplementedError
+        yield
+
+    async def send(self, session_id, text):
+        raise NotImplementedError
+
+    async def close_session(self, session_id):
+        pass
+
+
+class ConsoleTransport(Transport):
+    """
+    Одна сессия в консоли: ввод из stdin, вывод в stdout.
+    stdin читается в фоновом потоке-демоне, чтобы event loop не блокировался
+    и процесс мог завершиться, не дожидаясь ещё одной строки ввода.
+    """
+
+    SESSION_ID = "console"
+
+    def __init__(self, stdin=None, stdout=None):
+        self.stdin = stdin or sys.stdin
+        self.stdout = stdout or sys.stdout
+        self._queue = None
+
+    def _read_stdin(self, loop):
+        for line in self.stdin:
+            loop.call_soon_threadsafe(self._queue.put_nowait, line.rstrip("\r\n"))
+        loop.call_soon_threadsafe(self._queue.put_nowait, None)
+
+    async def events(self):
+        self._queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        threading.Thread(target=self._read_stdin, args=(loop,), daemon=True).start()
+        yield "open", self.SESSION_ID, None
+        while True:
+            line = await self._queue.get()
+            if line is None:
+                break
+            yield "line", self.SESSION_ID, line
+        yield "close", self.SESSION_ID, None
+
+    async def send(self, session_id, text):
+        self.stdout.write(text)
+        self.stdout.flush()
+
+    async def close_session(self, session_id):
+        # Сессия закончилась сама ("Выход" или отказ от функций) - перестаём читать stdin
+        self._queue.put_nowait(None)
+
+
+class TcpTransport(Transport):
+    """Каждое TCP-подключение - отдельная сессия, строки в UTF-8 (подходит для telnet/nc)"""
+
+    def __init__(self, host="127.0.0.1", port=8765):
+        self.host = host
+        self.port = port
+        self._events = asyncio.Queue()
+        self._writers = {}
+        self._counter = 0
+
+    async def _handle_client(self, reader, writer):
+        self._counter += 1
+        session_id = f"tcp-{self._counter}"
+        self._writers[session_id] = writer
+        peer = writer.get_extra_info("peername")
+        await self._events.put(("open", session_id, peer[0] if peer else None))
+        try:
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                await self._events.put(("line", session_id, raw.decode("utf-8", "replace").rstrip("\r\n")))
+        finally:
+            if self._writers.pop(session_id, None) is not None:
+                writer.close()
+            await self._events.put(("close", session_id, None))
+
+    async def events(self):
+        server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        async with server:
+            while True:
+                yield await self._events.get()
+
+    async def send(self, session_id, text):
+        writer = self._writers.get(session_id)
+        if writer is None:
+            return
+        try:
+            writer.write(text.encode("utf-8"))
+            await writer.drain()
+        except ConnectionError:
+            pass  # Клиент уже отключился
+
+    async def close_session(self, session_id):
+        writer = self._writers.pop(session_id, None)
+        if writer is not None:
+            writer.close()
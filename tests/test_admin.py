@@ -0,0 +1,64 @@
+import io
+import json
+
+import pytest
+
+from elliot_bot import admin
+from elliot_bot.errors import StoreError, ValidationError
+from elliot_bot.store import LogUserStore
+
+
+USERS = {
+    "1": {"login": "alice", "password": "h1", "commands": {"1": 2}, "admin": True},
+    "2": {"login": "bob", "password": "h2", "commands": {}, "admin": False},
+    "7": {"login": "carol", "password": "h3", "commands": {}, "admin": False},
+}
+
+
+@pytest.fixture
+def users(tmp_path):
+    users = LogUserStore(str(tmp_path / "users.jsonl"))
+    yield users
+    users.close()
+
+
+def test_iter_json_users_reads_in_small_chunks(monkeypatch):
+    data = json.dumps(USERS, indent=2, ensure_ascii=False).encode("utf-8")
+    # Куски меньше одной записи: значение приходится дочитывать
+    monkeypatch.setattr(admin, "CHUNK_SIZE", 7)
+    assert dict(admin.iter_json_users(io.BytesIO(data), "users.json")) == USERS
+    assert list(admin.iter_json_users(io.BytesIO(b" {} "), "users.json")) == []
+    with pytest.raises(StoreError):
+        list(admin.iter_json_users(io.BytesIO(b'{"1": {"login": "a"} "2"'), "users.json"))
+
+
+def test_import_json_with_new_ids(users, tmp_path):
+    users.add(users.next_id(), {"login": "bob", "password": "old", "commands": {}, "admin": False})
+    path = tmp_path / "users.json"
+    path.write_text(json.dumps({**USERS, "9": {"login": "", "password": "x"}}), encoding="utf-8")
+
+    counts = admin.import_users(users, str(path), batch_size=1)
+    assert (counts["imported"], counts["skipped"], counts["invalid"]) == (2, 1, 1)
+    assert users.find_by_login("bob")[1]["password"] == "old"
+    user_id, record = users.find_by_login("alice")
+    assert record == USERS["1"] and user_id != "1"
+
+
+def test_export_and_import_keep_ids(users, tmp_path):
+    for user_id, record in USERS.items():
+        users.add(user_id, record)
+    for fmt in admin.FORMATS:
+        path = str(tmp_path / f"export.{fmt}")
+        assert admin.export_users(users, path)["exported"] == 3
+
+        target = LogUserStore(str(tmp_path / f"target-{fmt}.jsonl"))
+        assert admin.import_users(target, path, keep_ids=True)["imported"] == 3
+        assert dict(target.iter_users()) == USERS
+        # Новые id идут после перенесённых
+        assert int(target.next_id()) > 7
+        with pytest.raises(ValidationError):
+            admin.import_users(target, path, keep_ids=True)
+        target.close()
+
+    with open(tmp_path / "export.json", encoding="utf-8") as f:
+        assert json.load(f) == USERS
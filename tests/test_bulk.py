@@ -0,0 +1,46 @@
+import pytest
+
+from elliot_bot import bulk, numeric
+from elliot_bot.errors import ValidationError
+
+
+def test_parse_numbers_comma_is_decimal_point():
+    assert bulk.parse_numbers("1,5 2;3") == [1.5, 2, 3]
+    with pytest.raises(ValidationError):
+        bulk.parse_numbers("1 два 3")
+
+
+def test_bulk_operation_keeps_errors_per_element():
+    result = bulk.bulk_operation("/", [1, 2, 3], [1, 0, 2])
+    assert result.values[0] == 1 and result.values[2] == 1.5
+    assert list(result.errors) == [1]
+    assert list(result.lines())[1].startswith("2 ÷ 0 : ")
+
+
+def test_bulk_operation_broadcasts_single_number():
+    assert bulk.bulk_operation("*", [1, 2, 3], [10]).values == [10, 20, 30]
+    assert bulk.bulk_operation("2", [10], [1, 2]).values == [9, 8]
+    with pytest.raises(ValidationError):
+        bulk.bulk_operation("+", [1, 2], [1, 2, 3])
+    with pytest.raises(ValidationError):
+        bulk.bulk_operation("%", [1], [1])
+
+
+def test_bulk_operation_large_ints_stay_exact():
+    left = [2 ** 60 + number for number in range(bulk.NUMPY_MIN_SIZE)]
+    result = bulk.bulk_operation("+", left, [1])
+    assert result.values[-1] == 2 ** 60 + bulk.NUMPY_MIN_SIZE
+
+
+def test_read_csv_columns_skips_header(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("a,b,c\n1,x,2\n3,y,4\n", encoding="utf-8")
+    assert bulk.read_csv_columns(str(path), (0, 2)) == ([1, 3], [2, 4])
+
+
+def test_bulk_operation_unprintable_result_is_an_element_error():
+    big = 10 ** (numeric.MAX_RESULT_DIGITS // 2 + 1)
+    result = bulk.bulk_operation("*", [2, big], [3, big])
+    assert result.values[0] == 6
+    assert list(result.errors) == [1]
+    assert len(list(result.lines())) == 2
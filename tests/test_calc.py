@@ -0,0 +1,48 @@
+import pytest
+
+from elliot_bot import calc, numeric
+from elliot_bot.errors import MathError, ValidationError
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("2+3*(4-1)", 11),
+    ("-2**3", -8),
+    ("7/2", 3.5),
+    ("7//2", 3),
+    ("2 ^ 10", 1024),
+    ("6 × 7 ÷ 2", 21.0),
+    ("1,5 + 1", 2.5),
+])
+def test_evaluate(expression, expected):
+    assert calc.evaluate(expression, "float", cache=None) == expected
+
+
+@pytest.mark.parametrize("expression", ["", "2 3", "__import__('os')", "abs(-1)", "2 * * 3", "1 / / 2"])
+def test_evaluate_rejects_non_arithmetic(expression):
+    with pytest.raises(ValidationError):
+        calc.evaluate(expression, "float", cache=None)
+
+
+@pytest.mark.parametrize("expression", ["1/0", "5 % 0", "2**100000", "10**5000", "9**9999"])
+def test_evaluate_math_errors(expression):
+    with pytest.raises(MathError):
+        calc.evaluate(expression, "float", cache=None)
+
+
+def test_longest_printable_result():
+    result = calc.evaluate(f"10**{calc.MAX_RESULT_DIGITS - 1}", "float", cache=None)
+    assert len(numeric.format_number(result)) == calc.MAX_RESULT_DIGITS
+
+
+def test_looks_like_expression():
+    assert calc.looks_like_expression("2+2")
+    assert calc.looks_like_expression("-5")
+    assert not calc.looks_like_expression("3")
+    assert not calc.looks_like_expression("выход")
+
+
+def test_evaluate_lines_skips_comments_and_keeps_errors():
+    results = list(calc.evaluate_lines(["# задачи", "2+2", "", "1/0"]))
+    assert [expression for expression, _, _ in results] == ["2+2", "1/0"]
+    assert results[0][1] == 4 and results[0][2] is None
+    assert isinstance(results[1][2], MathError)
@@ -0,0 +1,26 @@
+import os
+
+import pytest
+
+from elliot_bot.files import atomic_file, atomic_write
+
+
+def test_atomic_write(tmp_path):
+    path = str(tmp_path / "data.json")
+    atomic_write(path, "старое")
+    atomic_write(path, b"new", fsync=True)
+    with open(path, 'rb') as f:
+        assert f.read() == b"new"
+    assert os.listdir(tmp_path) == ["data.json"]
+
+
+def test_failed_write_keeps_old_file(tmp_path):
+    path = str(tmp_path / "data.json")
+    atomic_write(path, "старое")
+    with pytest.raises(RuntimeError):
+        with atomic_file(path, 'w') as f:
+            f.write("недописан")
+            raise RuntimeError
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == "старое"
+    assert os.listdir(tmp_path) == ["data.json"]
@@ -0,0 +1,53 @@
+import hashlib
+
+import pytest
+
+from elliot_bot import auth, hashing
+from elliot_bot import store as store_module
+from elliot_bot.store import LogUserStore
+
+
+CHEAP = {"iterations": 1000}
+
+
+@pytest.fixture
+def users(tmp_path, monkeypatch):
+    # Дешёвая стоимость, чтобы тесты не ждали KDF
+    monkeypatch.setitem(hashing.HASHER_PARAMS, "pbkdf2_sha256", CHEAP)
+    monkeypatch.setattr(hashing, "PASSWORD_HASHER", "pbkdf2_sha256")
+    users = LogUserStore(str(tmp_path / "users.jsonl"))
+    monkeypatch.setattr(store_module, "_users_store", users)
+    yield users
+    users.close()
+
+
+def test_hash_and_verify():
+    encoded = hashing.hash_password("секрет", "pbkdf2_sha256", CHEAP)
+    assert encoded.startswith("pbkdf2_sha256$1000$")
+    # Соль своя у каждого хэша
+    assert encoded != hashing.hash_password("секрет", "pbkdf2_sha256", CHEAP)
+    assert hashing.verify_password("секрет", encoded, cache=None)
+    assert not hashing.verify_password("другой", encoded, cache=None)
+    assert not hashing.verify_password("секрет", "pbkdf2_sha256$abc$00$00", cache=None)
+
+
+def test_needs_rehash():
+    encoded = hashing.hash_password("секрет", "pbkdf2_sha256", CHEAP)
+    assert not hashing.needs_rehash(encoded, "pbkdf2_sha256", CHEAP)
+    assert hashing.needs_rehash(encoded, "pbkdf2_sha256", {"iterations": 2000})
+    assert hashing.needs_rehash(encoded, "scrypt")
+    assert hashing.needs_rehash(hashlib.sha256(b"secret").hexdigest())
+
+
+def test_login_rehashes_legacy_password(users):
+    users.add("1", {"login": "alice", "password": hashlib.sha256("секрет".encode()).hexdigest(),
+                    "commands": {}, "admin": False})
+    assert auth.authenticate("alice", "неверно") is None
+    assert "$" not in users.find_by_login("alice")[1]["password"]
+
+    assert auth.authenticate("alice", "секрет") == {"id": "1", "login": "alice", "is_admin": False}
+    encoded = users.find_by_login("alice")[1]["password"]
+    assert encoded.startswith("pbkdf2_sha256$1000$")
+    # С новым хэшем вход по-прежнему работает, и он уже не перехэшируется
+    assert auth.authenticate("alice", "секрет")["id"] == "1"
+    assert users.find_by_login("alice")[1]["password"] == encoded
@@ -0,0 +1,55 @@
+import pytest
+
+from elliot_bot import history as history_module
+from elliot_bot import store as store_module
+from elliot_bot.history import CommandHistory
+from elliot_bot.store import LogUserStore
+
+
+@pytest.fixture
+def users(tmp_path, monkeypatch):
+    monkeypatch.setattr(history_module, "HISTORY_DIR", str(tmp_path / "history"))
+    monkeypatch.setattr(history_module, "_history_lock", None)
+    monkeypatch.setattr(history_module, "_histories", {})
+    users = LogUserStore(str(tmp_path / "users.jsonl"))
+    users.add("1", {"login": "alice", "password": "x", "commands": {"3": 5}, "admin": False})
+    monkeypatch.setattr(store_module, "_users_store", users)
+    yield users
+    users.close()
+
+
+def test_recent_and_most_used(users, tmp_path):
+    history = CommandHistory("1", "alice", str(tmp_path / "1.jsonl")).load({"3": 5})
+    for code in ["1", "2.3", "1", "1.+", "1"]:
+        history.record(code)
+    assert history.recent() == ["1", "1.+", "2.3"]
+    assert history.recent(1) == ["1"]
+    # Свёрнутые раньше счётчики тоже считаются
+    assert history.most_used(2) == [("3", 5), ("1", 3)]
+
+
+def test_flush_and_reload(users):
+    user = {"id": "1", "login": "alice"}
+    history_module.record(user, "2.1")
+    history_module.record(user, "4")
+    history_module.record(None, "5")
+    history_module.flush_user(user)
+
+    history_module._histories.clear()
+    reloaded = history_module.get_history(user)
+    assert reloaded.recent() == ["4", "2.1"]
+    assert dict(reloaded.most_used()) == {"3": 5, "2.1": 1, "4": 1}
+
+
+def test_compaction_moves_old_codes_into_commands(users, tmp_path):
+    path = str(tmp_path / "history" / "1.jsonl")
+    history = CommandHistory("1", "alice", path, limit=3).load({"3": 5})
+    for code in ["1", "1", "2", "2", "3", "4", "5"]:
+        history.record(code)
+    history.flush()
+
+    with open(path, encoding="utf-8") as f:
+        assert len(f.readlines()) == 3
+    assert users.find_by_login("alice")[1]["commands"] == {"3": 5, "1": 2, "2": 2}
+    assert history.recent(5) == ["5", "4", "3"]
+    assert dict(history.most_used(5)) == {"3": 6, "1": 2, "2": 2, "4": 1, "5": 1}
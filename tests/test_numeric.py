@@ -0,0 +1,52 @@
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+from elliot_bot import calc, numeric
+from elliot_bot.errors import MathError, ValidationError
+
+
+def test_engines():
+    assert calc.evaluate("0.1+0.2", "decimal", cache=None) == Decimal("0.3")
+    assert calc.evaluate("1/3", "fraction", cache=None) == Fraction(1, 3)
+    assert calc.evaluate("0.1+0.2", "float", cache=None) != 0.3
+    with pytest.raises(ValidationError):
+        numeric.check_engine("double")
+
+
+def test_parse_number():
+    assert numeric.parse_number("1/3", "fraction") == Fraction(1, 3)
+    assert numeric.parse_number(" 0.1 ", "decimal") == Decimal("0.1")
+    assert numeric.parse_number("7", "float") == 7
+    with pytest.raises(ValueError):
+        numeric.parse_number("Infinity", "decimal")
+
+
+def test_format_number():
+    assert numeric.format_number(Fraction(1, 3)).startswith("1/3 (≈0.3333")
+    assert numeric.format_number(Decimal("3.000")) == "3"
+    assert numeric.format_number(Fraction(4, 2)) == "2"
+
+
+def test_calculate_division_by_zero():
+    with pytest.raises(MathError):
+        numeric.calculate("÷", 1, 0, "float", cache=None)
+
+
+@pytest.mark.parametrize("engine", numeric.NUMBER_ENGINES)
+@pytest.mark.parametrize("expression", ["(-8)**(1/3)", "(-1)**0.5"])
+def test_non_real_result_is_readable(engine, expression):
+    with pytest.raises(MathError, match=calc.NOT_REAL):
+        calc.evaluate(expression, engine, cache=None)
+
+
+@pytest.mark.parametrize("engine", numeric.NUMBER_ENGINES)
+def test_non_decimal_int_literals(engine):
+    assert calc.evaluate("0x10 + 0b101 + 0o7", engine, cache=None) == 28
+
+
+def test_calculate_rejects_unprintable_result():
+    big = 10 ** (numeric.MAX_RESULT_DIGITS // 2 + 1)
+    with pytest.raises(MathError):
+        numeric.calculate("*", big, big, "float", cache=None)
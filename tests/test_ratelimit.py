@@ -0,0 +1,54 @@
+from elliot_bot import ratelimit
+from elliot_bot.ratelimit import RateLimiter
+
+
+def test_burst_then_wait():
+    limiter = RateLimiter(burst=3, window=30)
+    assert [limiter.hit("a", now=0) for _ in range(3)] == [0, 0, 0]
+    assert limiter.hit("a", now=0) == 10
+    assert limiter.rejected == 1
+    # Другой ключ не задет
+    assert limiter.hit("b", now=0) == 0
+
+
+def test_refill():
+    limiter = RateLimiter(burst=2, window=10)
+    limiter.hit("a", now=0)
+    limiter.hit("a", now=0)
+    assert limiter.hit("a", now=1) > 0
+    assert limiter.hit("a", now=6) == 0
+
+
+def test_reset():
+    limiter = RateLimiter(burst=1, window=60)
+    limiter.hit("a", now=0)
+    assert limiter.hit("a", now=0) > 0
+    limiter.reset("a")
+    assert limiter.hit("a", now=0) == 0
+
+
+def test_bounded_keys():
+    limiter = RateLimiter(burst=5, window=60, max_keys=10)
+    for number in range(100):
+        limiter.hit(f"key{number}", now=0)
+    assert len(limiter) == 10
+
+
+def test_full_buckets_are_evicted():
+    limiter = RateLimiter(burst=1, window=1)
+    limiter.hit("a", now=0)
+    limiter.hit("b", now=5)
+    assert len(limiter) == 1
+
+
+def test_check_login_limits_source_and_login(monkeypatch):
+    monkeypatch.setattr(ratelimit, "source_limiter", RateLimiter(burst=3, window=60))
+    monkeypatch.setattr(ratelimit, "login_limiter", RateLimiter(burst=2, window=60))
+    assert ratelimit.check_login("alice", "10.0.0.1") == 0
+    assert ratelimit.check_login("alice", "10.0.0.2") == 0
+    # Логин исчерпан с любого источника
+    assert ratelimit.check_login("alice", "10.0.0.3") > 0
+    assert ratelimit.check_login("bob", "10.0.0.1") == 0
+    # А источник - для любого логина
+    assert ratelimit.check_login("carol", "10.0.0.1") == 0
+    assert ratelimit.check_login("dave", "10.0.0.1") > 0
@@ -0,0 +1,52 @@
+import pytest
+
+from elliot_bot import calc, numeric
+from elliot_bot.errors import MathError, ValidationError
+
+
+def test_result_cache_is_bounded():
+    cache = numeric.ResultCache(size=2)
+    for key in range(3):
+        cache.put(key, key)
+    assert cache.get(0) == (False, None)
+    assert cache.get(2) == (True, 2)
+    assert cache.stats()["entries"] == 2
+
+
+def test_result_cache_is_bounded_by_bytes():
+    cache = numeric.ResultCache(size=100, max_bytes=200)
+    # Больше всего кэша - не кладётся вовсе
+    cache.put("big", 10 ** 1000)
+    assert cache.get("big") == (False, None)
+    for key in range(10):
+        cache.put(key, key)
+    assert cache.bytes <= 200
+
+
+def test_cache_key_keeps_spaces_between_signs():
+    cache = numeric.ResultCache()
+    assert calc.evaluate("2**3", "float", cache) == 8
+    assert calc.evaluate("2 ** 3", "float", cache) == 8
+    assert cache.stats()["hits"] == 1
+    with pytest.raises(ValidationError):
+        calc.evaluate("2 * * 3", "float", cache)
+
+
+def test_errors_are_not_cached():
+    cache = numeric.ResultCache()
+    for _ in range(2):
+        with pytest.raises(MathError):
+            calc.evaluate("1/0", "float", cache)
+    assert cache.stats()["entries"] == 0
+
+
+def test_engine_and_precision_are_part_of_the_key():
+    cache = numeric.ResultCache()
+    assert calc.evaluate("1/3", "fraction", cache) != calc.evaluate("1/3", "float", cache)
+    short = calc.evaluate("1/3", "decimal", cache)
+    numeric.set_decimal_context(precision=5)
+    try:
+        assert calc.evaluate("1/3", "decimal", cache) != short
+    finally:
+        numeric.set_decimal_context(precision=numeric.DECIMAL_PRECISION)
+    assert cache.stats()["hits"] == 0
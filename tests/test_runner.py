@@ -0,0 +1,14 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIO = os.path.join(ROOT, "tests", "scenarios", "full_session.txt")
+
+
+def test_full_session_scenario(tmp_path):
+    # Отдельный процесс: пути базы берутся из HOME при импорте store
+    env = dict(os.environ, HOME=str(tmp_path), USERPROFILE=str(tmp_path), ELLIOT_SESSIONS="")
+    result = subprocess.run([sys.executable, "-m", "elliot_bot.runner", SCENARIO, "--sessions", "2"],
+                            cwd=ROOT, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
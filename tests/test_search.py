@@ -0,0 +1,51 @@
+import pytest
+
+from elliot_bot import search as search_module
+from elliot_bot.search import SearchIndex, tokenize
+
+
+DOCUMENTS = [
+    {"id": "1", "title": "Сеть", "lines": ["Сеть", "ping google.com - проверить соединение"]},
+    {"id": "2", "title": "Файлы", "lines": ["Файлы", "chmod +x script.sh", "chown user file"]},
+    {"id": "3", "title": "Ещё сеть", "lines": ["Ещё сеть", "ping и traceroute", "ping -c 4"]},
+]
+
+
+@pytest.fixture
+def index():
+    return SearchIndex.build(DOCUMENTS, "source")
+
+
+def test_tokenize():
+    assert tokenize("Ёлка, PING-запрос!") == ["елка", "ping", "запрос"]
+
+
+def test_search_ranks_and_intersects(index):
+    assert [result["id"] for result in index.search("ping")] == ["3", "1"]
+    assert [result["id"] for result in index.search("ping google")] == ["1"]
+    assert index.search("ping chmod") == []
+    assert index.search("!!!") == []
+    assert index.search("ping")[0]["snippet"] == "ping и traceroute"
+
+
+def test_search_by_prefix(index):
+    assert [result["id"] for result in index.search("ch")] == ["2"]
+    assert index.search("xyz") == []
+
+
+def test_index_cache_on_disk(index, tmp_path):
+    path = str(tmp_path / "index.json")
+    index.save(path)
+    loaded = SearchIndex.load(path, "source")
+    assert loaded.search("ping google") == index.search("ping google")
+    # Тексты поменялись - кэш не подходит
+    assert SearchIndex.load(path, "other") is None
+    assert SearchIndex.load(str(tmp_path / "missing.json"), "source") is None
+
+
+def test_search_over_help_texts(tmp_path, monkeypatch):
+    monkeypatch.setattr(search_module, "_index", None)
+    path = str(tmp_path / "index.json")
+    index = search_module.get_search_index(path)
+    assert SearchIndex.load(path, index.source) is not None
+    assert search_module.search("ping")[0]["id"].startswith("4.")
@@ -0,0 +1,77 @@
+import pytest
+
+from elliot_bot.sessions import SessionCache
+
+
+USER = {"id": "1", "login": "alice", "is_admin": False}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "sessions.jsonl")
+
+
+def test_issue_and_resume():
+    cache = SessionCache(secret=b"secret")
+    token = cache.issue(USER)
+    assert cache.resume(token) == USER
+
+
+def test_tampered_token_is_rejected():
+    cache = SessionCache(secret=b"secret")
+    session_id, expires, signature = cache.issue(USER).split(".")
+    assert cache.resume(f"{session_id}.{int(expires) + 1000}.{signature}") is None
+    assert cache.resume(f"{session_id}.{expires}.{'0' * len(signature)}") is None
+    assert cache.resume("мусор") is None
+    assert SessionCache(secret=b"other").resume(f"{session_id}.{expires}.{signature}") is None
+
+
+def test_expired_token():
+    cache = SessionCache(ttl=-1, secret=b"secret")
+    assert cache.resume(cache.issue(USER)) is None
+
+
+def test_lru_size():
+    cache = SessionCache(size=2, secret=b"secret")
+    first = cache.issue(USER)
+    cache.issue(USER)
+    cache.issue(USER)
+    assert cache.resume(first) is None
+
+
+def test_shared_log_between_processes(path):
+    first = SessionCache(path)
+    second = SessionCache(path)
+    token = first.issue(USER)
+    assert second.resume(token) == USER
+    second.revoke(token)
+    assert first.resume(token) is None
+    # Перезапуск: сессии читаются из журнала
+    assert SessionCache(path).resume(first.issue(USER)) == USER
+
+
+def test_compact_drops_revoked(path):
+    cache = SessionCache(path)
+    kept = cache.issue(USER)
+    cache.revoke(cache.issue(USER))
+    cache.compact()
+    with open(path, encoding="utf-8") as f:
+        assert len(f.readlines()) == 1
+    assert SessionCache(path).resume(kept) == USER
+
+
+def test_compaction_in_other_process_then_append(path):
+    reader = SessionCache(path)
+    revoked = reader.issue(USER)
+    for _ in range(20):
+        reader.issue(USER)
+    assert reader.resume(revoked) == USER
+
+    writer = SessionCache(path)
+    writer.revoke(revoked)
+    writer.compact()
+    # Сжатый журнал дописали дальше старого смещения читателя
+    tokens = [writer.issue({**USER, "login": f"user{number}"}) for number in range(40)]
+
+    assert all(reader.resume(token) is not None for token in tokens)
+    assert reader.resume(revoked) is None
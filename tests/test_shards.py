@@ -0,0 +1,81 @@
+import json
+import os
+
+import pytest
+
+from elliot_bot import shards
+from elliot_bot import store as store_module
+from elliot_bot.errors import ValidationError
+from elliot_bot.store import LogUserStore, ShardedUserStore
+
+
+def user(login, **fields):
+    return {"login": login, "password": "x", "commands": {}, "admin": False, **fields}
+
+
+def test_sharded_store_spreads_logins(tmp_path):
+    users = ShardedUserStore(str(tmp_path / "shards"), shards=4)
+    users.add_many([(str(number), user(f"user{number}")) for number in range(200)])
+    assert users.find_by_login("user42") == ("42", user("user42"))
+    assert users.find_by_login("nobody") is None
+    assert len(users) == 200
+    # Каждый логин лежит ровно в своём шарде
+    assert all(shard.find_by_login("user42") is None
+               for shard in users.shards if shard is not users.shard_for("user42"))
+    assert all(size > 0 for _, _, size in users.stats())
+    users.close()
+
+
+def test_sharded_store_rebalance(tmp_path):
+    path = str(tmp_path / "shards")
+    users = ShardedUserStore(path, shards=4)
+    users.add_many([(str(number), user(f"user{number}")) for number in range(500)])
+    other = ShardedUserStore(path)
+    assert other.find_by_login("user7")[0] == "7"
+
+    assert users.rebalance(3) == 500
+    assert len(users.shards) == 3
+    # От старого поколения не остаётся ни журналов, ни .idx, ни .lock
+    assert not [name for name in os.listdir(path) if name.startswith("users-1-")]
+    # Второй экземпляр подхватывает новую раскладку и пишет уже в неё
+    other.add("500", user("user500"))
+    assert users.find_by_login("user500")[0] == "500"
+    assert len(dict(users.iter_users())) == 501
+    assert not [name for name in os.listdir(path) if name.startswith("users-1-")]
+    with pytest.raises(ValidationError):
+        users.rebalance(0)
+    users.close()
+    other.close()
+
+
+def test_open_user_store_migrates_from_log(tmp_path, monkeypatch):
+    log_path = str(tmp_path / "elliot_users.jsonl")
+    json_path = str(tmp_path / "elliot_users.json")
+    monkeypatch.setattr(store_module, "USERS_LOG_FILE", log_path)
+    monkeypatch.setattr(store_module, "USERS_FILE", json_path)
+    monkeypatch.setitem(store_module.STORE_BACKENDS, "sharded", (ShardedUserStore, str(tmp_path / "shards")))
+    # Устаревший JSON, оставшийся после переезда на журнал
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump({"1": user("stale")}, f)
+    log = LogUserStore(log_path)
+    log.add_many([(str(number), user(f"user{number}")) for number in range(1, 11)])
+    log.close()
+
+    users = store_module.open_user_store("sharded")
+    assert users.find_by_login("stale") is None
+    assert users.find_by_login("user10")[0] == "10"
+    assert int(users.next_id()) > 10
+    users.close()
+
+
+def test_shards_cli(tmp_path, capsys):
+    path = str(tmp_path / "shards")
+    users = ShardedUserStore(path, shards=2)
+    users.add_many([(str(number), user(f"user{number}")) for number in range(20)])
+    users.close()
+
+    assert shards.main(["--path", path, "rebalance", "5"]) == 0
+    assert "Переложено 20 пользователей в 5 шардов" in capsys.readouterr().out
+    assert shards.main(["--path", path, "stats"]) == 0
+    assert "шардов: 5" in capsys.readouterr().out
+    assert shards.main(["--path", path, "rebalance", "0"]) == 1
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from elliot_bot import history as history_module
+from elliot_bot import store as store_module
+from elliot_bot.content import get_catalog
+from elliot_bot.engine import MENU_STATE, Engine, Session
+from elliot_bot.slash import найти_пункт
+from elliot_bot.store import LogUserStore
+
+
+@pytest.fixture
+def session(tmp_path, monkeypatch):
+    # История пишется в tmp_path, а не в домашнюю папку
+    monkeypatch.setattr(history_module, "HISTORY_DIR", str(tmp_path / "history"))
+    monkeypatch.setattr(history_module, "_history_lock", None)
+    monkeypatch.setattr(history_module, "_histories", {})
+    users = LogUserStore(str(tmp_path / "users.jsonl"))
+    users.add("1", {"login": "alice", "password": "x", "commands": {}, "admin": False})
+    monkeypatch.setattr(store_module, "_users_store", users)
+    session = Session("test")
+    session.user = {"id": "1", "login": "alice", "is_admin": False}
+    session.state = MENU_STATE
+    yield session
+    users.close()
+
+
+def run(session, line):
+    asyncio.run(Engine().feed(session, line))
+    return "".join(session.take_output())
+
+
+def test_math_command(session):
+    output = run(session, "/math 2+3*(4-1)")
+    assert "Результат: 2+3*(4-1) = 11" in output
+    assert history_module.get_history(session.user).recent() == ["1.выражение"]
+    assert "Делить на ноль нельзя" in run(session, "/math 1/0")
+    assert "Напишите выражение" in run(session, "/math")
+
+
+def test_section_command_by_key_or_number(session):
+    text = get_catalog()["2"]["пункты"]["1"]["текст"]
+    assert text in run(session, "/py basics")
+    assert text in run(session, "/py 1")
+    assert "/py examples - Примеры кода" in run(session, "/py")
+    assert "Список пунктов: /py" in run(session, "/py нет-такого")
+
+
+def test_help_and_unknown_command(session):
+    output = run(session, "/help")
+    assert "/math - " in output and "/search - " in output
+    output = run(session, "/foo")
+    assert "/foo" in output and "Список команд: /help" in output
+    # Команда не сбивает текущий шаг
+    assert session.state == MENU_STATE
+
+
+def test_find_item():
+    assert найти_пункт("4", "PowerShell") == "2"
+    assert найти_пункт("5", "флешка") == "3"
+    assert найти_пункт("5", "Установка Linux") == "2"
+    assert найти_пункт("5", "нет") is None
@@ -0,0 +1,87 @@
+import os
+
+import pytest
+
+from elliot_bot import store as store_module
+from elliot_bot.errors import StoreError
+from elliot_bot.snapshot import SnapshotFile, write_snapshot
+from elliot_bot.store import LogUserStore, SnapshotUserStore
+
+
+def user(login, **fields):
+    return {"login": login, "password": "x", "commands": {}, "admin": False, **fields}
+
+
+def test_snapshot_file_lookup(tmp_path):
+    path = str(tmp_path / "users.snap")
+    users = [("10", user("zoe")), ("2", user("алиса", admin=True)), ("3", user("bob", commands={"1": 4})),
+             ("4", user("bob"))]
+    # Повторный логин не попадает в снимок, как и в UserStore
+    assert write_snapshot(path, users) == 3
+    snapshot = SnapshotFile(path)
+    assert len(snapshot) == 3 and snapshot.max_id == 10
+    assert snapshot.find_login("алиса") == ("2", user("алиса", admin=True))
+    assert snapshot.find_login("bob") == ("3", user("bob", commands={"1": 4}))
+    assert snapshot.find_login("nobody") is None
+    assert snapshot.find_login("очень длинный логин") is None
+    assert snapshot.find_id("10") == user("zoe")
+    assert snapshot.find_id("4") is None
+    assert [user_id for user_id, _ in snapshot] == ["10", "2", "3"]
+    snapshot.close()
+
+
+def test_snapshot_file_rejects_other_files(tmp_path):
+    path = tmp_path / "users.snap"
+    path.write_bytes(b"{}" * 100)
+    with pytest.raises(StoreError):
+        SnapshotFile(str(path))
+    assert SnapshotFile(str(tmp_path / "missing.snap")).find_login("bob") is None
+
+
+def test_snapshot_store_compacts_journal(tmp_path):
+    path = str(tmp_path / "users.snap")
+    users = SnapshotUserStore(path, journal_max_bytes=2000)
+    for number in range(100):
+        users.add(str(number), user(f"user{number}"))
+    assert os.path.getsize(users.journal.path) < 2000
+    assert users.find_by_login("user0")[0] == "0"
+    assert users.find_by_login("user99")[0] == "99"
+    assert len(users) == 100
+    users.close()
+
+
+def test_snapshot_compact_invalidates_journal_index(tmp_path):
+    path = str(tmp_path / "users.snap")
+    users = SnapshotUserStore(path)
+    for number in range(1, 31):
+        users.add(str(number), user(f"old{number}"))
+    users.find_by_login("old1")
+    users.compact()
+    # Новый журнал дорастает до размера старого индекса
+    for number in range(31, 71):
+        users.add(str(number), user(f"new{number}"))
+    users.close()
+
+    fresh = SnapshotUserStore(path)
+    assert fresh.find_by_login("old1") == ("1", user("old1"))
+    assert fresh.find_by_login("new35") == ("35", user("new35"))
+    assert fresh.find_by_login("new70")[0] == "70"
+    fresh.close()
+
+
+def test_open_user_store_migrates_snapshot_from_log(tmp_path, monkeypatch):
+    log_path = str(tmp_path / "elliot_users.jsonl")
+    monkeypatch.setattr(store_module, "USERS_LOG_FILE", log_path)
+    monkeypatch.setitem(store_module.STORE_BACKENDS, "snap", (SnapshotUserStore, str(tmp_path / "users.snap")))
+    log = LogUserStore(log_path)
+    log.add_many([(str(number), user(f"user{number}")) for number in range(1, 11)])
+    log.close()
+
+    users = store_module.open_user_store("snap")
+    assert users.find_by_login("user10")[0] == "10"
+    # Перенесённое сразу лежит в снимке, журнал пуст
+    snapshot = SnapshotFile(users.path)
+    assert len(snapshot) == 10
+    snapshot.close()
+    assert int(users.next_id()) > 10
+    users.close()
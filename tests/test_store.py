@@ -0,0 +1,142 @@
+import json
+import multiprocessing
+import time
+
+from elliot_bot.store import IdAllocator, LogUserStore, ShardedUserStore
+
+
+def user(login, **fields):
+    return {"login": login, "password": "x", "commands": {}, "admin": False, **fields}
+
+
+def test_log_store_roundtrip(tmp_path):
+    path = str(tmp_path / "users.jsonl")
+    users = LogUserStore(path)
+    users.add("1", user("alice"))
+    users.add("2", user("bob"))
+    users.add("1", user("alice", admin=True))
+    users.close()
+
+    reopened = LogUserStore(path)
+    assert reopened.find_by_login("alice") == ("1", user("alice", admin=True))
+    assert reopened.find_by_login("nobody") is None
+    assert dict(reopened.iter_users()) == {"1": user("alice", admin=True), "2": user("bob")}
+    assert len(reopened) == 2
+    reopened.close()
+
+
+def test_log_store_compaction(tmp_path):
+    path = str(tmp_path / "users.jsonl")
+    other = LogUserStore(path)
+    assert other.find_by_login("alice") is None
+    users = LogUserStore(path, compact_min_records=10)
+    users.find_by_login("alice")
+    for number in range(30):
+        users.add("1", user("alice", commands={"n": number}))
+    users.add("2", user("bob"))
+    users.close()
+
+    with open(path, 'rb') as f:
+        assert len(f.readlines()) < 30
+    # Процесс, открывший журнал до сжатия, видит последние записи
+    assert other.find_by_login("alice")[1]["commands"] == {"n": 29}
+    assert other.find_by_login("bob")[0] == "2"
+    other.close()
+
+
+def test_log_store_repairs_torn_tail(tmp_path):
+    path = str(tmp_path / "users.jsonl")
+    users = LogUserStore(path)
+    users.add("1", user("alice"))
+    users.close()
+    with open(path, 'ab') as f:
+        f.write(b'{"id": "2", "log')
+
+    users = LogUserStore(path)
+    users.add("3", user("carol"))
+    users.close()
+    with open(path, 'rb') as f:
+        lines = f.read().splitlines()
+    assert [json.loads(line)["id"] for line in lines] == ["1", "3"]
+
+
+def test_log_store_iter_users_keeps_duplicate_logins(tmp_path):
+    path = str(tmp_path / "users.jsonl")
+    users = LogUserStore(path)
+    users.add("1", user("bob"))
+    users.add("2", user("bob"))
+    users.add("3", user("alice"))
+    users.add("1", user("bob", admin=True))
+    users.close()
+
+    # Без полной загрузки: потоковый обход журнала, как при выгрузке и переносе
+    streamed = LogUserStore(path)
+    assert dict(streamed.iter_users()) == {
+        "1": user("bob", admin=True), "2": user("bob"), "3": user("alice")}
+    assert streamed._max_id() == 3
+    streamed.close()
+
+    target = ShardedUserStore(str(tmp_path / "shards"))
+    source = LogUserStore(path)
+    assert target.import_users(source.iter_users()) == 3
+    source.close()
+    assert len(dict(target.iter_users())) == 3
+    target.close()
+
+
+def test_id_allocator(tmp_path):
+    path = str(tmp_path / "users.seq")
+    first = IdAllocator(path, block_size=4)
+    second = IdAllocator(path, block_size=4)
+    ids = [first.next_id(), second.next_id(), first.next_id()] + first.next_ids(10)
+    assert len(set(ids)) == len(ids)
+    batch = second.next_ids(5)
+    assert [int(user_id) for user_id in batch] == list(range(int(batch[0]), int(batch[0]) + 5))
+
+    first.advance(1000)
+    assert int(first.next_id()) >= 1000
+    assert int(IdAllocator(path).next_id()) >= 1000
+
+
+def test_id_allocator_starts_after_existing_users(tmp_path):
+    allocator = IdAllocator(str(tmp_path / "users.seq"), first_id=lambda: 42)
+    assert allocator.next_id() == "42"
+
+
+def _register(path, prefix, count):
+    users = LogUserStore(path)
+    for number in range(count):
+        users.add(users.next_id(), user(f"{prefix}{number}"))
+    users.close()
+
+
+def test_log_store_concurrent_writers(tmp_path):
+    path = str(tmp_path / "users.jsonl")
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=_register, args=(path, prefix, 200)) for prefix in "abc"]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    users = dict(LogUserStore(path).iter_users())
+    assert len(users) == 600
+    assert len({record["login"] for record in users.values()}) == 600
+
+
+
+
+
+
+def test_log_store_fsyncs_by_timer(tmp_path):
+    users = LogUserStore(str(tmp_path / "users.jsonl"), fsync_every=100, fsync_interval=0.05)
+    users.add("1", user("alice"))
+    assert users._unsynced == 1
+    # Новых записей нет, но таймер всё равно доводит fsync до конца
+    deadline = 100
+    while users._unsynced and deadline:
+        time.sleep(0.01)
+        deadline -= 1
+    assert users._unsynced == 0
+    users.close()